@@ -1 +1,5 @@
-from .main import SuperExpressive, RegexError
\ No newline at end of file
+from .main import SuperExpressive, RegexError
+from .registry import PatternRegistry
+from .substitute import SubstitutionSet
+from .timeout import MatchTimeout
+from . import instrument, metrics
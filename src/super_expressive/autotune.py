@@ -0,0 +1,234 @@
+"""Equivalent renderings of token trees, for `SuperExpressive.autotune()`. \n
+A strategy picks one rendering per kind of construct:
+
+- `any_of`: `class` fuses the single characters of the alternatives into a character class
+  (the default rendering), `flat` keeps them as separate alternatives,
+  and `trie` factors the common prefixes of alternatives that are all literal strings,
+- `anything_but_string`: `lookahead` is the default `(?:(?!abc).{3})` rendering,
+  `expanded` is an alternation of character classes (`(?:[^a\\n].{2}|a[^b\\n].|ab[^c\\n])`),
+- `lazy`: `lazy` keeps lazy quantifiers followed by `.end_of_string`, which `greedy`
+  makes greedy (both reach the end of the string, so the match is the same).
+
+Every rendering is a rewrite of the tree into an equivalent one, rendered as usual.
+Rewritten trees never share tokens with the original one.
+"""
+import re
+from dataclasses import dataclass, field, replace
+from itertools import product
+from time import perf_counter
+from typing import Any, Callable, Sequence
+
+from .base import _Token, _Tokens
+
+
+DEFAULT_STRATEGY = { "any_of": "class", "anything_but_string": "lookahead", "lazy": "lazy" }
+
+_lazy_to_greedy = { "zero_or_more_lazy": "zero_or_more", "one_or_more_lazy": "one_or_more", "between_lazy": "between" }
+
+
+@dataclass
+class Candidate:
+    strategy: dict[str, str]
+    pattern: str
+    agrees: bool
+    # the best time of searching all the samples, in seconds (infinite if the candidate disagrees)
+    time: float = float("inf")
+
+
+@dataclass
+class TuneResult:
+    """The outcome of `SuperExpressive.autotune()`: the tuned expression,
+    the chosen strategy and all the candidates considered, the default rendering first.
+    """
+    expr: Any
+    strategy: dict[str, str]
+    candidates: list[Candidate] = field(default_factory=list)
+
+    @property
+    def baseline(self) -> Candidate:
+        return self.candidates[0]
+
+    @property
+    def best(self) -> Candidate:
+        return next(candidate for candidate in self.candidates if candidate.strategy == self.strategy)
+
+    @property
+    def speedup(self) -> float:
+        return self.baseline.time / self.best.time if self.best.time else 1.0
+
+
+def _is_literal(element: _Token) -> bool:
+    return element.type in ("char", "string")
+
+
+def _has_capture(element: _Token) -> bool:
+    if element.type in ("capture", "named_capture"):
+        return True
+    if element.contains_child:
+        return _has_capture(element.value)
+    if element.contains_children:
+        return any(_has_capture(child) for child in element.value)
+    return False
+
+
+class Rewriter:
+    def __init__(self,
+        strategy: dict[str, str],
+        flags: str,
+        resolve: Callable[[Any], list[_Token]],
+        escape: Callable[[str], str],
+        unescape: Callable[[str], str]
+    ) -> None:
+        self.strategy = { **DEFAULT_STRATEGY, **strategy }
+        self.flags = flags
+        self.resolve = resolve
+        self.escape = escape
+        self.unescape = unescape
+        # the kinds of constructs the strategies applied to
+        self.applied: set[str] = set()
+
+    def sequence(self, elements: list[_Token]) -> list[_Token]:
+        rewritten = [self.element(element) for element in elements]
+        if self.strategy["lazy"] == "greedy":
+            for i, element in enumerate(rewritten[:-1]):
+                if (
+                    element.type in _lazy_to_greedy
+                    and rewritten[i + 1].type == "end_of_string"
+                    and not _has_capture(element.value)
+                ):
+                    rewritten[i] = replace(element, type=_lazy_to_greedy[element.type])
+                    self.applied.add("lazy")
+        return rewritten
+
+    def element(self, element: _Token) -> _Token:
+        match element.type:
+            case "subexpression_ref":
+                return _Tokens.subexpression(self.sequence(self.resolve(element.value)))
+            case "any_of":
+                return self.any_of([self.element(child) for child in element.value])
+            case "anything_but_string" if self.strategy["anything_but_string"] == "expanded":
+                self.applied.add("anything_but_string")
+                return self.expanded(element.value)
+
+        if element.contains_child:
+            return replace(element, value=self.element(element.value))
+        if element.contains_children:
+            return replace(element, value=self.sequence(element.value))
+        return replace(element)
+
+    def any_of(self, children: list[_Token]) -> _Token:
+        # the default rendering puts the fused characters after the other alternatives
+        fusable = [child for child in children if child.type in ("char", "range", "any_of_chars")]
+        rest = [child for child in children if child.type not in ("char", "range", "any_of_chars")]
+
+        match self.strategy["any_of"]:
+            case "trie" if len(children) > 1 and "i" not in self.flags and all(map(_is_literal, children)):
+                tokens = self.trie([self.unescape(child.value) for child in rest + fusable])
+                if tokens is not None:
+                    self.applied.add("any_of")
+                    return tokens
+            case "flat" if any(child.type == "char" for child in fusable):
+                self.applied.add("any_of")
+                children = rest + [
+                    _Tokens.string(child.value) if child.type == "char" else child
+                    for child in fusable
+                ]
+        return _Token("any_of", children, contains_children=True)
+
+    def trie(self, words: list[str]) -> _Token | None:
+        root = _TrieNode()
+        for word in words:
+            if not root.insert(word):
+                return None
+        return self.alternatives(root)
+
+    def alternatives(self, node: "_TrieNode") -> _Token:
+        branches = [
+            _Tokens.noop if char is None else self.concatenate(char, child)
+            for char, child in node.items
+        ]
+        if (None, None) in node.items:
+            # lone characters would be fused into a class rendered after the empty alternative
+            branches = [_Tokens.string(branch.value) if branch.type == "char" else branch for branch in branches]
+        return _Token("any_of", branches, contains_children=True)
+
+    def concatenate(self, prefix: str, node: "_TrieNode") -> _Token:
+        # follows the chain of single children, then branches
+        while len(node.items) == 1 and node.items[0][0] is not None:
+            char, node = node.items[0]  # type: ignore
+            prefix += char
+        literal = (_Tokens.string if len(prefix) > 1 else _Tokens.char)(self.escape(prefix))
+        if node.items == [(None, None)]:
+            return literal
+        return _Tokens.subexpression([literal, self.alternatives(node)])
+
+    def expanded(self, s: str) -> _Token:
+        newline = "" if "s" in self.flags else "\\n"
+        branches = []
+        for i, char in enumerate(s):
+            tokens = []
+            if i:
+                tokens.append(_Tokens.string(self.escape(s[:i])))
+            tokens.append(_Tokens.anything_but_chars(self.escape(char) + newline))
+            if i == len(s) - 2:
+                tokens.append(_Tokens.any_char)
+            elif i < len(s) - 2:
+                tokens.append(_Tokens.exactly(len(s) - i - 1).value(_Tokens.any_char))
+            branches.append(_Tokens.subexpression(tokens))
+            if char == "\n" and newline:
+                # `.` never matches the newline, so no match shares the prefix up to it
+                break
+        return _Token("any_of", branches, contains_children=True)
+
+
+class _TrieNode:
+    __slots__ = ("items",)
+
+    def __init__(self) -> None:
+        # ordered alternatives: (character, child node), or (None, None) where a word ends
+        self.items: list[tuple[str | None, "_TrieNode | None"]] = []
+
+    def insert(self, word: str) -> bool:
+        # returns False when factoring the word would reorder it before one of its prefixes
+        node = self
+        for char in word:
+            for i, (item, child) in enumerate(node.items):
+                if item == char:
+                    if (None, None) in node.items[i + 1:]:
+                        return False
+                    node = child  # type: ignore
+                    break
+            else:
+                child = _TrieNode()
+                node.items.append((char, child))
+                node = child
+        if (None, None) not in node.items:
+            node.items.append((None, None))
+        return True
+
+
+def strategies(dimensions: dict[str, Sequence[str]]) -> list[dict[str, str]]:
+    """Returns every combination of the options of the dimensions, the default strategy first."""
+    names = list(dimensions)
+    combinations = [dict(zip(names, options)) for options in product(*dimensions.values())]
+    default = { name: DEFAULT_STRATEGY[name] for name in names }
+    return [default] + [strategy for strategy in combinations if strategy != default]
+
+
+def agrees(regex: re.Pattern, reference: re.Pattern, samples: Sequence[str]) -> bool:
+    for sample in samples:
+        a, b = regex.search(sample), reference.search(sample)
+        if (a and (a.span(), a.groups())) != (b and (b.span(), b.groups())):
+            return False
+    return True
+
+
+def time_search(regex: re.Pattern, samples: Sequence[str], repeat: int) -> float:
+    search = regex.search
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        for sample in samples:
+            search(sample)
+        best = min(best, perf_counter() - started)
+    return best
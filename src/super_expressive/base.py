@@ -7,6 +7,27 @@ class _SubOptions:
     namespace: str = ""
     ignore_flags: bool = True
     ignore_start_and_end: bool = True
+    # whether the kept start/end of input markers define the ones of the parent
+    track_start_and_end: bool = True
+
+
+@dataclass(frozen=True)
+class _FragmentRef:
+    """A merge options overlay applied (lazily, at render time) to a shared `_Fragment`."""
+    fragment: "_Fragment"
+    namespace: str = ""
+    capture_offset: int = 0
+    ignore_start_and_end: bool = True
+
+    @property
+    def key(self) -> tuple[str, int, bool]:
+        return self.namespace, self.capture_offset, self.ignore_start_and_end
+
+    def __copy__(self) -> "_FragmentRef":
+        return self
+
+    def __deepcopy__(self, memo) -> "_FragmentRef":
+        return self
 
 
 @dataclass
@@ -30,6 +51,28 @@ class _StackFrame:
     elements: list[_Token] = field(default_factory=list)
 
 
+@dataclass(eq=False)
+class _Fragment:
+    """A finished expression embedded by reference into other expressions. \n
+    Expressions are never mutated once built, so the fragment shares the elements 
+    of the embedded expression instead of copying them, and is never copied itself.
+    The rebased elements and the rendered string of every overlay are cached.
+    """
+    elements: list["_Token"]
+    named_groups: list[str]
+    capture_groups: int
+    has_defined_start: bool
+    has_defined_end: bool
+    rebased: dict[tuple[str, int, bool], list["_Token"]] = field(default_factory=dict)
+    rendered: dict[tuple[str, int, bool], str] = field(default_factory=dict)
+
+    def __copy__(self) -> "_Fragment":
+        return self
+
+    def __deepcopy__(self, memo) -> "_Fragment":
+        return self
+
+
 def _as_type(type: str, options = {}):
     def _inner(value) -> _Token:
         return _Token(type, value, **options)
@@ -72,6 +115,7 @@ class _Tokens:
     backreference = lambda index: _deferred_type("backreference", { "index": index })
     capture = _deferred_type('capture', { "contains_children": True })
     subexpression = _as_type('subexpression', { "contains_children": True, "quantifier_requires_group": True })
+    subexpression_ref = _as_type('subexpression_ref', { "quantifier_requires_group": True })
     named_capture = lambda name: _deferred_type("named_capture", { "name": name, "contains_children": True })
     group = _deferred_type('group', { "contains_children": True })
     any_of = _deferred_type('any_of', { "contains_children": True })
@@ -88,3 +132,4 @@ class _Tokens:
     one_or_more = _deferred_type("one_or_more", { "contains_child": True })
     one_or_more_lazy = _deferred_type("one_or_more_lazy", { "contains_child": True })
     optional = _deferred_type("optional", { "contains_child": True })
+    param = lambda name, kind: _as_type("param", { "name": name, "quantifier_requires_group": True })(kind)
@@ -0,0 +1,6 @@
+"""Standard-library-only benchmarks for super_expressive.
+
+Every module of this package can be run on its own, e.g.:
+
+    python -m super_expressive.bench.stream
+"""
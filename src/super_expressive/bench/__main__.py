@@ -0,0 +1,158 @@
+"""Runs the builder and matching benchmarks and tracks them over time.
+
+    python -m super_expressive.bench run       # run and store the results
+    python -m super_expressive.bench compare   # run, store and compare against a baseline
+    python -m super_expressive.bench list      # show the stored runs
+
+Results are stored in a local JSON history keyed by git revision and Python version.
+`compare` exits with status 1 when a metric regressed past its threshold.
+"""
+import argparse
+import json
+import sys
+from typing import Any
+
+from . import builder, matching
+from .history import History, compare, git_revision, metrics_from_report
+
+
+DEFAULT_HISTORY = ".bench_history.json"
+SUITES = ("builder", "matching")
+
+
+def _run_suites(args: argparse.Namespace) -> dict[str, list[float]]:
+    metrics: dict[str, list[float]] = {}
+    for suite in args.suite or SUITES:
+        print(f"running {suite} benchmarks...", file=sys.stderr)
+        report: dict[str, Any]
+        if suite == "builder":
+            report = builder.run(args.sizes, args.depths, args.repeat)
+        else:
+            report = matching.run(matching.default_pairs(args.lines), repeat=args.repeat)
+        metrics.update(metrics_from_report(report))
+    return metrics
+
+
+def _parse_thresholds(args: argparse.Namespace) -> tuple[float, dict[str, float]]:
+    threshold = args.threshold
+    thresholds: dict[str, float] = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+        threshold = config.get("threshold", threshold)
+        thresholds.update(config.get("thresholds", {}))
+
+    for item in args.metric_threshold:
+        prefix, _, value = item.rpartition("=")
+        if not prefix:
+            raise SystemExit(f"invalid --metric-threshold {item!r} (expected PREFIX=VALUE)")
+        thresholds[prefix] = float(value)
+    return threshold, thresholds
+
+
+def _cmd_run(args: argparse.Namespace) -> int:
+    history = History(args.history)
+    revision = args.revision or git_revision()
+    history.record(revision, _run_suites(args))
+    history.save()
+    print(f"stored results for {revision} in {args.history}", file=sys.stderr)
+    return 0
+
+
+def _cmd_compare(args: argparse.Namespace) -> int:
+    history = History(args.history)
+    revision = args.revision or git_revision()
+    threshold, thresholds = _parse_thresholds(args)
+
+    if args.no_run:
+        current = history.find(revision)
+        if current is None:
+            print(f"no stored results for {revision}", file=sys.stderr)
+            return 2
+    else:
+        current = history.record(revision, _run_suites(args))
+        if not args.no_store:
+            history.save()
+
+    if args.baseline:
+        baseline = history.find(args.baseline)
+        if baseline is None:
+            print(f"no stored results for baseline {args.baseline}", file=sys.stderr)
+            return 2
+    else:
+        baseline = history.latest_other(revision)
+        if baseline is None:
+            print("no baseline to compare against yet", file=sys.stderr)
+            return 0
+
+    comparisons = compare(baseline["metrics"], current["metrics"], threshold, thresholds)
+    regressions = [comparison for comparison in comparisons if comparison.regressed]
+
+    print(f"baseline {baseline['revision']} -> current {current['revision']} (python {current['python']})")
+    for comparison in comparisons:
+        if comparison.regressed:
+            status = "REGRESSED"
+        elif comparison.improved:
+            status = "improved"
+        elif not args.verbose:
+            continue
+        else:
+            status = "ok"
+        print(
+            f"{status:>9}  {comparison.change:+8.1%}  "
+            f"{comparison.baseline_median:.6g} -> {comparison.current_median:.6g}  "
+            f"(iqr {comparison.baseline_iqr:.3g} / {comparison.current_iqr:.3g}, "
+            f"threshold {comparison.threshold:.0%})  {comparison.metric}"
+        )
+    print(f"{len(comparisons)} metrics compared, {len(regressions)} regressed")
+    return 1 if regressions else 0
+
+
+def _cmd_list(args: argparse.Namespace) -> int:
+    history = History(args.history)
+    for entry in history.entries:
+        print(f"{entry['revision']}  python {entry['python']}  {len(entry['metrics'])} metrics")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m super_expressive.bench",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help=f"history file (default: {DEFAULT_HISTORY})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    running = argparse.ArgumentParser(add_help=False)
+    running.add_argument("--suite", action="append", choices=SUITES, help="suites to run (default: all)")
+    running.add_argument("--revision", help="revision to store the results under (default: git describe)")
+    running.add_argument("--sizes", type=int, nargs="+", default=[10, 100])
+    running.add_argument("--depths", type=int, nargs="+", default=[10, 50])
+    running.add_argument("--lines", type=int, default=1000)
+    running.add_argument("--repeat", type=int, default=9)
+
+    commands.add_parser("run", parents=[running], help="run the benchmarks and store the results")
+
+    comparing = commands.add_parser("compare", parents=[running], help="run, store and compare against a baseline")
+    comparing.add_argument("--baseline", help="baseline revision (default: the latest other stored revision)")
+    comparing.add_argument("--threshold", type=float, default=0.10,
+        help="relative median slowdown that counts as a regression (default: 0.10)")
+    comparing.add_argument("--metric-threshold", action="append", default=[], metavar="PREFIX=VALUE",
+        help="threshold for the metrics starting with PREFIX")
+    comparing.add_argument("--config", help='JSON file with {"threshold": ..., "thresholds": {PREFIX: ...}}')
+    comparing.add_argument("--no-run", action="store_true", help="compare the stored results of the current revision")
+    comparing.add_argument("--no-store", action="store_true", help="do not write the new results to the history")
+    comparing.add_argument("--verbose", "-v", action="store_true", help="also list unchanged metrics")
+
+    commands.add_parser("list", help="list the stored runs")
+
+    args = parser.parse_args(argv)
+    match args.command:
+        case "run": return _cmd_run(args)
+        case "compare": return _cmd_compare(args)
+        case _: return _cmd_list(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
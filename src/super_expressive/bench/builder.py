@@ -0,0 +1,165 @@
+"""Measures the cost of the builder itself: construction of long chains, wide `any_of`s
+and deeply nested groups, subexpression merges, rendering, compilation, serialization, loading from an AST and binding templates,
+as well as peak memory. Emits a JSON report.
+
+Chains are built through the fluent API, which copies the whole expression on every call,
+so building costs grow quadratically: sizes of 10k and above take minutes.
+"""
+import argparse
+import pickle
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Sequence
+
+from ..main import SuperExpressive
+from .common import environment, measure, peak_memory, summarize, write_report
+
+
+DEFAULT_SIZES = (10, 100, 1000)
+DEFAULT_DEPTHS = (10, 50, 100)
+
+
+def build_chain(size: int) -> SuperExpressive:
+    expr = SuperExpressive()
+    for i in range(size):
+        match i % 3:
+            case 0: expr = expr.digit
+            case 1: expr = expr.char('-')
+            case 2: expr = expr.optional.string("ab")
+    return expr
+
+
+def build_any_of(size: int) -> SuperExpressive:
+    expr = SuperExpressive().any_of
+    for i in range(size):
+        expr = expr.string(f"branch{i}")
+    return expr.end()
+
+
+def build_nested(depth: int) -> SuperExpressive:
+    expr = SuperExpressive()
+    for i in range(depth):
+        expr = expr.capture if i % 2 else expr.group
+        expr = expr.char('x')
+    for _ in range(depth):
+        expr = expr.end()
+    return expr
+
+
+fragment = (
+    SuperExpressive()
+        .named_capture("year").exactly(4).digit.end()
+        .char('-')
+        .named_capture("month").exactly(2).digit.end()
+        .named_backreference("month")
+)
+
+
+def build_subexpressions(size: int, by_reference: bool = False) -> SuperExpressive:
+    expr = SuperExpressive()
+    for i in range(size):
+        expr = expr.subexpression(fragment, namespace=f"n{i}_", by_reference=by_reference)
+    return expr
+
+
+def build_template(size: int) -> SuperExpressive:
+    return build_chain(size).string("tenant=").param("tenant").char('@').one_or_more.param("host", kind="chars")
+
+
+# the rows bound by the bind_many case
+TEMPLATE_ROWS = [{ "tenant": f"tenant{i}", "host": f"h{i}.example" } for i in range(1000)]
+
+
+@dataclass
+class _Case:
+    group: str
+    params: dict[str, Any]
+    fn: Callable[[], Any]
+    setup: Callable[[], Any] | None = None
+
+
+def _cases(sizes: Sequence[int], depths: Sequence[int]) -> list[_Case]:
+    cases = []
+    for size in sizes:
+        cases.append(_Case("chain", { "size": size }, lambda size=size: build_chain(size)))
+        cases.append(_Case("any_of", { "size": size }, lambda size=size: build_any_of(size)))
+        cases.append(_Case("subexpression", { "size": size }, lambda size=size: build_subexpressions(size)))
+        cases.append(_Case(
+            "subexpression_by_reference", { "size": size },
+            lambda size=size: build_subexpressions(size, by_reference=True).to_regex_string()
+        ))
+
+        chain = build_chain(size)
+        cases.append(_Case("to_regex_string", { "size": size }, chain.to_regex_string))
+        cases.append(_Case("to_regex", { "size": size }, chain.to_regex, setup=re.purge))
+
+        pickled, encoded = pickle.dumps(chain), chain.to_bytes()
+        cases.append(_Case("pickle_dumps", { "size": size }, lambda chain=chain: pickle.dumps(chain)))
+        cases.append(_Case("pickle_loads", { "size": size }, lambda pickled=pickled: pickle.loads(pickled)))
+        template = build_template(size)
+        template.bind(**TEMPLATE_ROWS[0])
+        cases.append(_Case(
+            "bind_many", { "size": size, "rows": len(TEMPLATE_ROWS) },
+            lambda template=template: template.bind_many(TEMPLATE_ROWS)
+        ))
+
+        ast = chain.to_ast()
+        cases.append(_Case("from_ast", { "size": size }, lambda ast=ast: SuperExpressive.from_ast(ast)))
+        cases.append(_Case("to_bytes", { "size": size }, chain.to_bytes))
+        cases.append(_Case(
+            "from_bytes", { "size": size }, 
+            lambda encoded=encoded: SuperExpressive.from_bytes(encoded)
+        ))
+
+    for depth in depths:
+        cases.append(_Case("nested", { "depth": depth }, lambda depth=depth: build_nested(depth)))
+    return cases
+
+
+def run(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    depths: Sequence[int] = DEFAULT_DEPTHS,
+    repeat: int = 5,
+    warmup: int = 1,
+    memory: bool = True
+) -> dict[str, Any]:
+    results = []
+    for case in _cases(sizes, depths):
+        times = measure(case.fn, repeat=repeat, warmup=warmup, setup=case.setup)
+        result = {
+            "name": case.group,
+            "params": case.params,
+            "times": times,
+            **summarize(times),
+        }
+        if memory:
+            if case.setup is not None:
+                case.setup()
+            result["peak_memory"] = peak_memory(case.fn)
+        results.append(result)
+
+    return {
+        "suite": "builder",
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+        help="element counts for chains, any_of branches and subexpression merges")
+    parser.add_argument("--depths", type=int, nargs="+", default=list(DEFAULT_DEPTHS),
+        help="nesting depths for capture/group trees")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc measurements")
+    parser.add_argument("--output", "-o", default=None, help="JSON report path (stdout by default)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.depths, args.repeat, args.warmup, not args.no_memory)
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
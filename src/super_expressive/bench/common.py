@@ -0,0 +1,90 @@
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, TextIO
+
+
+def measure(
+    fn: Callable[[], Any],
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    setup: Callable[[], Any] | None = None
+) -> list[float]:
+    """Runs `fn` `warmup` times untimed, then `repeat` times timed,
+    calling `setup` (untimed) before every run. Returns the timings in seconds.
+    """
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        times = []
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return times
+
+
+def peak_memory(fn: Callable[[], Any]) -> int:
+    """Returns the peak number of bytes allocated while running `fn` once."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def quartiles(values: list[float]) -> tuple[float, float, float]:
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    q1, q2, q3 = statistics.quantiles(values, n=4, method="inclusive")
+    return q1, q2, q3
+
+
+def summarize(times: list[float]) -> dict[str, float]:
+    q1, median, q3 = quartiles(times)
+    return {
+        "min": min(times),
+        "median": median,
+        "iqr": q3 - q1,
+        "mean": statistics.fmean(times),
+    }
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_report(report: dict[str, Any], output: str | None) -> None:
+    if output is None or output == "-":
+        _dump(report, sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        with open(output, "w") as f:
+            _dump(report, f)
+
+
+def _dump(report: dict[str, Any], f: TextIO) -> None:
+    json.dump(report, f, indent=2)
@@ -0,0 +1,67 @@
+"""Compares the matchers of `SuperExpressive.to_matcher()` running without a regex
+against `search()` on the compiled patterns, for the shapes they support:
+plain strings, anchored or not, and runs of a character class.
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable
+
+from ..main import SuperExpressive
+
+
+shapes = {
+    "string": SuperExpressive().string("GET /api"),
+    "prefix": SuperExpressive().start_of_input.string("GET /api"),
+    "suffix": SuperExpressive().string(".json").end_of_string,
+    "equals": SuperExpressive().start_of_input.string("GET /api").end_of_input,
+    "class": SuperExpressive().one_or_more.any_of_chars("0123456789abcdef"),
+    "class_full": SuperExpressive().start_of_string.one_or_more.any_of_chars("0123456789abcdef").end_of_string,
+}
+
+
+def _lines(count: int, seed: int = 0) -> list[str]:
+    rnd = random.Random(seed)
+    methods = ("GET", "POST", "PUT")
+    paths = ("/api/users", "/static/app.js", "/api/items.json", "/health")
+    lines = []
+    for _ in range(count):
+        match rnd.randrange(3):
+            case 0: lines.append(f"{rnd.choice(methods)} {rnd.choice(paths)}")
+            case 1: lines.append("".join(rnd.choice("0123456789abcdef") for _ in range(rnd.randint(8, 40))))
+            case _: lines.append(" ".join(rnd.choice(("user", "id", "=", "GET", "0x1f")) for _ in range(8)))
+    return lines
+
+
+def _best_of(repeat: int, fn: Callable[[str], Any], lines: list[str]) -> tuple[float, int]:
+    best = float("inf")
+    found = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = sum(1 for line in lines if fn(line))
+        best = min(best, time.perf_counter() - started)
+    return best, found
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    lines = _lines(args.lines)
+    print(f"{'shape':<12}{'matcher':<20}{'re search':>12}{'test':>12}{'find':>12}")
+    for name, expr in shapes.items():
+        matcher = expr.to_matcher()
+        regex_time, regex_found = _best_of(args.repeat, expr.to_regex().search, lines)
+        test_time, test_found = _best_of(args.repeat, matcher.test, lines)
+        find_time, find_found = _best_of(args.repeat, matcher.find, lines)
+        assert regex_found == test_found == find_found, (name, regex_found, test_found, find_found)
+        print(
+            f"{name:<12}{type(matcher).__name__:<20}{regex_time * 1000:>9.1f} ms"
+            f"{regex_time / test_time:>11.2f}x{regex_time / find_time:>11.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from .common import quartiles
+
+
+HISTORY_VERSION = 1
+
+
+def git_revision(cwd: str | None = None) -> str:
+    """Returns the abbreviated git revision of the working tree
+    (suffixed with `-dirty` when it has local changes), or `unknown` outside of a git checkout.
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "describe", "--always", "--dirty", "--abbrev=12"],
+            cwd=cwd, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return completed.stdout.strip() or "unknown"
+
+
+def metrics_from_report(report: dict[str, Any]) -> dict[str, list[float]]:
+    """Flattens a builder or matching report into samples keyed by metric name."""
+    metrics: dict[str, list[float]] = {}
+    match report["suite"]:
+        case "builder":
+            for result in report["results"]:
+                params = ",".join(f"{key}={value}" for key, value in result["params"].items())
+                key = f"builder/{result['name']}[{params}]"
+                metrics[f"{key}/time"] = result["times"]
+                if "peak_memory" in result:
+                    metrics[f"{key}/peak_memory"] = [float(result["peak_memory"])]
+
+        case "matching":
+            for result in report["results"]:
+                for method, timings in result["methods"].items():
+                    key = f"matching/{result['name']}[{result['corpus']}]/{method}"
+                    metrics[key] = timings["generated"]["times"]
+
+        case suite:
+            raise ValueError(f"unknown benchmark suite: {suite}")
+    return metrics
+
+
+class History:
+    """A local JSON history of benchmark runs keyed by git revision and Python version."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.entries: list[dict[str, Any]] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("version") != HISTORY_VERSION:
+                raise ValueError(f"unsupported benchmark history version in {path}: {data.get('version')}")
+            self.entries = data["entries"]
+
+    def record(self,
+        revision: str,
+        metrics: dict[str, list[float]],
+        python: str | None = None
+    ) -> dict[str, Any]:
+        python = python or platform.python_version()
+        entry = {
+            "revision": revision,
+            "python": python,
+            "timestamp": time.time(),
+            "metrics": metrics,
+        }
+        self.entries = [
+            existing for existing in self.entries
+            if (existing["revision"], existing["python"]) != (revision, python)
+        ]
+        self.entries.append(entry)
+        return entry
+
+    def resolve(self, revision: str, python: str | None = None) -> str:
+        """Returns the stored revision starting with `revision` (the exact one first, then the most recent),
+        or `revision` itself when none is stored for the Python version.
+        """
+        python = python or platform.python_version()
+        entries = [entry for entry in reversed(self.entries) if entry["python"] == python]
+        if any(entry["revision"] == revision for entry in entries):
+            return revision
+        return next((
+            entry["revision"] for entry in entries if entry["revision"].startswith(revision)
+        ), revision)
+
+    def find(self, revision: str, python: str | None = None) -> dict[str, Any] | None:
+        """Returns the entry of the revision, which may be abbreviated (see `resolve()`)."""
+        python = python or platform.python_version()
+        revision = self.resolve(revision, python)
+        for entry in reversed(self.entries):
+            if entry["python"] == python and entry["revision"] == revision:
+                return entry
+        return None
+
+    def latest_other(self, revision: str, python: str | None = None) -> dict[str, Any] | None:
+        """Returns the most recent entry for the same Python version but another revision,
+        which may be abbreviated (see `resolve()`).
+        """
+        python = python or platform.python_version()
+        revision = self.resolve(revision, python)
+        for entry in reversed(self.entries):
+            if entry["python"] == python and entry["revision"] != revision:
+                return entry
+        return None
+
+    def save(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({ "version": HISTORY_VERSION, "entries": self.entries }, f, indent=1)
+        os.replace(temporary, self.path)
+
+
+@dataclass
+class Comparison:
+    metric: str
+    baseline_median: float
+    current_median: float
+    baseline_iqr: float
+    current_iqr: float
+    threshold: float
+
+    @property
+    def change(self) -> float:
+        """Relative change of the median (positive means slower or bigger)."""
+        if self.baseline_median == 0:
+            return 0.0 if self.current_median == 0 else float("inf")
+        return (self.current_median - self.baseline_median) / self.baseline_median
+
+    @property
+    def regressed(self) -> bool:
+        """The median grew by more than the threshold, and by more than
+        the spread (IQR) of either run, so that noisy metrics do not trip it.
+        """
+        noise = max(self.baseline_iqr, self.current_iqr)
+        return (
+            self.change > self.threshold
+            and self.current_median - self.baseline_median > noise
+        )
+
+    @property
+    def improved(self) -> bool:
+        noise = max(self.baseline_iqr, self.current_iqr)
+        return (
+            -self.change > self.threshold
+            and self.baseline_median - self.current_median > noise
+        )
+
+
+def compare(
+    baseline: dict[str, list[float]],
+    current: dict[str, list[float]],
+    threshold: float,
+    thresholds: dict[str, float] | None = None
+) -> list[Comparison]:
+    """Compares the metrics present in both runs. \n
+    `thresholds` maps metric name prefixes to thresholds overriding the default one
+    (the longest matching prefix wins).
+    """
+    thresholds = thresholds or {}
+    comparisons = []
+    for metric in sorted(baseline.keys() & current.keys()):
+        b_q1, b_median, b_q3 = quartiles(baseline[metric])
+        c_q1, c_median, c_q3 = quartiles(current[metric])
+        prefixes = [prefix for prefix in thresholds if metric.startswith(prefix)]
+        comparisons.append(Comparison(
+            metric=metric,
+            baseline_median=b_median,
+            current_median=c_median,
+            baseline_iqr=b_q3 - b_q1,
+            current_iqr=c_q3 - c_q1,
+            threshold=thresholds[max(prefixes, key=len)] if prefixes else threshold,
+        ))
+    return comparisons
@@ -0,0 +1,66 @@
+"""Compares `SuperExpressive.rematch()` after single-keystroke edits
+against scanning the whole edited buffer again with `finditer()`, on buffers of growing sizes.
+"""
+import argparse
+import random
+import time
+
+from ..main import SuperExpressive
+
+
+expressions = {
+    "identifier": SuperExpressive().word_boundary.range("a", "z").between(1, 15).word.word_boundary,
+    "date": SuperExpressive().exactly(4).digit.char("-").exactly(2).digit.char("-").exactly(2).digit,
+    "keyword": SuperExpressive().any_of.string("def").string("class").string("return").end().assert_ahead.char(" ").end(),
+    "unbounded": SuperExpressive().one_or_more.digit,
+}
+
+
+def _buffer(size: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    words = ("def", "class", "return", "value", "2024-01-31", "x1", "(self)", "42", "\n", "    ")
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        word = rnd.choice(words)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)[:size]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--edits", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'expression':<12}{'size':>12}{'finditer':>14}{'rematch':>14}{'speedup':>10}")
+    for name, expr in expressions.items():
+        regex = expr.to_regex()
+        for size in args.sizes:
+            rnd = random.Random(size)
+            text = _buffer(size)
+            spans = [match.span() for match in regex.finditer(text)]
+            full_time = incremental_time = 0.0
+            for _ in range(args.edits):
+                offset = rnd.randrange(len(text))
+                removed = rnd.choice((0, 1))
+                inserted = rnd.choice(("", "a", "1", " ", "-"))
+                text = text[:offset] + inserted + text[offset + removed:]
+
+                started = time.perf_counter()
+                expected = [match.span() for match in regex.finditer(text)]
+                full_time += time.perf_counter() - started
+
+                started = time.perf_counter()
+                spans = expr.rematch(spans, (offset, removed, inserted), text)
+                incremental_time += time.perf_counter() - started
+                assert spans == expected, (name, size, offset)
+            print(
+                f"{name:<12}{size:>12}{full_time / args.edits * 1000:>11.2f} ms"
+                f"{incremental_time / args.edits * 1000:>11.2f} ms{full_time / incremental_time:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
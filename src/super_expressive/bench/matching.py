@@ -0,0 +1,192 @@
+"""Compares the match-time performance of patterns generated by SuperExpressive
+against equivalent hand-written regular expressions. \n
+Every pair is checked for agreement on its corpora before being timed with the
+`match`, `search` and `finditer` methods. The slowdown of a method is the ratio
+of the median time of the generated pattern to the median time of the reference one.
+Emits a JSON report.
+"""
+import argparse
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+
+from ..main import SuperExpressive
+from .common import environment, measure, summarize, write_report
+
+
+METHODS = ("match", "search", "finditer")
+
+
+@dataclass
+class Corpus:
+    name: str
+    lines: list[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def size(self) -> int:
+        return sum(len(line) for line in self.lines)
+
+
+def generated_corpus(
+    name: str,
+    make_line: Callable[[random.Random], str],
+    lines: int = 2000,
+    seed: int = 0
+) -> Corpus:
+    rnd = random.Random(seed)
+    return Corpus(name, [make_line(rnd) for _ in range(lines)])
+
+
+def file_corpus(path: str) -> Corpus:
+    with open(path) as f:
+        return Corpus(os.path.basename(path), f.read().splitlines())
+
+
+@dataclass
+class Pair:
+    name: str
+    expr: SuperExpressive
+    reference: str
+    corpora: list[Corpus] = field(default_factory=list)
+
+
+def _random_text(alphabet: str, low: int, high: int) -> Callable[[random.Random], str]:
+    def _make(rnd: random.Random) -> str:
+        return "".join(rnd.choice(alphabet) for _ in range(rnd.randint(low, high)))
+    return _make
+
+
+def default_pairs(lines: int = 2000) -> list[Pair]:
+    digits = SuperExpressive().digit
+    words = generated_corpus("alnum", _random_text("abc012 -xyz789", 20, 80), lines)
+    keywords = generated_corpus(
+        "keywords",
+        lambda rnd: " ".join(rnd.choice(("cat", "dog", "cow", "x", "y", "bird", "zzz")) for _ in range(12)),
+        lines
+    )
+
+    return [
+        Pair(
+            "quantified_subexpression",
+            SuperExpressive().one_or_more.subexpression(digits),
+            r"\d+",
+            [words]
+        ),
+        Pair(
+            "quantified_string",
+            SuperExpressive().between(1, 3).string("ab").digit,
+            r"(?:ab){1,3}\d",
+            [generated_corpus("ab", _random_text("ab01 ", 20, 80), lines)]
+        ),
+        Pair(
+            "anything_but_string",
+            SuperExpressive().char('<').anything_but_string("end").char('>'),
+            r"<(?:[^e\n]..|e[^n\n].|en[^d\n])>",
+            [generated_corpus("tags", _random_text("<>end ", 20, 80), lines)]
+        ),
+        Pair(
+            "any_of_strings_and_chars",
+            SuperExpressive().any_of.string("cat").string("dog").string("bird").char('x').char('y').end(),
+            r"cat|dog|bird|[xy]",
+            [keywords]
+        ),
+        Pair(
+            "named_captures",
+            SuperExpressive()
+                .named_capture("key").one_or_more.word.end()
+                .char('=')
+                .named_capture("value").one_or_more.digit.end(),
+            r"(?P<key>\w+)=(?P<value>\d+)",
+            [generated_corpus("pairs", _random_text("ab=12 ", 20, 80), lines)]
+        ),
+    ]
+
+
+def _runner(regex: re.Pattern, method: str, corpus: Corpus) -> Callable[[], Any]:
+    if method == "finditer":
+        finditer = regex.finditer
+        text = corpus.text
+        return lambda: sum(1 for _ in finditer(text))
+
+    fn = getattr(regex, method)
+    lines = corpus.lines
+    return lambda: sum(1 for line in lines if fn(line) is not None)
+
+
+def _agrees(generated: re.Pattern, reference: re.Pattern, corpus: Corpus) -> bool:
+    for line in corpus.lines:
+        a, b = generated.search(line), reference.search(line)
+        if (a and a.span()) != (b and b.span()):
+            return False
+    return True
+
+
+def run(
+    pairs: Sequence[Pair],
+    extra_corpora: Sequence[Corpus] = (),
+    repeat: int = 7,
+    warmup: int = 2
+) -> dict[str, Any]:
+    results = []
+    for pair in pairs:
+        generated = pair.expr.to_regex()
+        reference = re.compile(pair.reference)
+
+        for corpus in [*pair.corpora, *extra_corpora]:
+            result: dict[str, Any] = {
+                "name": pair.name,
+                "corpus": corpus.name,
+                "generated_pattern": generated.pattern,
+                "reference_pattern": reference.pattern,
+                "agrees": _agrees(generated, reference, corpus),
+                "corpus_size": corpus.size,
+                "methods": {},
+            }
+            for method in METHODS:
+                generated_times = measure(_runner(generated, method, corpus), repeat=repeat, warmup=warmup)
+                reference_times = measure(_runner(reference, method, corpus), repeat=repeat, warmup=warmup)
+                generated_summary = summarize(generated_times)
+                reference_summary = summarize(reference_times)
+
+                result["methods"][method] = {
+                    "generated": { "times": generated_times, **generated_summary },
+                    "reference": { "times": reference_times, **reference_summary },
+                    "slowdown": generated_summary["median"] / reference_summary["median"],
+                    "throughput": corpus.size / generated_summary["median"],
+                }
+            results.append(result)
+
+    return {
+        "suite": "matching",
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", action="append", default=[],
+        help="a text file to use as an extra corpus for every pair (one input per line)")
+    parser.add_argument("--lines", type=int, default=2000, help="lines per generated corpus")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--output", "-o", default=None, help="JSON report path (stdout by default)")
+    args = parser.parse_args(argv)
+
+    report = run(
+        default_pairs(args.lines),
+        [file_corpus(path) for path in args.corpus],
+        args.repeat,
+        args.warmup
+    )
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compares `SuperExpressive.iter_file` against a naive `for line in f` loop
+on a synthetic log with multi-line records (entries followed by stack traces).
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from ..main import SuperExpressive
+
+
+record_start = (
+    SuperExpressive()
+        .exactly(4).digit.char('-')
+        .exactly(2).digit.char('-')
+        .exactly(2).digit
+)
+
+error_record = (
+    SuperExpressive()
+        .string(" ERROR ")
+        .named_capture("message")
+            .one_or_more.anything_but_chars("\n")
+        .end()
+)
+
+
+def _write_log(path: str, records: int, seed: int = 0) -> None:
+    rnd = random.Random(seed)
+    with open(path, "w") as f:
+        for i in range(records):
+            level = rnd.choice(("INFO", "INFO", "INFO", "WARN", "ERROR"))
+            f.write(f"2024-01-{i % 28 + 1:02d} 12:00:{i % 60:02d} {level} request {i} handled\n")
+            if level == "ERROR":
+                for depth in range(rnd.randint(3, 12)):
+                    f.write(f"    at module{depth}.function{depth}(file{depth}.py:{depth * 7})\n")
+
+
+def _naive(path: str, regex: re.Pattern, boundary: re.Pattern) -> int:
+    found = 0
+    record: list[str] = []
+    with open(path) as f:
+        for line in f:
+            if boundary.match(line):
+                if record and regex.search("".join(record)):
+                    found += 1
+                record = [line]
+            else:
+                record.append(line)
+    if record and regex.search("".join(record)):
+        found += 1
+    return found
+
+
+def _iter_file(path: str, expr: SuperExpressive, block_size: int) -> int:
+    with open(path) as f:
+        return sum(1 for _ in expr.iter_file(f, record_start=record_start, block_size=block_size))
+
+
+def _best_of(repeat: int, fn, *args) -> tuple[float, int]:
+    best = float("inf")
+    result = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--block-size", type=int, default=1 << 16)
+    args = parser.parse_args(argv)
+
+    regex = error_record.to_regex()
+    boundary = record_start.to_regex()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.log")
+        _write_log(path, args.records)
+
+        naive_time, naive_found = _best_of(args.repeat, _naive, path, regex, boundary)
+        iter_time, iter_found = _best_of(args.repeat, _iter_file, path, error_record, args.block_size)
+
+    assert naive_found == iter_found, (naive_found, iter_found)
+    print(f"records matched:  {iter_found}")
+    print(f"for line in f:    {naive_time * 1000:.1f} ms")
+    print(f"iter_file:        {iter_time * 1000:.1f} ms ({naive_time / iter_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
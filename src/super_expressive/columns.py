@@ -0,0 +1,109 @@
+"""Columnar extraction of named captures, see `SuperExpressive.extract_columns()`. \n
+The groups of every match are appended to one list per named capture (no dict per row),
+then the columns with a dtype are converted in bulk: `int`, `float` and the numeric typecodes
+of the `array` module give `array.array`s, anything else is taken as a NumPy dtype.
+The captures which didn't take part in a match are None in the lists, zero in the arrays,
+and marked in the null masks.
+"""
+import re
+from array import array, typecodes
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping
+
+
+_typecodes = { int: "q", float: "d" }
+# the typecodes of the `array` module the captures can be converted to with `int` or `float`
+_numeric_typecodes = "".join(code for code in typecodes if code not in "uw")
+
+
+@dataclass
+class Columns:
+    """The columns of the named captures of the matching lines, in the order of the lines."""
+    # name -> list of str, array.array or NumPy array
+    data: dict[str, Any] = field(default_factory=dict)
+    # name -> bytearray, 1 where the capture didn't take part in the match
+    nulls: dict[str, bytearray] = field(default_factory=dict)
+    rows: int = 0
+    # the lines without a match
+    skipped: int = 0
+
+    def __getitem__(self, name: str) -> Any:
+        return self.data[name]
+
+
+def check_dtypes(dtypes: Mapping[str, Any], names: Iterable[str]) -> None:
+    """Raises ValueError when a dtype is given for an unknown capture or is not a valid numeric typecode."""
+    names = set(names)
+    for name, dtype in dtypes.items():
+        if name not in names:
+            raise ValueError(f"no named capture '{name}' to give a dtype to")
+        if isinstance(dtype, str) and len(dtype) == 1 and dtype not in _numeric_typecodes:
+            if dtype in typecodes:
+                raise ValueError(f"typecode '{dtype}' for '{name}' is not numeric")
+            raise ValueError(f"invalid typecode '{dtype}' for '{name}'")
+
+
+def extract(
+    find: Callable[[str], re.Match | None],
+    groupindex: Mapping[str, int],
+    lines: Iterable[str]
+) -> Columns:
+    """Returns the columns of the named captures of the first match of `find` in every line,
+    as lists of strings (see `convert()`).
+    """
+    names = list(groupindex)
+    indices = [groupindex[name] for name in names]
+    values: list[list[str | None]] = [[] for _ in names]
+    appends = [(column.append, index) for column, index in zip(values, indices)]
+    rows = skipped = 0
+    # one pass, appending to every column (faster than transposing tuples, and no dict per row)
+    for match in map(find, lines):
+        if match is None:
+            skipped += 1
+            continue
+        rows += 1
+        for append, index in appends:
+            append(match[index])
+
+    columns = Columns(rows=rows, skipped=skipped)
+    for name, column in zip(names, values):
+        missing = None in column
+        columns.nulls[name] = bytearray(group is None for group in column) if missing else bytearray(len(column))
+        columns.data[name] = column
+    return columns
+
+
+def convert(columns: Columns, dtypes: Mapping[str, Any]) -> None:
+    """Converts the columns with a dtype in place. \n
+    Raises ValueError when a capture can't be converted to the dtype of its column.
+    """
+    for name, dtype in dtypes.items():
+        if dtype is str:
+            continue
+        column = columns.data[name]
+        if any(columns.nulls[name]):
+            column = ["0" if group is None else group for group in column]
+        code = _typecodes.get(dtype, dtype)
+        try:
+            if isinstance(code, str) and len(code) == 1:
+                to_number = float if code in "fd" else int
+                columns.data[name] = array(code, map(to_number, column))  # type: ignore
+            else:
+                columns.data[name] = _numpy_column(column, dtype, name)
+        except (ValueError, OverflowError, TypeError) as e:
+            raise ValueError(f"can't convert the captures of '{name}' to {_dtype_name(dtype)}: {e}") from None
+
+
+def _dtype_name(dtype: Any) -> str:
+    if isinstance(dtype, type):
+        return dtype.__name__
+    return repr(dtype) if isinstance(dtype, str) else str(dtype)
+
+
+def _numpy_column(column: list, dtype: Any, name: str) -> Any:
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(f"extract_columns() requires numpy for the dtype of '{name}'") from None
+    # parsed by numpy in bulk
+    return np.array(column, dtype=str).astype(dtype)
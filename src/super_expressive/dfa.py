@@ -0,0 +1,394 @@
+"""A linear-time matching engine for the regular subset of SuperExpressions,
+see `SuperExpressive.to_matcher(engine="dfa")`. \n
+The tree of elements is compiled to an NFA (Thompson's construction), run as DFAs built
+lazily, one state at a time, and cached in array-backed transition tables.
+The characters are grouped into equivalence classes on the fly: two characters are
+in the same class when every character class of the expression (each compiled as
+a single-character regex, so that the flags keep their `re` semantics) matches both or neither.
+
+Matches are leftmost-longest. A backward pass over the input marks the positions
+where a match can still end, so that every forward scan stops right after the end
+of its match: `fullmatch()`, `search()` and `finditer()` run in time linear in the input.
+
+Backreferences, lookarounds, word boundaries and anchors elsewhere than at the start
+and the end of the expression (or with the multiline flag) are not supported, and raise `ValueError`.
+"""
+import re
+from array import array
+from typing import Any, Callable, Iterator
+
+from .base import _Tokens
+from .matcher import repeats
+
+
+_single_char = (
+    "any_char", "whitespace_char", "non_whitespace_char", "digit", "non_digit", "word", "non_word",
+    "new_line", "carriage_return", "tab", "null_byte",
+    "char", "range", "any_of_chars", "anything_but_chars", "anything_but_range",
+)
+_sequences = ("capture", "named_capture", "group", "subexpression")
+_unsupported = {
+    "backreference": "backreferences",
+    "named_backreference": "backreferences",
+    "assert_ahead": "lookarounds",
+    "assert_not_ahead": "lookarounds",
+    "assert_behind": "lookarounds",
+    "assert_not_behind": "lookarounds",
+    "word_boundary": "word boundaries",
+    "non_word_boundary": "word boundaries",
+    "start_of_string": "anchors elsewhere than at the start and the end",
+    "end_of_string": "anchors elsewhere than at the start and the end",
+    "start_of_input": "anchors elsewhere than at the start and the end",
+    "end_of_input": "anchors elsewhere than at the start and the end",
+}
+
+# the number of cached DFA states above which the caches are flushed
+DEFAULT_MAX_STATES = 10_000
+
+
+class _Nfa:
+    def __init__(self,
+        render: Callable[[Any], str],
+        escape: Callable[[str], str],
+        unescape: Callable[[str], str],
+        resolve: Callable[[Any], list]
+    ) -> None:
+        self.render = render
+        self.escape = escape
+        self.unescape = unescape
+        self.resolve = resolve
+        self.epsilons: list[list[int]] = []
+        self.edges: list[list[tuple[int, int]]] = []
+        # the single-character patterns of the edges
+        self.atoms: dict[str, int] = {}
+
+    def state(self) -> int:
+        self.epsilons.append([])
+        self.edges.append([])
+        return len(self.edges) - 1
+
+    def atom(self, pattern: str) -> tuple[int, int]:
+        start, end = self.state(), self.state()
+        self.edges[start].append((self.atoms.setdefault(pattern, len(self.atoms)), end))
+        return start, end
+
+    def sequence(self, elements: list) -> tuple[int, int]:
+        start = end = self.state()
+        for element in elements:
+            first, last = self.element(element)
+            self.epsilons[end].append(first)
+            end = last
+        return start, end
+
+    def element(self, element) -> tuple[int, int]:
+        match element.type:
+            case type if type in _single_char:
+                return self.atom(self.render(element))
+            case "string":
+                return self.sequence([_Tokens.char(self.escape(char)) for char in self.unescape(element.value)])
+            case "noop":
+                return self.sequence([])
+            case type if type in _sequences:
+                return self.sequence(element.value)
+            case "subexpression_ref":
+                return self.sequence(self.resolve(element.value))
+            case "any_of":
+                start, end = self.state(), self.state()
+                for child in element.value:
+                    first, last = self.element(child)
+                    self.epsilons[start].append(first)
+                    self.epsilons[last].append(end)
+                return start, end
+            case type if type in _unsupported:
+                raise ValueError(f"the dfa engine does not support {_unsupported[type]}")
+
+        if not element.contains_child:
+            raise ValueError(f"the dfa engine does not support {element.type}")
+
+        low, high = repeats(element)
+        start = end = self.state()
+        for _ in range(low):
+            first, last = self.element(element.value)
+            self.epsilons[end].append(first)
+            end = last
+        if high is None:
+            first, last = self.element(element.value)
+            self.epsilons[end] += [first, last]
+            self.epsilons[last].append(first)
+            return start, last
+        # optional copies: each one can be skipped to the end
+        skipped = []
+        for _ in range(high - low):
+            first, last = self.element(element.value)
+            self.epsilons[end].append(first)
+            skipped.append(end)
+            end = last
+        for state in skipped:
+            self.epsilons[state].append(end)
+        return start, end
+
+
+class _Alphabet:
+    """Groups the characters into equivalence classes, as they are met."""
+    def __init__(self, atoms: list[re.Pattern]) -> None:
+        self.atoms = atoms
+        self.classes: dict[str, int] = {}
+        self.signatures: dict[tuple[bool, ...], int] = {}
+        # the atoms matching the characters of every class
+        self.members: list[tuple[bool, ...]] = []
+
+    def classify(self, char: str) -> int:
+        signature = tuple(atom.fullmatch(char) is not None for atom in self.atoms)
+        index = self.signatures.get(signature)
+        if index is None:
+            index = self.signatures[signature] = len(self.members)
+            self.members.append(signature)
+        self.classes[char] = index
+        return index
+
+
+class _Dfa:
+    """The subsets of NFA states reached by `step`, with their transitions by character class."""
+    def __init__(self, alphabet: _Alphabet, step: Callable[[frozenset, tuple[bool, ...]], frozenset]) -> None:
+        self.alphabet = alphabet
+        self.step = step
+        self.reset()
+
+    def reset(self) -> None:
+        self.ids: dict[frozenset, int] = {}
+        self.sets: list[frozenset] = []
+        self.rows: list[array] = []
+
+    def state(self, states: frozenset) -> int:
+        index = self.ids.get(states)
+        if index is None:
+            index = self.ids[states] = len(self.sets)
+            self.sets.append(states)
+            self.rows.append(array("i"))
+        return index
+
+    def next(self, state: int, char_class: int) -> int:
+        row = self.rows[state]
+        if char_class >= len(row):
+            row.extend([-1] * (char_class + 1 - len(row)))
+        target = row[char_class]
+        if target < 0:
+            target = row[char_class] = self.state(self.step(self.sets[state], self.alphabet.members[char_class]))
+        return target
+
+
+class DFAMatch:
+    """A match found by the dfa engine: its span, without groups."""
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int) -> None:
+        self.string = string
+        self._start = start
+        self._end = end
+
+    def group(self, group: int = 0) -> str:
+        if group != 0:
+            raise IndexError("no such group")
+        return self.string[self._start:self._end]
+
+    __getitem__ = group
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> tuple[int, int]:
+        return self._start, self._end
+
+    def __repr__(self) -> str:
+        return f"<DFAMatch object; span={(self._start, self._end)!r}, match={self.group()!r}>"
+
+
+class DFAMatcher:
+    """Runs a SuperExpression with the dfa engine (see `super_expressive.dfa`)."""
+
+    def __init__(self,
+        elements: list,
+        flags: str,
+        render: Callable[[Any], str],
+        escape: Callable[[str], str],
+        unescape: Callable[[str], str],
+        resolve: Callable[[Any], list],
+        max_states: int = DEFAULT_MAX_STATES
+    ) -> None:
+        # anchors at the start and the end of the expression restrict the positions of the matches
+        self.start = False
+        self.end = ""
+        if elements and (
+            elements[0].type == "start_of_string" or elements[0].type == "start_of_input" and "m" not in flags
+        ):
+            self.start, elements = True, elements[1:]
+        if elements and (
+            elements[-1].type == "end_of_string" or elements[-1].type == "end_of_input" and "m" not in flags
+        ):
+            self.end, elements = elements[-1].type, elements[:-1]
+
+        nfa = _Nfa(render, escape, unescape, resolve)
+        initial, accept = nfa.sequence(elements)
+        self.accept = accept
+        self.max_states = max_states
+        self.flags = flags
+        self.alphabet = _Alphabet([re.compile(f"(?{flags}){atom}" if flags else atom) for atom in nfa.atoms])
+
+        epsilons, edges = nfa.epsilons, nfa.edges
+        back_epsilons: list[list[int]] = [[] for _ in epsilons]
+        back_edges: list[list[tuple[int, int]]] = [[] for _ in edges]
+        for state, targets in enumerate(epsilons):
+            for target in targets:
+                back_epsilons[target].append(state)
+        for state, atom_targets in enumerate(edges):
+            for atom, target in atom_targets:
+                back_edges[target].append((atom, state))
+
+        def closure(states: set[int], epsilons: list[list[int]]) -> frozenset:
+            stack = list(states)
+            while stack:
+                for target in epsilons[stack.pop()]:
+                    if target not in states:
+                        states.add(target)
+                        stack.append(target)
+            return frozenset(states)
+
+        # forward: the states reached from the start of the match
+        def forward(states: frozenset, members: tuple[bool, ...]) -> frozenset:
+            return closure({ target for state in states for atom, target in edges[state] if members[atom] }, epsilons)
+
+        # backward: the states from which the end of a match can be reached
+        ends_anywhere = not self.end
+        def backward(states: frozenset, members: tuple[bool, ...]) -> frozenset:
+            sources = { source for state in states for atom, source in back_edges[state] if members[atom] }
+            if ends_anywhere:
+                sources.add(accept)
+            return closure(sources, back_epsilons)
+
+        self.forward = _Dfa(self.alphabet, forward)
+        self.backward = _Dfa(self.alphabet, backward)
+        self._closures = (closure({ initial }, epsilons), closure({ accept }, back_epsilons))
+        self._meets: dict[tuple[int, int], bool] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """Flushes the cached DFA states."""
+        self.forward.reset()
+        self.backward.reset()
+        self._meets.clear()
+        self.initial = self.forward.state(self._closures[0])
+        self.final = self.backward.state(self._closures[1])
+
+    def __prepare(self) -> None:
+        if len(self.forward.sets) + len(self.backward.sets) > self.max_states:
+            self.reset()
+
+    def __meets(self, forward: int, backward: int) -> bool:
+        # whether a match can go through both states
+        key = (forward, backward)
+        meets = self._meets.get(key)
+        if meets is None:
+            meets = self._meets[key] = not self.forward.sets[forward].isdisjoint(self.backward.sets[backward])
+        return meets
+
+    def __ends(self, s: str) -> array:
+        # the backward states at every position of the input, from its end
+        classes, classify = self.alphabet.classes, self.alphabet.classify
+        dfa = self.backward
+        rows, next = dfa.rows, dfa.next
+        length = len(s)
+        # the end of input may also be before a trailing newline
+        trailing = length - 1 if self.end == "end_of_input" and s.endswith("\n") else -1
+        states = array("i", [0]) * (length + 1)
+        state = states[length] = self.final
+        for index in range(length - 1, -1, -1):
+            char_class = classes.get(s[index])
+            if char_class is None:
+                char_class = classify(s[index])
+            row = rows[state]
+            target = row[char_class] if char_class < len(row) else -1
+            state = target if target >= 0 else next(state, char_class)
+            if index == trailing:
+                state = dfa.state(dfa.sets[state] | dfa.sets[self.final])
+            states[index] = state
+        return states
+
+    def __longest(self, s: str, start: int, ends: array) -> int:
+        classes, classify = self.alphabet.classes, self.alphabet.classify
+        dfa = self.forward
+        rows, next, sets = dfa.rows, dfa.next, dfa.sets
+        backward_sets = self.backward.sets
+        accept = self.accept
+
+        state = self.initial
+        last = start
+        index = start
+        while index < len(s):
+            char_class = classes.get(s[index])
+            if char_class is None:
+                char_class = classify(s[index])
+            row = rows[state]
+            target = row[char_class] if char_class < len(row) else -1
+            state = target if target >= 0 else next(state, char_class)
+            index += 1
+            if not self.__meets(state, ends[index]):
+                break
+            if accept in sets[state] and accept in backward_sets[ends[index]]:
+                last = index
+        return last
+
+    def test(self, s: str) -> bool:
+        """Returns whether the SuperExpression matches somewhere in `s`."""
+        return self.search(s) is not None
+
+    def search(self, s: str) -> DFAMatch | None:
+        """Returns the leftmost-longest match in `s`, or None."""
+        self.__prepare()
+        ends = self.__ends(s)
+        for start in range(1 if self.start else len(s) + 1):
+            if self.__meets(self.initial, ends[start]):
+                return DFAMatch(s, start, self.__longest(s, start, ends))
+        return None
+
+    find = search
+
+    def fullmatch(self, s: str) -> DFAMatch | None:
+        """Returns the match of the whole `s`, or None."""
+        self.__prepare()
+        classes, classify = self.alphabet.classes, self.alphabet.classify
+        dfa = self.forward
+        rows, next = dfa.rows, dfa.next
+        state = self.initial
+        for char in s:
+            char_class = classes.get(char)
+            if char_class is None:
+                char_class = classify(char)
+            row = rows[state]
+            target = row[char_class] if char_class < len(row) else -1
+            state = target if target >= 0 else next(state, char_class)
+            if not dfa.sets[state]:
+                return None
+        return DFAMatch(s, 0, len(s)) if self.accept in dfa.sets[state] else None
+
+    def finditer(self, s: str) -> Iterator[DFAMatch]:
+        """Returns an iterator over the non-overlapping leftmost-longest matches in `s`."""
+        self.__prepare()
+        ends = self.__ends(s)
+        matches = []
+        start = 0
+        while start <= (0 if self.start else len(s)):
+            if not self.__meets(self.initial, ends[start]):
+                start += 1
+                continue
+            end = self.__longest(s, start, ends)
+            matches.append(DFAMatch(s, start, end))
+            # an empty match is followed by a match starting after it
+            start = end if end > start else start + 1
+        # found at once, since the states of the scans are only valid until the caches are flushed
+        return iter(matches)
+
+    def __repr__(self) -> str:
+        return f"DFAMatcher(atoms={len(self.alphabet.atoms)}, start={self.start!r}, end={self.end!r})"
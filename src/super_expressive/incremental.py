@@ -0,0 +1,104 @@
+"""Incremental re-matching of edited texts, see `SuperExpressive.rematch()`. \n
+A `finditer()` scan tries the positions of the text one after another, and the attempt at a position
+only reads the text up to the maximum width of the matches past it, plus the reach of the lookarounds
+and of the anchors and word boundaries (two characters: `$` checks for a final newline). So after an edit:
+
+- the previous matches starting far enough before the edit are kept as is,
+- the new text is scanned from the end of the last of them through a window past the inserted text,
+  with `endpos` set right after what the attempts in the window read,
+- the previous matches after the window are shifted and spliced, once the scan of the new text
+  is back in step with the previous one: at a position no previous match straddles
+  (the window grows past the previous match straddling it otherwise).
+
+The window can't be bounded when the width of the matches or the reach of the lookarounds is unbounded
+(e.g. `.one_or_more`, backreferences), the whole text is scanned again then.
+"""
+import bisect
+import re
+from operator import itemgetter
+from typing import Any, Callable, Iterable
+
+from .matcher import sequence_widths
+
+
+_lookarounds = ("assert_ahead", "assert_behind", "assert_not_ahead", "assert_not_behind")
+_start = itemgetter(0)
+
+
+def reach(elements: list, resolve: Callable[[Any], list], unescape: Callable[[str], str]) -> int | None:
+    """Returns the number of characters the elements may read around their matches:
+    the maximum width of their lookarounds, at least two (None if unbounded).
+    """
+    widest = 2
+
+    def visit(element) -> bool:
+        nonlocal widest
+        if element.type in _lookarounds:
+            maximum = sequence_widths(element.value, resolve, unescape)[1]
+            if maximum is None:
+                return False
+            widest = max(widest, maximum)
+        if element.type == "subexpression_ref":
+            return all(visit(child) for child in resolve(element.value))
+        if element.contains_child:
+            return visit(element.value)
+        if element.contains_children:
+            return all(visit(child) for child in element.value)
+        return True
+
+    return widest if all(visit(element) for element in elements) else None
+
+
+def rematch(
+    regex: re.Pattern,
+    width: int | None,
+    context: int | None,
+    previous: Iterable[tuple[int, int]],
+    offset: int,
+    removed: int,
+    inserted: int,
+    text: str
+) -> list[tuple[int, int]]:
+    """Returns the spans of the matches of `regex` in `text`, the previous text with `removed`
+    characters at `offset` replaced by `inserted` ones, from the spans of its `previous` matches.
+    """
+    if width is None or context is None:
+        return [match.span() for match in regex.finditer(text)]
+
+    previous = previous if isinstance(previous, list) else list(previous)
+    delta = inserted - removed
+    # the attempts up to this position only read text before the edit
+    kept = bisect.bisect_right(previous, offset - width - context, key=_start)
+    # the scan resumes after a non-empty match, where an empty one is allowed again
+    while kept and previous[kept - 1][0] == previous[kept - 1][1]:
+        kept -= 1
+    spans = previous[:kept]
+    position = spans[-1][1] if spans else 0
+
+    # the attempts from this position on don't read the inserted text
+    limit = offset + inserted + context
+    length = len(text)
+    while True:
+        endpos = limit + width + context
+        if endpos >= length:
+            spans += [match.span() for match in regex.finditer(text, position)]
+            return spans
+
+        last = None
+        for match in regex.finditer(text, position, endpos):
+            if match.start() >= limit:
+                break
+            last = match
+            spans.append(match.span())
+        position = max(last.end() if last is not None else position, limit)
+
+        # the previous scan tried the same position unless a previous match straddles it
+        old = position - delta
+        index = bisect.bisect_left(previous, old, kept, key=_start)
+        if index == 0 or previous[index - 1][1] <= old:
+            if delta:
+                spans += [(start + delta, end + delta) for start, end in previous[index:]]
+            else:
+                spans += previous[index:]
+            return spans
+        limit = previous[index - 1][1] + delta
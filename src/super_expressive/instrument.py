@@ -0,0 +1,99 @@
+"""Opt-in instrumentation of the builder and render hot paths. \n
+Enabled with `enable()` or by setting the `SUPER_EXPRESSIVE_INSTRUMENT` environment variable
+to a non-empty value other than `0` before importing `super_expressive`.
+While enabled, counts and cumulative times are collected for:
+
+- every fluent builder method (aliases are counted under the canonical name),
+- the `deepcopy` calls the builder makes,
+- subexpression merges,
+- the render (`to_regex_string`) and compile (`re.compile`) phases, per pattern name
+  (see the `name` parameter of `.to_regex()` and `.to_regex_string()`).
+
+The timing hooks live in the builder, render, compile and copy paths of `super_expressive.main`
+behind a module-level recorder, a single check per call while disabled. Nothing is patched,
+so enabling the instrumentation never swaps the methods another thread is running.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from . import main
+
+
+ENV_VAR = "SUPER_EXPRESSIVE_INSTRUMENT"
+
+_lock = threading.Lock()
+_stats: dict[str, dict[str, list[float]]] = {}
+
+
+def _record(section: str, key: str, elapsed: float, calls: int = 1) -> None:
+    with _lock:
+        entry = _stats.setdefault(section, {}).setdefault(key, [0, 0.0])
+        entry[0] += calls
+        entry[1] += elapsed
+
+
+def is_enabled() -> bool:
+    return main._recorder is not None
+
+
+def enable() -> None:
+    """Starts collecting stats. Does nothing if already enabled."""
+    main._recorder = _record
+
+
+def disable() -> None:
+    """Stops collecting stats. The stats collected so far are kept."""
+    main._recorder = None
+
+
+def reset() -> None:
+    with _lock:
+        _stats.clear()
+
+
+def snapshot() -> dict[str, dict[str, dict[str, float]]]:
+    """Returns the stats collected so far as
+    `{section: {key: {"calls": int, "time": seconds}}}`, where sections are
+    `methods` (fluent builder methods), `builder` (`deepcopy` and `merge_subexpression`),
+    `render` and `compile` (keyed by pattern name, `""` for unnamed patterns).
+    """
+    with _lock:
+        return {
+            section: {
+                key: { "calls": calls, "time": elapsed }
+                for key, (calls, elapsed) in entries.items()
+            }
+            for section, entries in _stats.items()
+        }
+
+
+@contextmanager
+def collect() -> Iterator[dict[str, dict[str, dict[str, float]]]]:
+    """Enables instrumentation for the duration of the block and fills
+    the yielded dict with the stats collected within it (same layout as `snapshot()`).
+    """
+    was_enabled = is_enabled()
+    before = snapshot()
+    stats: dict[str, dict[str, dict[str, float]]] = {}
+    enable()
+    try:
+        yield stats
+    finally:
+        if not was_enabled:
+            disable()
+
+        for section, entries in snapshot().items():
+            for key, entry in entries.items():
+                previous = before.get(section, {}).get(key, { "calls": 0, "time": 0.0 })
+                calls = entry["calls"] - previous["calls"]
+                if calls:
+                    stats.setdefault(section, {})[key] = {
+                        "calls": calls,
+                        "time": entry["time"] - previous["time"],
+                    }
+
+
+if os.environ.get(ENV_VAR, "") not in ("", "0"):
+    enable()
@@ -1,7 +1,30 @@
+import copy
+import marshal
 import re
 from copy import deepcopy
-
-from .base import _StackFrame, _Token, _Tokens, _SubOptions
+from dataclasses import replace
+from functools import wraps
+from time import perf_counter
+from typing import IO, Any, Callable, Iterable, Iterator, Mapping, Sequence
+from weakref import WeakKeyDictionary
+
+from .autotune import Candidate, Rewriter, TuneResult, agrees, strategies, time_search
+from .base import _StackFrame, _Token, _Tokens, _SubOptions, _Fragment, _FragmentRef, _deferred_type
+from .columns import Columns, check_dtypes, convert, extract
+from .dfa import DFAMatcher
+from .incremental import reach, rematch
+from .matcher import CharClassMatcher, LiteralMatcher, Matcher, first_chars, sequence_widths
+from .memo import POLICIES, RESULTS, MemoMatcher
+from .metrics import InstrumentedPattern
+from .parse import parse
+from .profiler import MatchProfile, Profiler
+from .records import RecordParser, make_record_type
+from .reorder import BranchProfile, Instrumenter, Reorderer
+from .serialize import FORMAT_VERSION, Decoder, Encoder
+from .template import KINDS, MARK, BoundPattern, Template, slot
+from .timeout import TimeoutMatcher, WorkerPool
+from .vectorize import mask, positions
+from .stream import _DEFAULT_BLOCK_SIZE, compile_boundary, iter_matches
 
 
 class RegexError(ValueError):
@@ -15,6 +38,12 @@ def _escape_special(s: str):
         for char in s
     )
 
+_escape_table = { ord(char): '\\' + char for char in _special_chars }
+
+_escaped_regex = re.compile(r"\\(.)", re.S)
+def _unescape_special(s: str):
+    return _escaped_regex.sub(r"\1", s)
+
 _named_group_regex = re.compile(r"(?i)^[a-z]+\w*$")
 _quantifier_table = {
   "one_or_more": "+",
@@ -29,6 +58,64 @@ _quantifier_table = {
 }
 
 
+AST_VERSION = 1
+
+_flag_properties = { "a": "ascii", "i": "case_insensitive", "m": "line_by_line", "s": "single_line", "u": "unicode" }
+_leaf_types = (
+    "any_char", "whitespace_char", "non_whitespace_char", "digit", "non_digit", "word", "non_word",
+    "word_boundary", "non_word_boundary", "new_line", "carriage_return", "tab", "null_byte",
+    "start_of_string", "end_of_string", "start_of_input", "end_of_input",
+)
+_container_types = (
+    "capture", "named_capture", "group", "any_of", "subexpression",
+    "assert_ahead", "assert_not_ahead", "assert_behind", "assert_not_behind",
+)
+# the frame of the merged subexpressions replayed from an AST
+_subexpression_frame = _deferred_type("subexpression", { "contains_children": True, "quantifier_requires_group": True })
+
+
+# fragments of the expressions embedded by reference, see SuperExpressive.subexpression()
+_fragments: "WeakKeyDictionary[SuperExpressive, _Fragment]" = WeakKeyDictionary()
+
+# pre-rendered templates of the expressions with parameters, see SuperExpressive.bind()
+_templates: "WeakKeyDictionary[SuperExpressive, Template]" = WeakKeyDictionary()
+
+# record parsers of the expressions by record type (None for the default one), see SuperExpressive.parse()
+_parsers: "WeakKeyDictionary[SuperExpressive, dict[type | None, RecordParser]]" = WeakKeyDictionary()
+
+# records (section, key, elapsed seconds, calls) while `super_expressive.instrument` is enabled
+_recorder: Callable[[str, str, float, int], None] | None = None
+
+
+def _deepcopy(value: Any) -> Any:
+    # the copies the builder makes, timed while instrumented
+    record = _recorder
+    if record is None:
+        return deepcopy(value)
+    started = perf_counter()
+    try:
+        return deepcopy(value)
+    finally:
+        record("builder", "deepcopy", perf_counter() - started, 1)
+
+
+def _timed_method(fn: Callable) -> Callable:
+    # the fluent methods, timed while instrumented under their canonical name
+    name = fn.__name__
+
+    @wraps(fn)
+    def _method(*args, **kwargs):
+        record = _recorder
+        if record is None:
+            return fn(*args, **kwargs)
+        started = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record("methods", name, perf_counter() - started, 1)
+    return _method
+
+
 class SuperExpressive:
     __slots__ = (
         "__has_defined_start",
@@ -36,7 +123,9 @@ class SuperExpressive:
         "__flags",
         "__stack",
         "__named_groups",
-        "__total_capture_groups"
+        "__total_capture_groups",
+        "__in_place",
+        "__weakref__"
     )
 
     def __init__(self) -> None:
@@ -48,6 +137,28 @@ class SuperExpressive:
         self.__stack: list[_StackFrame] = [_StackFrame(_Tokens.root)]
         self.__named_groups: list[str] = []
         self.__total_capture_groups = 0
+        self.__in_place = False
+
+    def __deepcopy__(self, memo) -> "SuperExpressive":
+        # the same structural copy the default protocol makes, without going through __reduce__.
+        # the nested copies aren't counted as copies of the builder (see _deepcopy)
+        next = SuperExpressive.__new__(SuperExpressive)
+        memo[id(self)] = next
+        next.__has_defined_start = self.__has_defined_start
+        next.__has_defined_end = self.__has_defined_end
+        next.__flags = dict(self.__flags)
+        next.__stack = copy.deepcopy(self.__stack, memo)
+        next.__named_groups = list(self.__named_groups)
+        next.__total_capture_groups = self.__total_capture_groups
+        next.__in_place = False
+        return next
+
+    def __copy__(self) -> "SuperExpressive":
+        # expressions are never mutated once built
+        return self
+
+    def __reduce__(self):
+        return _from_tuple, (self.to_tuple(),)
 
     @property
     def ascii(self):
@@ -55,7 +166,7 @@ class SuperExpressive:
         Uses the `a` flag on the regular expression, which indicates 
         that it should use only ascii characters matching.
         """
-        next = deepcopy(self)
+        next = self.__next()
         next.__flags['a'] = True
         return next
 
@@ -65,7 +176,7 @@ class SuperExpressive:
         Uses the `i` flag on the regular expression, which indicates 
         that it should treat ignore the uppercase/lowercase distinction when matching.
         """
-        next = deepcopy(self)
+        next = self.__next()
         next.__flags['i'] = True
         return next
 
@@ -76,7 +187,7 @@ class SuperExpressive:
         that it should treat the `.start_of_input` and `.end_of_input` markers 
         as the start and end of lines.
         """
-        next = deepcopy(self)
+        next = self.__next()
         next.__flags['m'] = True
         return next
 
@@ -88,7 +199,7 @@ class SuperExpressive:
         where the `.start_of_input` and `.end_of_input` markers explicitly mark 
         the start and end of input, and `.any_char` also matches newlines.
         """
-        next = deepcopy(self)
+        next = self.__next()
         next.__flags['s'] = True
         return next
 
@@ -100,7 +211,7 @@ class SuperExpressive:
         Since unicode mode is the default in Python 3, there is need to use this flag
         (but you can use `.ascii` instead when necessary).
         """
-        next = deepcopy(self)
+        next = self.__next()
         next.__flags['u'] = True
         return next
 
@@ -194,7 +305,7 @@ class SuperExpressive:
         if len(c) != 1:
             raise RegexError(f"char() can only be called with a single character (got {c})")
 
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         current_frame.elements.append(
             next.__apply_quantifier(_Tokens.char(_escape_special(c)))
@@ -214,7 +325,7 @@ class SuperExpressive:
         if len(s) == 0:
             raise RegexError("s cannot be an empty string")
 
-        next = deepcopy(self)
+        next = self.__next()
         element_value = (
             _Tokens.string(_escape_special(s))
             if len(s) > 1
@@ -248,7 +359,7 @@ class SuperExpressive:
                 f"(a = {a[0]}, b = {b[0]})"
             )
 
-        next = deepcopy(self)
+        next = self.__next()
         element_value = _Tokens.range(value=(a, b))
         current_frame = next.__stack[-1]
         
@@ -314,7 +425,7 @@ class SuperExpressive:
         if len(chars) == 0:
             raise RegexError("chars must have at least one character")
 
-        next = deepcopy(self)
+        next = self.__next()
 
         element_value = _Tokens.any_of_chars(_escape_special(chars))
         current_frame = next.__stack[-1]
@@ -336,7 +447,7 @@ class SuperExpressive:
         if len(chars) == 0:
             raise RegexError("chars must have at least one character")
 
-        next = deepcopy(self)
+        next = self.__next()
 
         element_value = _Tokens.anything_but_chars(_escape_special(chars))
         current_frame = next.__stack[-1]
@@ -367,7 +478,7 @@ class SuperExpressive:
                 f"(a = ${a[0]}, b = ${b[0]})"
             )
 
-        next = deepcopy(self)
+        next = self.__next()
 
         element_value = _Tokens.anything_but_range(value=(a, b))
         current_frame = next.__stack[-1]
@@ -390,7 +501,7 @@ class SuperExpressive:
         if len(s) <= 0:
             raise RegexError("s must have least one character")
 
-        next = deepcopy(self)
+        next = self.__next()
 
         # crooked solution: _escape_special() invokation 
         # moved from here to anything_but_string() method 
@@ -411,7 +522,7 @@ class SuperExpressive:
         Needs to be finalised with `.end()` or `.over`. \n
         Can be later referenced with `.backreference(index)`.
         """
-        next = deepcopy(self)
+        next = self.__next()
 
         new_frame = _StackFrame(_Tokens.capture)
         next.__stack.append(new_frame)
@@ -446,7 +557,7 @@ class SuperExpressive:
         and must not coincide with the name of the capture group defined before.
         Raises `RegexError` otherwise.
         """
-        next = deepcopy(self)
+        next = self.__next()
         new_frame = _StackFrame(_Tokens.named_capture(name))
 
         next.__track_named_group(name)
@@ -466,6 +577,22 @@ class SuperExpressive:
             raise RegexError(f"no capture group called '{name}' exists (create one with .named_capture())")
         return self.__match_element(_Tokens.named_backreference(name))
 
+    def param(self, name: str, *, kind: str = "string") -> "SuperExpressive":
+        """Matches the value of the parameter `name`, bound later with `.bind()` or `.bind_many()`.
+        An expression with parameters is a template, which can't be rendered before being bound. \n
+        `kind`: `"string"` to match the value as an exact string, 
+        or `"chars"` to match any of the characters of the value (default is `"string"`).
+
+        The `name` parameter must be non-empty string consisting of latin letters, numbers, and underscores only.
+        The `kind` parameter must be either `"string"` or `"chars"`.
+        Raises `RegexError` otherwise.
+        """
+        if not isinstance(name, str) or not _named_group_regex.match(name):
+            raise RegexError(f"name '{name}' is not valid (only letters, numbers, and underscores)")
+        if kind not in KINDS:
+            raise RegexError(f"kind must be one of {', '.join(KINDS)} (got {kind})")
+        return self.__match_element(_Tokens.param(name, kind))
+
     @property
     def optional(self) -> "SuperExpressive":
         """Assert that the proceeding element may or may not be matched."""
@@ -506,7 +633,7 @@ class SuperExpressive:
         if not isinstance(n, int) or n <= 0:
             raise RegexError(f"n must be a positive integer (got {n})")
 
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         if current_frame.quantifier:
             raise RegexError(
@@ -527,7 +654,7 @@ class SuperExpressive:
         if not isinstance(n, int) or n <= 0:
             raise RegexError(f"n must be a positive integer (got {n})")
 
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         if current_frame.quantifier:
             raise RegexError(
@@ -553,7 +680,7 @@ class SuperExpressive:
         if x >= y:
             raise RegexError(f"x must be less than y (x = {x}, y = {y})")
 
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         if current_frame.quantifier:
             raise RegexError(
@@ -579,7 +706,7 @@ class SuperExpressive:
         if x >= y:
             raise RegexError(f"x must be less than y (x = {x}, y = {y})")
 
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         if current_frame.quantifier:
             raise RegexError(
@@ -593,7 +720,7 @@ class SuperExpressive:
     def start_of_string(self) -> "SuperExpressive":
         """Always assert the start of input string, regardless of using multiline mode (`.line_by_line`)."""
 
-        next = deepcopy(self)
+        next = self.__next()
         next.__stack[-1].elements.append(_Tokens.start_of_string)
         return next
 
@@ -601,7 +728,7 @@ class SuperExpressive:
     def end_of_string(self) -> "SuperExpressive":
         """Always assert the end of input string, regardless of using multiline mode (`.line_by_line`)."""
 
-        next = deepcopy(self)
+        next = self.__next()
         next.__stack[-1].elements.append(_Tokens.end_of_string)
         return next
 
@@ -619,7 +746,7 @@ class SuperExpressive:
         if self.__has_defined_end:
             raise RegexError("Cannot define the start of input after the end of input")
 
-        next = deepcopy(self)
+        next = self.__next()
         next.__has_defined_start = True
         next.__stack[-1].elements.append(_Tokens.start_of_input)
         return next
@@ -636,7 +763,7 @@ class SuperExpressive:
         if self.__has_defined_end:
             raise RegexError("This regex already has a defined end of input")
 
-        next = deepcopy(self)
+        next = self.__next()
         next.__has_defined_end = True
         next.__stack[-1].elements.append(_Tokens.end_of_input)
         return next
@@ -651,7 +778,7 @@ class SuperExpressive:
         if len(self.__stack) <= 1:
             raise RegexError("Cannot call end while building the root expression")
 
-        next = deepcopy(self)
+        next = self.__next()
 
         old_frame = next.__stack.pop()
         assert old_frame.token.value
@@ -667,7 +794,8 @@ class SuperExpressive:
         *,
         namespace: str = "",
         ignore_flags: bool = True,
-        ignore_start_and_end: bool = True
+        ignore_start_and_end: bool = True,
+        by_reference: bool = False
     ) -> "SuperExpressive":
         """Matches another SuperExpressive instance inline. 
         Can be used to create libraries, or to modularise you code. \n
@@ -679,13 +807,39 @@ class SuperExpressive:
         `ignore_flags`: If set to true, any flags this subexpression specifies 
         should be disregarded (default is True). \n
         `ignore_start_and_end`: If set to true, any `.start_of_input`/`.end_of_input` 
-        asserted in this subexpression specifies should be disregarded (default is True).
+        asserted in this subexpression specifies should be disregarded (default is True). \n
+        `by_reference`: If set to true, the subexpression is not copied into this one,
+        but shared by reference along with the options above, which are only applied 
+        when rendering. The rendered subexpression is cached per set of options, 
+        which pays off for library fragments embedded into many expressions (default is False).
 
         The `expr` parameter must be a correctly defined `SuperExpressive` object 
         and must not conflict with start-of-input or end-of-input markers 
         defined in the caller object (see also `ignore_start_and_end` parameter description above).
         Raises `RegexError` otherwise.
         """
+        options = _SubOptions(
+            namespace=namespace,
+            ignore_flags=ignore_flags,
+            ignore_start_and_end=ignore_start_and_end
+        )
+        return self.__subexpression(expr, options, by_reference)
+
+    def _branch_subexpression(self, expr: "SuperExpressive", *, namespace: str = "") -> "SuperExpressive":
+        """Matches `expr` inline as `.subexpression(expr, namespace=namespace, ignore_flags=False,
+        ignore_start_and_end=False)` does, except that its start/end of input markers don't define
+        the ones of this SuperExpression: for the alternatives of an `.any_of` (see `SubstitutionSet`),
+        where the markers of every alternative only apply to it.
+        """
+        options = _SubOptions(
+            namespace=namespace,
+            ignore_flags=False,
+            ignore_start_and_end=False,
+            track_start_and_end=False
+        )
+        return self.__subexpression(expr, options, False)
+
+    def __subexpression(self, expr: "SuperExpressive", options: _SubOptions, by_reference: bool) -> "SuperExpressive":
         if not isinstance(expr, SuperExpressive):
             raise RegexError("expr must be a SuperExpressive instance")
         if len(expr.__stack) != 1:
@@ -695,57 +849,771 @@ class SuperExpressive:
                 "on the subexpression)"
             )
 
-        options = _SubOptions(
-            namespace=namespace,
-            ignore_flags=ignore_flags,
-            ignore_start_and_end=ignore_start_and_end
-        )
+        next = self.__next()
 
-        sub_next = deepcopy(expr)
-        next = deepcopy(self)
+        if by_reference:
+            element = next.__reference_subexpression(expr, options)
+        else:
+            sub_next = _deepcopy(expr)
 
-        additional_capture_groups = { "count": 0 }
-            
-        sub_frame = sub_next.__stack[-1]
-        sub_frame.elements = [
-            SuperExpressive.__merge_subexpression(
-                element, options, next, additional_capture_groups
-            )
-            for element in sub_frame.elements
-        ]
+            additional_capture_groups = { "count": 0 }
+                
+            started = perf_counter()
+            sub_frame = sub_next.__stack[-1]
+            sub_frame.elements = [
+                SuperExpressive.__merge_subexpression(
+                    element, options, next, additional_capture_groups
+                )
+                for element in sub_frame.elements
+            ]
+            record = _recorder
+            if record is not None:
+                # every merged element is counted by __merge_subexpression
+                record("builder", "merge_subexpression", perf_counter() - started, 0)
 
-        next.__total_capture_groups += additional_capture_groups["count"]
+            next.__total_capture_groups += additional_capture_groups["count"]
+            element = _Tokens.subexpression(sub_frame.elements)
 
         if not options.ignore_flags:
-            for flag, enabled in sub_next.__flags.items():
+            for flag, enabled in expr.__flags.items():
                 next.__flags[flag] = next.__flags[flag] or enabled
 
         current_frame = next.__stack[-1]
         current_frame.elements.append(
-            next.__apply_quantifier(_Tokens.subexpression(sub_frame.elements))
+            next.__apply_quantifier(element)
         )
                
         return next
 
-    def to_regex(self) -> re.Pattern:
-        """Outputs the regular expression pattern that this SuperExpression models."""
+    def to_regex(self, *, 
+        name: str = "",
+        instrumented: bool = False,
+        sample_rate: float = 1.0
+    ) -> re.Pattern:
+        """Outputs the regular expression pattern that this SuperExpression models. \n
+        The optional `name` tags the pattern in the stats collected by `super_expressive.instrument`. \n
+        `instrumented`: If set to true, returns a `super_expressive.metrics.InstrumentedPattern` 
+        with the same API as `re.Pattern`, which records call counts, hits and latencies of its methods 
+        under `name` (or the pattern itself when `name` is empty) (default is False). \n
+        `sample_rate`: The share of calls to measure the latency of, 
+        when `instrumented` is set (default is 1.0).
+
+        The `sample_rate` parameter must be a number in the (0, 1] interval.
+        Raises `RegexError` otherwise.
+        """
+
+        if instrumented and not 0 < sample_rate <= 1:
+            raise RegexError(f"sample_rate must be in the (0, 1] interval (got {sample_rate})")
 
-        pattern = self.__get_regex_pattern()
-        flags = self.__get_regex_flags()
-        if flags:
-            pattern = f"(?{flags}){pattern}"
-        return re.compile(pattern)
+        pattern = self.to_regex_string(name=name)
+        started = perf_counter()
+        regex = re.compile(pattern)
+        record = _recorder
+        if record is not None:
+            record("compile", name, perf_counter() - started, 1)
 
-    def to_regex_string(self) -> str:
-        """Outputs a string representation of the regular expression that this SuperExpression models."""
+        if instrumented:
+            return InstrumentedPattern(regex, name, sample_rate)  # type: ignore
+        return regex
 
+    def to_regex_string(self, *, name: str = "") -> str:
+        """Outputs a string representation of the regular expression that this SuperExpression models. \n
+        The optional `name` tags the pattern in the stats collected by `super_expressive.instrument`.
+        """
+
+        started = perf_counter()
         pattern = self.__get_regex_pattern()
         flags = self.__get_regex_flags()
+        record = _recorder
+        if record is not None:
+            record("render", name, perf_counter() - started, 1)
         if flags:
             return f"(?{flags}){pattern}"
         else:
             return pattern
 
+    def iter_file(self,
+        fileobj: IO[str],
+        *,
+        record_start: "SuperExpressive | None" = None,
+        block_size: int = _DEFAULT_BLOCK_SIZE
+    ) -> Iterator[re.Match]:
+        """Lazily matches the records of a text stream against this SuperExpression. \n
+        The stream is read in blocks of `block_size` characters and is never loaded as a whole.
+        By default every line is a record. When `record_start` is given, a record starts 
+        at every line matching it and spans all the following lines up to the next such line
+        (e.g. a log entry followed by a stack trace). \n
+        Yields a match object for every record in which this SuperExpression is found.
+        Records are matched without their trailing line ending.
+
+        The `record_start` parameter must be a `SuperExpressive` instance
+        and `block_size` must be a positive integer.
+        Raises `RegexError` otherwise, before anything is read.
+        """
+        if isinstance(block_size, bool) or not isinstance(block_size, int) or block_size < 1:
+            raise RegexError(f"block_size must be a positive integer (got {block_size!r})")
+        boundary = None
+        if record_start is not None:
+            if not isinstance(record_start, SuperExpressive):
+                raise RegexError("record_start must be a SuperExpressive instance")
+            boundary = compile_boundary(*record_start._pattern_and_flags())
+
+        return iter_matches(self.to_regex(), fileobj, boundary, block_size)
+
+    def to_tuple(self) -> tuple:
+        """Outputs a compact representation of this SuperExpression made of nested tuples, 
+        strings, integers and booleans only (see `super_expressive.serialize`). 
+
+        Unlike the SuperExpression itself, it can be passed to `marshal` and compared for equality.
+        It is also what instances are pickled as.
+        Expressions still being built (e.g. with an open `.capture`) are supported.
+        """
+        encoder = Encoder()
+        frames = tuple(encoder.frame(frame) for frame in self.__stack)
+        return (
+            FORMAT_VERSION,
+            "".join(flag for flag, enabled in self.__flags.items() if enabled),
+            self.__has_defined_start,
+            self.__has_defined_end,
+            tuple(self.__named_groups),
+            self.__total_capture_groups,
+            tuple(encoder.fragments),
+            frames,
+        )
+
+    @staticmethod
+    def from_tuple(state: tuple) -> "SuperExpressive":
+        """Recreates a SuperExpression from the output of `.to_tuple()`.
+
+        The `state` must have been produced by `.to_tuple()` with the same format version.
+        Raises `RegexError` otherwise.
+        """
+        if not isinstance(state, tuple) or not state or state[0] != FORMAT_VERSION:
+            version = state[0] if isinstance(state, tuple) and state else None
+            raise RegexError(
+                f"unsupported serialization format version {version} (expected {FORMAT_VERSION})"
+            )
+
+        try:
+            _, flags, has_defined_start, has_defined_end, named_groups, total_capture_groups, fragments, frames = state
+            decoder = Decoder(fragments)
+
+            next = SuperExpressive.__new__(SuperExpressive)
+            next.__has_defined_start = has_defined_start
+            next.__has_defined_end = has_defined_end
+            next.__flags = { flag: flag in flags for flag in "aimsu" }
+            next.__stack = [decoder.frame(frame) for frame in frames]
+            next.__named_groups = list(named_groups)
+            next.__total_capture_groups = total_capture_groups
+            next.__in_place = False
+        except (TypeError, ValueError, KeyError, IndexError) as e:
+            raise RegexError(f"malformed serialized expression ({e})") from None
+
+        if not next.__stack or next.__stack[0].token.type != "root":
+            raise RegexError("malformed serialized expression (no root frame)")
+        return next
+
+    def to_bytes(self) -> bytes:
+        """Outputs `.to_tuple()` encoded with `marshal`. \n
+        It is about as compact and fast as a pickle, but is tied to the format version 
+        of the expression rather than to the layout of its classes.
+        """
+        return marshal.dumps(self.to_tuple())
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "SuperExpressive":
+        """Recreates a SuperExpression from the output of `.to_bytes()`. 
+
+        As with `pickle`, never load data received from an untrusted source.
+
+        The `data` must have been produced by `.to_bytes()` with the same format version.
+        Raises `RegexError` otherwise.
+        """
+        try:
+            state = marshal.loads(data)
+        except (EOFError, ValueError, TypeError) as e:
+            raise RegexError(f"malformed serialized expression ({e})") from None
+        return SuperExpressive.from_tuple(state)
+
+    def to_ast(self) -> dict:
+        """Outputs the tree of elements of this SuperExpression as plain, JSON serializable data: 
+        `{"version": 1, "flags": "im", "elements": [...]}`, where every element is a dict with
+        a `type` (the name of the method creating it) and, depending on the type,
+        a raw (unescaped) `value`, a `name`, an `index`, quantifier `times`,
+        the quantified `child` or the contained `children`. \n
+        Subexpressions are output as `subexpression` elements containing the merged elements.
+
+        The SuperExpression must be fully specified (see `.end()`).
+        Raises `RegexError` otherwise.
+        """
+        if len(self.__stack) != 1:
+            raise RegexError(
+                "Cannot export a not yet fully specified regex object.\n"
+                f"(Try adding a .end() call to match the '{self.__stack[-1].token.type}')"
+            )
+        return {
+            "version": AST_VERSION,
+            "flags": "".join(flag for flag, enabled in self.__flags.items() if enabled),
+            "elements": [SuperExpressive.__to_node(element) for element in self.__stack[-1].elements],
+        }
+
+    @staticmethod
+    def from_ast(data: dict) -> "SuperExpressive":
+        """Builds a SuperExpression from the output of `.to_ast()` (e.g. loaded from a JSON config). \n
+        The tree is built in a single pass over the elements, without copying the expression 
+        on every step as the fluent methods do, but with the same validation.
+
+        The `data` must be a valid AST, whose elements would be accepted by the fluent methods.
+        Raises `RegexError` otherwise.
+        """
+        if not isinstance(data, dict):
+            raise RegexError(f"data must be a dict (got {data!r})")
+        if data.get("version") != AST_VERSION:
+            raise RegexError(f"unsupported AST version {data.get('version')} (expected {AST_VERSION})")
+
+        flags, elements = data.get("flags", ""), data.get("elements")
+        if not isinstance(flags, str):
+            raise RegexError(f"flags must be a string (got {flags!r})")
+        if not isinstance(elements, list):
+            raise RegexError(f"elements must be a list (got {elements!r})")
+
+        next = SuperExpressive()
+        next.__in_place = True
+        for flag in flags:
+            if flag not in _flag_properties:
+                raise RegexError(f"unknown flag '{flag}'")
+            getattr(next, _flag_properties[flag])
+        for node in elements:
+            next.__replay(node)
+        next.__in_place = False
+        return next
+
+    @staticmethod
+    def from_regex(pattern: str) -> "SuperExpressive":
+        """Builds the SuperExpression equivalent to the regular expression `pattern`,
+        parsed with the parser of the standard library (see `super_expressive.parse`). \n
+        The rendered pattern matches the same strings, but may differ in form
+        (e.g. sets of characters are split into `.any_of` alternatives).
+
+        The `pattern` must be a valid regular expression string using only constructs 
+        that SuperExpressive can express, and passing the validation of the fluent methods
+        (e.g. it must not define the start of input twice).
+        Raises `RegexError` otherwise.
+        """
+        try:
+            ast = parse(pattern)
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+        return SuperExpressive.from_ast(ast)
+
+    def bind(self, **values: str) -> BoundPattern:
+        """Renders this template with the values of its parameters (see `.param()`). \n
+        The template is rendered once into static fragments, so that binding only
+        escapes the values and splices them in between.
+
+        A value must be given for every parameter, and every value must be a non-empty string.
+        Raises `RegexError` otherwise.
+        """
+        try:
+            return BoundPattern(self.__template().render(values))
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+
+    def bind_many(self, rows: Iterable[Mapping[str, str]]) -> list[BoundPattern]:
+        """Renders this template with every mapping of parameter names to values of `rows`
+        (see `.bind()`), in a single batch.
+        """
+        try:
+            return [BoundPattern(pattern) for pattern in self.__template().render_many(rows)]
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+
+    def __template(self) -> Template:
+        template = _templates.get(self)
+        if template is None:
+            template = Template(self.__render(), self.__get_regex_flags(), _escape_table)
+            _templates[self] = template
+        return template
+
+    def autotune(self,
+        sample_inputs: Sequence[str],
+        *,
+        repeat: int = 5
+    ) -> TuneResult:
+        """Chooses the fastest of the equivalent renderings of this SuperExpression for the given inputs. \n
+        The candidate renderings (see `super_expressive.autotune`) are checked to find the same matches 
+        and groups as the default rendering when searching `sample_inputs`, then timed
+        (the best of `repeat` runs over all the samples is kept). \n
+        Returns a `TuneResult` holding the tuned expression, with the fastest rendering pinned 
+        in its elements (referenced subexpressions are merged), the chosen `strategy` 
+        and the timings of all the `candidates`.
+
+        The SuperExpression must be fully specified and the `sample_inputs` must not be empty.
+        Raises `RegexError` otherwise.
+        """
+        samples = list(sample_inputs)
+        if not samples:
+            raise RegexError("sample_inputs must not be empty")
+        if not all(isinstance(sample, str) for sample in samples):
+            raise RegexError("sample_inputs must be strings")
+
+        reference = self.to_regex()
+        flags = self.__get_regex_flags()
+        rewrite = lambda strategy: Rewriter(strategy, flags, SuperExpressive._resolve_reference, _escape_special, _unescape_special)
+
+        # only the kinds of constructs found in the tree are tuned
+        dimensions = {}
+        for dimension, options in (
+            ("any_of", ("class", "flat", "trie")),
+            ("anything_but_string", ("lookahead", "expanded")),
+            ("lazy", ("lazy", "greedy")),
+        ):
+            applicable = [options[0]]
+            for option in options[1:]:
+                probe = rewrite({ dimension: option })
+                probe.sequence(self.__stack[-1].elements)
+                if dimension in probe.applied:
+                    applicable.append(option)
+            if len(applicable) > 1:
+                dimensions[dimension] = applicable
+
+        candidates = []
+        tuned: dict[str, SuperExpressive] = {}
+        for strategy in strategies(dimensions):
+            next = _deepcopy(self)
+            next.__stack[-1].elements = rewrite(strategy).sequence(self.__stack[-1].elements)
+            regex = next.to_regex()
+            candidate = Candidate(strategy, regex.pattern, agrees(regex, reference, samples))
+            if candidate.agrees:
+                candidate.time = time_search(regex, samples, repeat)
+            candidates.append(candidate)
+            tuned[regex.pattern] = next
+
+        best = min(candidates, key=lambda candidate: candidate.time)
+        return TuneResult(tuned[best.pattern] if best is not candidates[0] else self, best.strategy, candidates)
+
+    def profile_branches(self, sample_inputs: Iterable[str]) -> BranchProfile:
+        """Records which alternative of every `.any_of` takes part in the matches
+        found in `sample_inputs` (all the matches of every input are counted, and every
+        alternative taking part in a match counts once, even under a quantifier). \n
+        Returns a `BranchProfile` to pass to `.reorder_by_profile()`.
+
+        The SuperExpression must be fully specified and the `sample_inputs` must be strings.
+        Raises `RegexError` otherwise.
+        """
+        pattern = self.to_regex_string()
+        instrumenter = Instrumenter(self.__get_regex_flags(), SuperExpressive._resolve_reference, _escape_special, _unescape_special)
+        instrumented = _deepcopy(self)
+        instrumented.__stack[-1].elements = instrumenter.sequence(self.__stack[-1].elements)
+        regex = instrumented.to_regex()
+
+        def samples() -> Iterator[str]:
+            for sample in sample_inputs:
+                if not isinstance(sample, str):
+                    raise RegexError("sample_inputs must be strings")
+                yield sample
+
+        return instrumenter.profile(regex, pattern, samples())
+
+    def reorder_by_profile(self, profile: BranchProfile) -> "SuperExpressive":
+        """Reorders the alternatives of every `.any_of` by decreasing number of matches in `profile`,
+        where the order can't change the matches: when the alternatives are all strings
+        or characters and none of them is a prefix of another. \n
+        Referenced subexpressions are merged into the reordered expression.
+        Returns the SuperExpression itself if no alternatives are reordered.
+
+        The `profile` must be recorded by `.profile_branches()` of the same SuperExpression.
+        Raises `RegexError` otherwise.
+        """
+        if not isinstance(profile, BranchProfile) or profile.pattern != self.to_regex_string():
+            raise RegexError("the profile must be recorded by .profile_branches() of the same SuperExpression")
+
+        reorderer = Reorderer(profile, self.__get_regex_flags(), SuperExpressive._resolve_reference, _escape_special, _unescape_special)
+        elements = reorderer.sequence(self.__stack[-1].elements)
+        if not reorderer.applied:
+            return self
+        next = _deepcopy(self)
+        next.__stack[-1].elements = elements
+        return next
+
+    def profile_match(self,
+        input: str,
+        *,
+        repeat: int = 3,
+        threshold: float = 1.5
+    ) -> MatchProfile:
+        """Breaks down the cost of searching `input` with this SuperExpression, to find the part
+        of the expression responsible when it is slow (see `super_expressive.profiler`). \n
+        Returns a `MatchProfile` holding the times of the whole expression, of the prefixes of its
+        top-level sequence and of every subtree (captures, groups, `.any_of` and each alternative,
+        quantifiers...) followed by the rest of the expression, labelled by their builder paths
+        (e.g. `1.capture/0.any_of/2.string`), along with the exponent of their growth when
+        the input is scaled down. Its `culprit` is the deepest subtree whose time grows
+        super-linearly with the length of the input. \n
+        `repeat`: The number of runs timed, the best of them being kept (default is 3). \n
+        `threshold`: The exponent of the growth above which a time is super-linear (default is 1.5).
+
+        The SuperExpression must be fully specified, `input` must be a string, `repeat` a positive integer
+        and `threshold` greater than 1. Raises `RegexError` otherwise.
+        """
+        pattern = self.__get_regex_pattern()
+        if not isinstance(input, str):
+            raise RegexError("input must be a string")
+        if not isinstance(repeat, int) or repeat < 1:
+            raise RegexError(f"repeat must be a positive integer (got {repeat!r})")
+        if not isinstance(threshold, (int, float)) or threshold <= 1:
+            raise RegexError(f"threshold must be greater than 1 (got {threshold!r})")
+
+        profiler = Profiler(self.__get_regex_flags(), SuperExpressive.__evaluate, SuperExpressive._resolve_reference, repeat)
+        return profiler.profile(self.__stack[-1].elements, pattern, input, threshold)
+
+    def matcher(self) -> Matcher:
+        """Returns a `Matcher` finding the matches of this SuperExpression as `.to_regex().search()` does,
+        through the cheapest entry point of `re` (see `super_expressive.matcher`). \n
+        `.start_of_string` (or `.start_of_input` without `.line_by_line`) at the start makes it use
+        `match()`, and `.end_of_string` at the end as well `fullmatch()`, with the anchors stripped.
+        Inputs shorter than the shortest possible match, or longer than the longest possible one
+        for `fullmatch()`, are rejected without running the regex,
+        and plain strings are tested with string operations.
+
+        The SuperExpression must be fully specified.
+        Raises `RegexError` otherwise.
+        """
+        self.__get_regex_pattern()
+        flags = self.__get_regex_flags()
+        elements = self.__stack[-1].elements
+        min_width, max_width = sequence_widths(elements, SuperExpressive._resolve_reference, _unescape_special)
+
+        mode = "search"
+        if self.__is_anchored_at_start(flags):
+            mode, elements = "match", elements[1:]
+            if elements and elements[-1].type == "end_of_string":
+                mode, elements = "fullmatch", elements[:-1]
+
+        literal = None
+        if "i" not in flags and all(element.type in ("char", "string") for element in elements):
+            literal = "".join(_unescape_special(element.value) for element in elements)
+
+        pattern = "".join(SuperExpressive.__evaluate(element) for element in elements) or "(?:)"
+        regex = re.compile(f"(?{flags}){pattern}" if flags else pattern)
+        return Matcher(regex, mode, min_width, max_width, literal)
+
+    def to_matcher(self, *,
+        engine: str = "re",
+        timeout: float | None = None,
+        inline_length: int = 0,
+        name: str = "",
+        pool: WorkerPool | None = None
+    ) -> "Matcher | LiteralMatcher | CharClassMatcher | DFAMatcher | TimeoutMatcher":
+        """Returns a matcher with the `.test(s)` and `.find(s)` methods of `.matcher()`,
+        which uses string operations instead of a regex when the SuperExpression has one of the simple shapes below:
+
+        - a plain string (`.string`/`.char`), optionally anchored at the start (`.start_of_string`,
+          or `.start_of_input` without `.line_by_line`), at the end (`.end_of_string`,
+          or `.end_of_input` without `.line_by_line`) or both, matched with `in`, `find`,
+          `startswith` and `endswith` (a `LiteralMatcher`),
+        - `.one_or_more` over `.any_of_chars` or `.char`, optionally anchored at the start,
+          at the end of the string or both, matched with set operations and `str.strip`
+          (a `CharClassMatcher`).
+
+        Their `test()` runs without a regex, their `find()` only runs the pattern at the position
+        of the match, if any (the `re.Match` has the same span as the one of `.to_regex().search()`).
+        Case-insensitive expressions and other shapes fall back to `.matcher()`.
+
+        `engine`: `"dfa"` returns a `DFAMatcher` instead, running in time linear in the input
+        whatever the expression, with leftmost-longest matches and without groups
+        (see `super_expressive.dfa`) (default is `"re"`).
+
+        `timeout`: The maximum time of a match in seconds. The `.matcher()` of the other shapes
+        is then wrapped into a `TimeoutMatcher`, running the matches in the worker processes of `pool`
+        (a pool shared by all the expressions by default), which raises `MatchTimeout` when a match
+        takes longer, and kills and replaces the stuck worker (see `super_expressive.timeout`).
+        Its calls and timeouts are recorded in `metrics.registry` under `name`
+        (the pattern by default) (default is None: no timeout). \n
+        `inline_length`: Inputs up to this length are matched in process, without any timeout,
+        for the lengths known to match fast (default is 0).
+
+        The SuperExpression must be fully specified, and must not contain backreferences, lookarounds,
+        word boundaries or anchors elsewhere than at its start and end for the dfa engine,
+        which takes no timeout. `timeout` must be a positive number and `inline_length`
+        a non-negative integer. Raises `RegexError` otherwise.
+        """
+        if engine not in ("re", "dfa"):
+            raise RegexError(f"engine must be 're' or 'dfa' (got {engine!r})")
+        if timeout is not None:
+            if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+                raise RegexError(f"timeout must be a positive number (got {timeout!r})")
+            if engine == "dfa":
+                raise RegexError("the dfa engine runs in linear time and takes no timeout")
+        if not isinstance(inline_length, int) or inline_length < 0:
+            raise RegexError(f"inline_length must be a non-negative integer (got {inline_length!r})")
+        self.__get_regex_pattern()
+        flags = self.__get_regex_flags()
+        elements = self.__stack[-1].elements
+        if engine == "dfa":
+            rewriter = Rewriter({ "anything_but_string": "expanded" }, flags, SuperExpressive._resolve_reference, _escape_special, _unescape_special)
+            try:
+                return DFAMatcher(
+                    rewriter.sequence(elements), flags,
+                    SuperExpressive.__evaluate, _escape_special, _unescape_special, SuperExpressive._resolve_reference
+                )
+            except ValueError as e:
+                raise RegexError(str(e)) from None
+        if "i" in flags:
+            return self.__budgeted(timeout, inline_length, name, pool)
+
+        start = self.__is_anchored_at_start(flags)
+        if start:
+            elements = elements[1:]
+        end = ""
+        if elements and (
+            elements[-1].type == "end_of_string"
+            or elements[-1].type == "end_of_input" and "m" not in flags
+        ):
+            end, elements = elements[-1].type, elements[:-1]
+
+        pattern = "".join(SuperExpressive.__evaluate(element) for element in elements) or "(?:)"
+        if all(element.type in ("char", "string") for element in elements):
+            literal = "".join(_unescape_special(element.value) for element in elements)
+            return LiteralMatcher(re.compile(f"(?{flags}){pattern}" if flags else pattern), literal, start, end)
+        if (
+            len(elements) == 1 and end != "end_of_input"
+            and elements[0].type == "one_or_more" and elements[0].value.type in ("char", "any_of_chars")
+        ):
+            chars = _unescape_special(elements[0].value.value)
+            return CharClassMatcher(re.compile(f"(?{flags}){pattern}" if flags else pattern), chars, start, bool(end))
+        return self.__budgeted(timeout, inline_length, name, pool)
+
+    def __budgeted(self,
+        timeout: float | None,
+        inline_length: int,
+        name: str,
+        pool: WorkerPool | None
+    ) -> "Matcher | TimeoutMatcher":
+        matcher = self.matcher()
+        if timeout is None:
+            return matcher
+        return TimeoutMatcher(matcher, timeout, inline_length, name, pool)
+
+    def match_array(self, array: Any) -> Any:
+        """Returns the boolean NumPy mask of the elements of `array` fully matched by this SuperExpression
+        (the bytes of `S` arrays are read as Latin-1). \n
+        Expressions matching strings of a fixed length made of character classes only
+        (e.g. `.exactly(4).any_of_chars(...)`, `.range()`, `.digit`, `.string()`) are matched
+        on `S` and `U` arrays with vectorized per-position table lookups
+        (see `super_expressive.vectorize`), the others with a loop over the elements.
+
+        Requires NumPy. The SuperExpression must be fully specified.
+        Raises `RegexError` otherwise.
+        """
+        regex = self.to_regex()
+        patterns = positions(
+            self.__stack[-1].elements,
+            SuperExpressive.__evaluate, _escape_special, _unescape_special, SuperExpressive._resolve_reference
+        )
+        return mask(array, regex, patterns, self.__get_regex_flags())
+
+    def memoize(self, *,
+        result: str = "bool",
+        maxsize: int = 4096,
+        policy: str = "lru",
+        max_length: int = 1024
+    ) -> MemoMatcher:
+        """Returns a `MemoMatcher` searching its inputs with `.matcher()` and caching the results
+        by input, for streams where the same inputs come again and again (see `super_expressive.memo`).
+        `.lookup(s)` returns the result of one input, `.lookup_many(inputs)` the results of a batch
+        of inputs, deduplicated before matching, and `.stats()` the hits, misses and evictions. \n
+        `result`: What is cached for each input: `"bool"` whether it matches, `"span"` the span
+        of the first match, `"groups"` the tuple of the whole first match and its groups
+        (None without a match for both) (default is `"bool"`). \n
+        `maxsize`: The maximum number of cached inputs (default is 4096). \n
+        `policy`: The eviction policy, `"lru"` or `"clock"` (default is `"lru"`). \n
+        `max_length`: Longer inputs are matched without being cached (default is 1024).
+
+        The SuperExpression must be fully specified, `maxsize` must be a positive integer
+        and `max_length` a non-negative integer.
+        Raises `RegexError` otherwise.
+        """
+        if result not in RESULTS:
+            raise RegexError(f"result must be 'bool', 'span' or 'groups' (got {result!r})")
+        if policy not in POLICIES:
+            raise RegexError(f"policy must be 'lru' or 'clock' (got {policy!r})")
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise RegexError(f"maxsize must be a positive integer (got {maxsize!r})")
+        if not isinstance(max_length, int) or max_length < 0:
+            raise RegexError(f"max_length must be a non-negative integer (got {max_length!r})")
+
+        matcher = self.matcher()
+        find = matcher.find
+        compute: Any
+        match result:
+            case "bool":
+                compute = matcher.test
+            case "span":
+                def compute(s: str) -> tuple[int, int] | None:
+                    found = find(s)
+                    return None if found is None else found.span()
+            case _:
+                def compute(s: str) -> tuple | None:
+                    found = find(s)
+                    return None if found is None else (found.group(), *found.groups())
+        return MemoMatcher(compute, maxsize, policy, max_length)
+
+    def extract_columns(self, lines: Iterable[str], *, dtypes: Mapping[str, Any] | None = None) -> Columns:
+        """Returns the `Columns` of the named captures of the first match of this SuperExpression
+        in every line of `lines` (as `.matcher().find()` finds it): `columns[name]` is the column
+        of the capture `name`, with one value per matching line, `columns.nulls[name]` its null mask
+        (a `bytearray`, 1 where the capture didn't take part in the match).
+        The lines without a match are skipped and counted in `columns.skipped`.
+        No dict is built per line (see `super_expressive.columns`). \n
+        `dtypes`: The types of the columns, by capture name: `int` and `float` give `array.array`s
+        of the `"q"` and `"d"` typecodes, a one-character string an `array.array` of this typecode,
+        anything else a NumPy array of this dtype (which requires NumPy).
+        The other columns are lists of strings. The missing values are None in the lists
+        and zero in the arrays (default is None).
+
+        The SuperExpression must be fully specified and have named captures,
+        `dtypes` must only give valid numeric typecodes to its named captures,
+        and the captures must be convertible to the dtypes of their columns.
+        Raises `RegexError` otherwise.
+        """
+        dtypes = dtypes or {}
+        matcher = self.matcher()
+        groupindex = matcher.regex.groupindex
+        if not groupindex:
+            raise RegexError("the SuperExpression has no named captures to extract")
+        try:
+            check_dtypes(dtypes, groupindex)
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+        # the entry point itself: the prefilters of find() cost more than they save on typical lines
+        columns = extract(getattr(matcher.regex, matcher.mode), groupindex, lines)
+        try:
+            convert(columns, dtypes)
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+        return columns
+
+    def record_type(self,
+        name: str = "Record",
+        *,
+        converters: Mapping[str, Callable[[str], Any]] | None = None
+    ) -> type:
+        """Returns a new dataclass with `__slots__` (see `super_expressive.records`), named `name`,
+        whose fields are the named captures of this SuperExpression, in order,
+        for `.parse()` and `.parse_iter()` to build records of. \n
+        `converters`: The functions converting the captures, by name, e.g. `{ "status": int }`.
+        They are not called on the captures which didn't take part in a match,
+        which are None (default is None).
+
+        The SuperExpression must be fully specified and have named captures, none of them
+        a Python keyword, `name` must be a valid identifier and `converters` must only convert
+        its named captures.
+        Raises `RegexError` otherwise.
+        """
+        groupindex = self.to_regex().groupindex
+        if not groupindex:
+            raise RegexError("the SuperExpression has no named captures to make records of")
+        if not name.isidentifier():
+            raise RegexError(f"name must be a valid identifier (got {name!r})")
+        # in the order of the groups: merged subexpressions track their named captures innermost first
+        fields = sorted(groupindex, key=groupindex.__getitem__)
+        try:
+            return make_record_type(name, fields, converters or {})
+        except ValueError as e:
+            raise RegexError(str(e)) from None
+
+    def parse(self, s: str, *, record_type: type | None = None) -> Any:
+        """Returns the record of the named captures of the first match of this SuperExpression in `s`
+        (as `.matcher().find()` finds it), or None. \n
+        `record_type`: A class returned by `.record_type()` of this SuperExpression
+        (default is None, for a record type without converters made once for this SuperExpression).
+
+        The SuperExpression must be fully specified and have named captures, none of them
+        a Python keyword, and `record_type` must have its named captures as fields.
+        Raises `RegexError` otherwise.
+        """
+        return self.__record_parser(record_type).parse(s)
+
+    def parse_iter(self, text: str, *, record_type: type | None = None) -> Iterator[Any]:
+        """Returns an iterator over the records of the named captures of the matches
+        of this SuperExpression in `text`, as `.to_regex().finditer()` finds them. \n
+        `record_type`: See `.parse()` (default is None).
+
+        The SuperExpression must be fully specified and have named captures, none of them
+        a Python keyword, and `record_type` must have its named captures as fields.
+        Raises `RegexError` otherwise.
+        """
+        return self.__record_parser(record_type).parse_iter(text)
+
+    def __record_parser(self, record_type: type | None) -> RecordParser:
+        parsers = _parsers.get(self)
+        if parsers is None:
+            parsers = _parsers[self] = {}
+        parser = parsers.get(record_type)
+        if parser is None:
+            matcher = self.matcher()
+            try:
+                parser = RecordParser(
+                    record_type or self.record_type(), matcher.regex.groupindex,
+                    matcher.find, self.to_regex().finditer
+                )
+            except ValueError as e:
+                raise RegexError(str(e)) from None
+            parsers[record_type] = parser
+        return parser
+
+    def rematch(self,
+        previous_matches: Iterable["re.Match | tuple[int, int]"],
+        edit: tuple[int, int, str],
+        new_text: str
+    ) -> list[tuple[int, int]]:
+        """Returns the spans of the matches of this SuperExpression in `new_text`,
+        as `.to_regex().finditer()` finds them, from the matches (or spans) in the text before
+        the `edit`, a tuple `(offset, removed, inserted)`: `removed` characters at `offset`
+        replaced by the `inserted` string. \n
+        Only a window around the edit is scanned, sized from the maximum width of the matches
+        and the reach of the lookarounds; the other matches are kept or shifted
+        (see `super_expressive.incremental`). The whole text is scanned again
+        when the width of the matches is unbounded.
+
+        The SuperExpression must be fully specified, and the edit must fit into `new_text`.
+        Raises `RegexError` otherwise.
+        """
+        regex = self.to_regex()
+        offset, removed, inserted = edit
+        if offset < 0 or removed < 0 or offset + len(inserted) > len(new_text):
+            raise RegexError(f"the edit {edit!r} doesn't fit into a text of {len(new_text)} characters")
+
+        elements = self.__stack[-1].elements
+        width = sequence_widths(elements, SuperExpressive._resolve_reference, _unescape_special)[1]
+        context = reach(elements, SuperExpressive._resolve_reference, _unescape_special)
+        previous = list(previous_matches)
+        if previous and isinstance(previous[0], re.Match):
+            previous = [match.span() for match in previous]
+        return rematch(regex, width, context, previous, offset, removed, len(inserted), new_text)
+
+    def __is_anchored_at_start(self, flags: str) -> bool:
+        # whether every match starts at the start of the string
+        elements = self.__stack[-1].elements
+        return bool(elements) and (
+            elements[0].type == "start_of_string"
+            or elements[0].type == "start_of_input" and self.__has_defined_start and "m" not in flags
+        )
+
+    def _pattern_and_flags(self) -> tuple[str, str]:
+        return self.__get_regex_pattern(), self.__get_regex_flags()
+
+    def _first_chars(self) -> str | None:
+        return first_chars(
+            self.__stack[-1].elements,
+            SuperExpressive.__evaluate, _escape_special, _unescape_special, SuperExpressive._resolve_reference
+        )
+
+    def __next(self) -> "SuperExpressive":
+        # the fluent methods return a modified copy, except while loading an AST (see from_ast)
+        return self if self.__in_place else _deepcopy(self)
+
     def __apply_quantifier(self, element: _Token) -> _Token:
         current_frame = self.__stack[-1]
         if current_frame.quantifier:
@@ -757,13 +1625,13 @@ class SuperExpressive:
         return element
 
     def __frame_creating_element(self, type_fn) -> "SuperExpressive":
-        next = deepcopy(self)
+        next = self.__next()
         new_frame = _StackFrame(type_fn)
         next.__stack.append(new_frame)
         return next
 
     def __match_element(self, type_fn) -> "SuperExpressive":
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
         current_frame.elements.append(
             next.__apply_quantifier(type_fn)
@@ -771,7 +1639,7 @@ class SuperExpressive:
         return next
 
     def __quantifier_element(self, type_fn_name: str) -> "SuperExpressive":
-        next = deepcopy(self)
+        next = self.__next()
         current_frame = next.__stack[-1]
 
         if current_frame.quantifier:
@@ -821,7 +1689,10 @@ class SuperExpressive:
         parent: "SuperExpressive",
         capture_groups_counter: dict[str, int]
     ) -> _Token:
-        next_element = deepcopy(element)
+        record = _recorder
+        if record is not None:
+            record("builder", "merge_subexpression", 0.0, 1)
+        next_element = _deepcopy(element)
         
         if next_element.contains_child:
             assert next_element.value
@@ -845,6 +1716,8 @@ class SuperExpressive:
                 capture_groups_counter["count"] += 1
             
             case "named_capture":
+                # named groups are numbered as well
+                capture_groups_counter["count"] += 1
                 group_name = (
                     f"{options.namespace}{next_element.name}"
                     if options.namespace
@@ -861,41 +1734,252 @@ class SuperExpressive:
                     else next_element.name
                 )
 
-            case 'start_of_input':
-                if options.ignore_start_and_end:
-                    return _Tokens.noop
+            case "subexpression_ref":
+                inner = next_element.value
+                next_element.value = _FragmentRef(
+                    inner.fragment,
+                    namespace=options.namespace + inner.namespace,
+                    capture_offset=inner.capture_offset + parent.__total_capture_groups,
+                    ignore_start_and_end=options.ignore_start_and_end or inner.ignore_start_and_end
+                )
 
-                if parent.__has_defined_start:
-                    raise RegexError(
-                        "The parent regex already has a defined start of input. "
-                        "You can ignore a subexpressions start_of_input/end_of_input markers "
-                        "with the ignore_start_and_end option"
-                    )
+                for name in inner.fragment.named_groups:
+                    parent.__track_named_group(f"{next_element.value.namespace}{name}")
+                capture_groups_counter["count"] += inner.fragment.capture_groups
 
-                if parent.__has_defined_end:
-                    raise RegexError(
-                        "The parent regex already has a defined end of input. "
-                        "You can ignore a subexpressions start_of_input/end_of_input markers "
-                        "with the ignore_start_and_end option"
-                    )
+                if not next_element.value.ignore_start_and_end and options.track_start_and_end:
+                    if inner.fragment.has_defined_start:
+                        parent.__define_subexpression_start()
+                    if inner.fragment.has_defined_end:
+                        parent.__define_subexpression_end()
 
-                parent.__has_defined_start = True
+            case 'start_of_input':
+                if options.ignore_start_and_end:
+                    return _Tokens.noop
+                if options.track_start_and_end:
+                    parent.__define_subexpression_start()
 
             case "end_of_input":
                 if options.ignore_start_and_end:
                     return _Tokens.noop
-
-                if parent.__has_defined_end:
-                    raise RegexError(
-                        "The parent regex already has a defined end of input. "
-                        "You can ignore a subexpressions start_of_input/end_of_input markers "
-                        "with the ignore_start_and_end option"
-                    )
-                
-                parent.__has_defined_end = True
+                if options.track_start_and_end:
+                    parent.__define_subexpression_end()
 
         return next_element
 
+    def __define_subexpression_start(self) -> None:
+        if self.__has_defined_start:
+            raise RegexError(
+                "The parent regex already has a defined start of input. "
+                "You can ignore a subexpressions start_of_input/end_of_input markers "
+                "with the ignore_start_and_end option"
+            )
+
+        if self.__has_defined_end:
+            raise RegexError(
+                "The parent regex already has a defined end of input. "
+                "You can ignore a subexpressions start_of_input/end_of_input markers "
+                "with the ignore_start_and_end option"
+            )
+
+        self.__has_defined_start = True
+
+    def __define_subexpression_end(self) -> None:
+        if self.__has_defined_end:
+            raise RegexError(
+                "The parent regex already has a defined end of input. "
+                "You can ignore a subexpressions start_of_input/end_of_input markers "
+                "with the ignore_start_and_end option"
+            )
+        
+        self.__has_defined_end = True
+
+    def __reference_subexpression(self, expr: "SuperExpressive", options: _SubOptions) -> _Token:
+        fragment = SuperExpressive.__freeze(expr)
+        reference = _FragmentRef(
+            fragment,
+            namespace=options.namespace,
+            capture_offset=self.__total_capture_groups,
+            ignore_start_and_end=options.ignore_start_and_end
+        )
+
+        for name in fragment.named_groups:
+            self.__track_named_group(f"{options.namespace}{name}")
+        self.__total_capture_groups += fragment.capture_groups
+
+        if not options.ignore_start_and_end and options.track_start_and_end:
+            if fragment.has_defined_start:
+                self.__define_subexpression_start()
+            if fragment.has_defined_end:
+                self.__define_subexpression_end()
+
+        return _Tokens.subexpression_ref(reference)
+
+    @staticmethod
+    def __to_node(element: _Token) -> dict:
+        if element.type == "subexpression_ref":
+            return {
+                "type": "subexpression",
+                "children": [
+                    SuperExpressive.__to_node(child)
+                    for child in SuperExpressive._resolve_reference(element.value)
+                ]
+            }
+
+        node: dict = { "type": element.type }
+        match element.type:
+            case "char" | "string" | "any_of_chars" | "anything_but_chars":
+                node["value"] = _unescape_special(element.value)
+            case "anything_but_string" | "param":
+                node["value"] = element.value
+            case "range" | "anything_but_range":
+                node["value"] = list(element.value)
+
+        if element.name:
+            node["name"] = element.name
+        if element.index:
+            node["index"] = element.index
+        if element.times:
+            node["times"] = list(element.times) if isinstance(element.times, (list, tuple)) else element.times
+
+        if element.contains_child:
+            node["child"] = SuperExpressive.__to_node(element.value)
+        elif element.contains_children:
+            node["children"] = [SuperExpressive.__to_node(child) for child in element.value]
+        return node
+
+    def __replay(self, node: dict) -> None:
+        # applies the fluent method creating the element in place
+        if not isinstance(node, dict) or not isinstance(node.get("type"), str):
+            raise RegexError(f"an element must be a dict with a type (got {node!r})")
+
+        type = node["type"]
+        if type in _leaf_types:
+            getattr(self, type)
+        elif type in ("char", "string", "any_of_chars", "anything_but_chars", "anything_but_string"):
+            getattr(self, type)(node.get("value"))
+        elif type in ("range", "anything_but_range"):
+            value = node.get("value")
+            if not isinstance(value, (list, tuple)) or len(value) != 2:
+                raise RegexError(f"the value of {type} must be a pair of characters (got {value!r})")
+            getattr(self, type)(*value)
+        elif type == "backreference":
+            self.backreference(node.get("index"))
+        elif type == "named_backreference":
+            self.named_backreference(node.get("name"))
+        elif type == "param":
+            self.param(node.get("name"), kind=node.get("value", "string"))
+        elif type == "noop":
+            self.__stack[-1].elements.append(_Tokens.noop)
+        elif type in _container_types:
+            if type == "named_capture":
+                self.named_capture(node.get("name"))
+            elif type == "subexpression":
+                self.__stack.append(_StackFrame(_subexpression_frame))
+            else:
+                getattr(self, type)
+
+            children = node.get("children")
+            if not isinstance(children, list):
+                raise RegexError(f"the children of {type} must be a list (got {children!r})")
+            for child in children:
+                self.__replay(child)
+            self.end()
+        elif type in _quantifier_table:
+            times = node.get("times")
+            if type in ("exactly", "at_least"):
+                getattr(self, type)(times)
+            elif type in ("between", "between_lazy"):
+                if not isinstance(times, (list, tuple)) or len(times) != 2:
+                    raise RegexError(f"the times of {type} must be a pair of integers (got {times!r})")
+                getattr(self, type)(*times)
+            else:
+                getattr(self, type)
+
+            child = node.get("child")
+            self.__replay(child)
+            if self.__stack[-1].quantifier is not None:
+                raise RegexError(f"cannot quantify regular expression with '{type}' ({child['type']} cannot be quantified)")
+        else:
+            raise RegexError(f"unknown element type: {type}")
+
+    @staticmethod
+    def __freeze(expr: "SuperExpressive") -> _Fragment:
+        fragment = _fragments.get(expr)
+        if fragment is None:
+            elements = expr.__stack[-1].elements
+            fragment = _Fragment(
+                elements=elements,
+                named_groups=list(expr.__named_groups),
+                capture_groups=sum(SuperExpressive.__count_captures(element) for element in elements),
+                has_defined_start=expr.__has_defined_start,
+                has_defined_end=expr.__has_defined_end
+            )
+            _fragments[expr] = fragment
+        return fragment
+
+    @staticmethod
+    def __count_captures(element: _Token) -> int:
+        # mirrors the capture groups counted by __merge_subexpression
+        if element.type == "subexpression_ref":
+            return element.value.fragment.capture_groups
+
+        count = 1 if element.type in ("capture", "named_capture") else 0
+        if element.contains_child:
+            count += SuperExpressive.__count_captures(element.value)
+        elif element.contains_children:
+            count += sum(SuperExpressive.__count_captures(child) for child in element.value)
+        return count
+
+    @staticmethod
+    def _resolve_reference(reference: _FragmentRef) -> list[_Token]:
+        """Returns the elements of a referenced subexpression with its merge options applied."""
+        fragment = reference.fragment
+        rebased = fragment.rebased.get(reference.key)
+        if rebased is None:
+            rebased = [
+                SuperExpressive.__rebase(element, reference)
+                for element in fragment.elements
+            ]
+            fragment.rebased[reference.key] = rebased
+        return rebased
+
+    @staticmethod
+    def __rebase(element: _Token, reference: _FragmentRef) -> _Token:
+        # the lazy counterpart of __merge_subexpression: returns new tokens instead of 
+        # modifying the shared ones, and leaves the validation to the time of embedding
+        namespaced = lambda name: f"{reference.namespace}{name}"
+
+        match element.type:
+            case "backreference":
+                return replace(element, index=element.index + reference.capture_offset)
+
+            case "named_backreference":
+                return replace(element, name=namespaced(element.name))
+
+            case "start_of_input" | "end_of_input":
+                return _Tokens.noop if reference.ignore_start_and_end else element
+
+            case "subexpression_ref":
+                inner = element.value
+                return _Tokens.subexpression_ref(_FragmentRef(
+                    inner.fragment,
+                    namespace=reference.namespace + inner.namespace,
+                    capture_offset=reference.capture_offset + inner.capture_offset,
+                    ignore_start_and_end=reference.ignore_start_and_end or inner.ignore_start_and_end
+                ))
+
+        if element.contains_child:
+            element = replace(element, value=SuperExpressive.__rebase(element.value, reference))
+        elif element.contains_children:
+            element = replace(element, value=[
+                SuperExpressive.__rebase(child, reference) for child in element.value
+            ])
+
+        if element.type == "named_capture":
+            element = replace(element, name=namespaced(element.name))
+        return element
+
     @staticmethod
     def __evaluate(element: _Token) -> str:
         match element.type:
@@ -956,6 +2040,9 @@ class SuperExpressive:
             case "named_backreference": 
                 return f"(?P={element.name})"
 
+            case "param":
+                return slot(element.name, element.value)
+
             case ("optional" | "zero_or_more" | "zero_or_more_lazy" | 
                                 "one_or_more" | "one_or_more_lazy"):
                 assert element.value
@@ -1031,11 +2118,32 @@ class SuperExpressive:
                 evaluated = [SuperExpressive.__evaluate(child) for child in element.value]
                 return ''.join(evaluated)
 
+            case "subexpression_ref":
+                fragment, key = element.value.fragment, element.value.key
+                rendered = fragment.rendered.get(key)
+                if rendered is None:
+                    evaluated = [
+                        SuperExpressive.__evaluate(child)
+                        for child in SuperExpressive._resolve_reference(element.value)
+                    ]
+                    rendered = fragment.rendered[key] = ''.join(evaluated)
+                return rendered
+
             case _: 
                 raise RegexError(f"Can't process unsupported element type: {element.type}")
 
 
     def __get_regex_pattern(self) -> str:
+        pattern = self.__render()
+        if MARK in pattern:
+            names = sorted({ name for name, _ in Template(pattern, "", _escape_table).slots })
+            raise RegexError(
+                f"Cannot render a template with unbound parameters ({', '.join(names)}).\n"
+                "(Try binding them with .bind())"
+            )
+        return pattern
+
+    def __render(self) -> str:
         if len(self.__stack) != 1:
             current_frame = self.__stack[-1]
             raise RegexError(
@@ -1131,3 +2239,31 @@ class SuperExpressive:
         Python does not have a `y` flag.
         """
         return self
+
+
+def _time_fluent_methods() -> None:
+    # wraps the public methods once, at import: the render and compile phases are timed by themselves
+    phases = { vars(SuperExpressive)["to_regex"], vars(SuperExpressive)["to_regex_string"] }
+    wrapped: dict[int, Any] = {}
+    for attr, value in list(vars(SuperExpressive).items()):
+        if attr.startswith("_") or value in phases:
+            continue
+        if id(value) not in wrapped:
+            if isinstance(value, property):
+                assert value.fget
+                wrapped[id(value)] = property(_timed_method(value.fget), doc=value.__doc__)
+            elif isinstance(value, staticmethod):
+                wrapped[id(value)] = staticmethod(_timed_method(value.__func__))
+            elif callable(value):
+                wrapped[id(value)] = _timed_method(value)
+            else:
+                continue
+        setattr(SuperExpressive, attr, wrapped[id(value)])
+
+
+_time_fluent_methods()
+
+
+def _from_tuple(state: tuple) -> SuperExpressive:
+    # the unpickling counterpart of SuperExpressive.__reduce__
+    return SuperExpressive.from_tuple(state)
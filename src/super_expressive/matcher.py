@@ -0,0 +1,274 @@
+"""Matchers choosing the cheapest entry point of `re` for a SuperExpression,
+see `SuperExpressive.matcher()`. \n
+The anchors of the expression decide the entry point: `fullmatch()` when it is anchored
+at both ends with `.start_of_string`/`.start_of_input` and `.end_of_string`, `match()`
+when it is anchored at the start only, `search()` otherwise. The anchors made redundant
+by the entry point are stripped from the compiled pattern. \n
+The widths of the elements bound the length of the matches, so that inputs too short
+(or too long, for `fullmatch()`) are rejected without running the regex,
+and expressions that are a plain string are tested with string operations.
+"""
+import re
+from typing import Any, Callable
+
+
+_zero_width = (
+    "start_of_string", "end_of_string", "start_of_input", "end_of_input",
+    "word_boundary", "non_word_boundary", "noop",
+    "assert_ahead", "assert_not_ahead", "assert_behind", "assert_not_behind",
+)
+_single_char = (
+    "any_char", "whitespace_char", "non_whitespace_char", "digit", "non_digit", "word", "non_word",
+    "new_line", "carriage_return", "tab", "null_byte",
+    "range", "any_of_chars", "anything_but_chars", "anything_but_range",
+)
+
+
+def widths(element, resolve: Callable[[Any], list], unescape: Callable[[str], str]) -> tuple[int, int | None]:
+    """Returns the minimum and maximum length of the matches of the element (None if unbounded)."""
+    match element.type:
+        case type if type in _zero_width:
+            return 0, 0
+        case type if type in _single_char:
+            return 1, 1
+        case "char" | "string":
+            width = len(unescape(element.value))
+            return width, width
+        case "anything_but_string":
+            return len(element.value), len(element.value)
+        case "capture" | "named_capture" | "group" | "subexpression":
+            return sequence_widths(element.value, resolve, unescape)
+        case "subexpression_ref":
+            return sequence_widths(resolve(element.value), resolve, unescape)
+        case "any_of":
+            children = [widths(child, resolve, unescape) for child in element.value]
+            maxima = [maximum for _, maximum in children]
+            return min(minimum for minimum, _ in children), None if None in maxima else max(maxima)  # type: ignore
+
+    if element.contains_child:
+        minimum, maximum = widths(element.value, resolve, unescape)
+        low, high = repeats(element)
+        return (
+            minimum * low,
+            0 if maximum == 0 else None if maximum is None or high is None else maximum * high
+        )
+    # backreferences match whatever their group matched
+    return 0, None
+
+
+def sequence_widths(elements: list, resolve: Callable[[Any], list], unescape: Callable[[str], str]) -> tuple[int, int | None]:
+    """Returns the minimum and maximum length of the matches of the elements in sequence."""
+    low, high = 0, 0
+    for element in elements:
+        minimum, maximum = widths(element, resolve, unescape)
+        low += minimum
+        high = None if high is None or maximum is None else high + maximum
+    return low, high
+
+
+def repeats(element) -> tuple[int, int | None]:
+    """Returns the minimum and maximum number of repetitions of a quantifier (None if unbounded)."""
+    match element.type:
+        case "optional":
+            return 0, 1
+        case "zero_or_more" | "zero_or_more_lazy":
+            return 0, None
+        case "one_or_more" | "one_or_more_lazy":
+            return 1, None
+        case "exactly":
+            return element.times, element.times
+        case "at_least":
+            return element.times, None
+        case _:  # between, between_lazy
+            return element.times[0], element.times[1]
+
+
+def first_chars(
+    elements: list,
+    render: Callable[[Any], str],
+    escape: Callable[[str], str],
+    unescape: Callable[[str], str],
+    resolve: Callable[[Any], list]
+) -> str | None:
+    """Returns the body of a character class matching the first character of every match
+    of the elements in sequence, or None if they may match the empty string,
+    start with any character or with a negated class.
+    """
+    def sequence(elements: list) -> tuple[list[str], bool] | None:
+        # the class atoms of the first consumed character, and whether the elements may consume none
+        atoms: list[str] = []
+        for element in elements:
+            first = single(element)
+            if first is None:
+                return None
+            atoms += first[0]
+            if not first[1]:
+                return atoms, False
+        return atoms, True
+
+    def single(element) -> tuple[list[str], bool] | None:
+        match element.type:
+            case type if type in _zero_width:
+                return [], True
+            case "string":
+                return [escape(unescape(element.value)[0])], False
+            case type if type in _single_char or type == "char":
+                rendered = render(element)
+                if rendered == "." or rendered.startswith("[^"):
+                    return None
+                return [rendered[1:-1] if rendered.startswith("[") else rendered], False
+            case "capture" | "named_capture" | "group" | "subexpression":
+                return sequence(element.value)
+            case "subexpression_ref":
+                return sequence(resolve(element.value))
+            case "any_of":
+                children = [single(child) for child in element.value]
+                if None in children:
+                    return None
+                return [atom for atoms, _ in children for atom in atoms], any(nullable for _, nullable in children)  # type: ignore
+        if element.contains_child:
+            first = single(element.value)
+            return None if first is None else (first[0], first[1] or repeats(element)[0] == 0)
+        # backreferences, parameters, anything_but_string
+        return None
+
+    first = sequence(elements)
+    if first is None or first[1]:
+        return None
+    return "".join(dict.fromkeys(first[0]))
+
+
+class Matcher:
+    """Tests and finds the matches of a SuperExpression in strings,
+    as `regex.search()` does, through the cheapest entry point of `re`.
+    """
+    __slots__ = ("regex", "mode", "min_width", "max_width", "literal", "_entry")
+
+    def __init__(self,
+        regex: re.Pattern,
+        mode: str,
+        min_width: int,
+        max_width: int | None,
+        literal: str | None = None
+    ) -> None:
+        self.regex = regex
+        self.mode = mode
+        self.min_width = min_width
+        # only bounds the inputs of fullmatch()
+        self.max_width = max_width if mode == "fullmatch" else None
+        self.literal = literal
+        self._entry = getattr(regex, mode)
+
+    def test(self, s: str) -> bool:
+        """Returns whether the SuperExpression matches somewhere in `s`."""
+        length = len(s)
+        if length < self.min_width or self.max_width is not None and length > self.max_width:
+            return False
+        literal = self.literal
+        if literal is not None:
+            if self.mode == "fullmatch":
+                return s == literal
+            if self.mode == "match":
+                return s.startswith(literal)
+            return literal in s
+        return self._entry(s) is not None
+
+    def find(self, s: str) -> re.Match | None:
+        """Returns the first match of the SuperExpression in `s`, or None. \n
+        The match has the same span and groups as the one of `regex.search()`.
+        """
+        length = len(s)
+        if length < self.min_width or self.max_width is not None and length > self.max_width:
+            return None
+        if self.literal is not None and self.literal not in s:
+            return None
+        return self._entry(s)
+
+    def __repr__(self) -> str:
+        return f"Matcher({self.regex.pattern!r}, mode={self.mode!r})"
+
+
+class LiteralMatcher:
+    """Tests a plain string with string operations: `in`, `startswith`, `endswith`
+    or `==`, depending on its anchors (at the end of the input, before a trailing newline as well).
+    `find(s)` runs the string compiled as `regex`: with `search()`, `match()` or `fullmatch()`
+    when the anchors allow it, otherwise only at the position found by `endswith`.
+    The `test(s)` and `find(s)` functions are chosen once for the anchors.
+    """
+    __slots__ = ("regex", "literal", "start", "end", "test", "find")
+
+    def __init__(self, regex: re.Pattern, literal: str, start: bool = False, end: str = "") -> None:
+        self.regex = regex
+        self.literal = literal
+        self.start = start
+        # "", "end_of_string" or "end_of_input"
+        self.end = end
+
+        match = regex.match
+        width = len(literal)
+        line = literal + "\n"
+        test: Callable[[str], bool]
+        find: Callable[[str], re.Match | None]
+        match start, end:
+            case False, "":
+                test, find = lambda s: literal in s, regex.search
+            case True, "":
+                test, find = lambda s: s.startswith(literal), regex.match
+            case True, "end_of_string":
+                test, find = lambda s: s == literal, regex.fullmatch
+            case False, "end_of_string":
+                test = lambda s: s.endswith(literal)
+                find = lambda s: match(s, len(s) - width) if s.endswith(literal) else None
+            case False, _:
+                test = lambda s: s.endswith(literal) or s.endswith(line)
+                def find(s):
+                    # the leftmost match ends before the trailing newline, if any
+                    if s.endswith(line):
+                        return match(s, len(s) - width - 1)
+                    return match(s, len(s) - width) if s.endswith(literal) else None
+            case True, _:
+                test = lambda s: s == literal or s == line
+                find = lambda s: match(s) if s == literal or s == line else None
+        self.test = test
+        self.find = find
+
+    def __repr__(self) -> str:
+        return f"LiteralMatcher({self.literal!r}, start={self.start!r}, end={self.end!r})"
+
+
+class CharClassMatcher:
+    """Tests the runs of the characters of a class (`.one_or_more.any_of_chars(...)`)
+    with set and `str.strip` operations, anchored at the start, at the end of the string, or both.
+    `find(s)` runs the class compiled as `regex`: with `search()`, `match()` or `fullmatch()`
+    when the anchors allow it, otherwise only at the start of the run found by `rstrip`.
+    The `test(s)` and `find(s)` functions are chosen once for the anchors.
+    """
+    __slots__ = ("regex", "chars", "start", "end", "test", "find")
+
+    def __init__(self, regex: re.Pattern, chars: str, start: bool = False, end: bool = False) -> None:
+        self.regex = regex
+        self.chars = members = frozenset(chars)
+        self.start = start
+        self.end = end
+
+        match = regex.match
+        strip = "".join(sorted(members))
+        test: Callable[[str], bool]
+        find: Callable[[str], re.Match | None]
+        match start, end:
+            case False, False:
+                test, find = lambda s: not members.isdisjoint(s), regex.search
+            case True, False:
+                test, find = lambda s: s[:1] in members, regex.match
+            case True, True:
+                test, find = lambda s: s != "" and not s.lstrip(strip), regex.fullmatch
+            case False, True:
+                test = lambda s: s[-1:] in members
+                def find(s):
+                    start = len(s.rstrip(strip))
+                    return match(s, start) if start != len(s) else None
+        self.test = test
+        self.find = find
+
+    def __repr__(self) -> str:
+        return f"CharClassMatcher({''.join(sorted(self.chars))!r}, start={self.start!r}, end={self.end!r})"
@@ -0,0 +1,152 @@
+"""Memoized matching of repeated inputs, see `SuperExpressive.memoize()`. \n
+Log lines, user agents or paths repeat a lot: a `MemoMatcher` keeps the compact result
+of the search of every input (a bool, a span or a tuple of groups, never the `re.Match`)
+in a bounded cache keyed by the input itself, evicting the least recently used entry
+(`"lru"`) or the first entry not used since the clock hand last passed it (`"clock"`,
+which only sets a bit on hits instead of reordering the cache). Inputs longer than
+`max_length` are matched without being cached, so that a few huge inputs don't flush the cache.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+
+RESULTS = ("bool", "span", "groups")
+POLICIES = ("lru", "clock")
+
+_missing = object()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """The counters of a `MemoMatcher` since its creation or its last `clear()`."""
+    hits: int
+    misses: int
+    # the inputs longer than max_length, matched without being cached
+    uncached: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class MemoMatcher:
+    """Searches inputs with `compute` and memoizes the results of the inputs
+    of at most `max_length` characters, at most `maxsize` of them.
+    """
+
+    def __init__(self,
+        compute: Callable[[str], Any],
+        maxsize: int,
+        policy: str,
+        max_length: int
+    ) -> None:
+        self.compute = compute
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_length = max_length
+        self._lock = threading.Lock()
+        self.clear()
+
+    def lookup(self, s: str) -> Any:
+        """Returns the result of the search of `s`, from the cache when possible."""
+        if len(s) > self.max_length:
+            self._uncached += 1
+            return self.compute(s)
+        result = self._get(s)
+        if result is not _missing:
+            return result
+        # computed outside of the lock: concurrent misses of an input compute it twice
+        result = self.compute(s)
+        with self._lock:
+            self._put(s, result)
+        return result
+
+    def lookup_many(self, inputs: Iterable[str]) -> list[Any]:
+        """Returns the results of the searches of `inputs`, in order. \n
+        The inputs are deduplicated first: every distinct input is looked up once
+        (and counted once in the stats), whatever its number of occurrences.
+        """
+        inputs = list(inputs)
+        results = { s: self.lookup(s) for s in dict.fromkeys(inputs) }
+        return [results[s] for s in inputs]
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self._hits, self._misses, self._uncached, self._evictions, len(self._index), self.maxsize)
+
+    def clear(self) -> None:
+        """Empties the cache and resets the stats."""
+        with self._lock:
+            self._hits = self._misses = self._uncached = self._evictions = 0
+            if self.policy == "lru":
+                self._index: Any = OrderedDict()
+                self._get, self._put = self._lru_get, self._lru_put
+            else:
+                # input -> [result, reference bit], and the inputs in the order of the clock
+                self._index = {}
+                self._keys: list[str] = []
+                self._hand = 0
+                self._get, self._put = self._clock_get, self._clock_put
+
+    # hits only run atomic operations of the cache and don't take the lock,
+    # so that the counters are approximate when threads share the matcher
+    def _lru_get(self, s: str) -> Any:
+        index = self._index
+        result = index.get(s, _missing)
+        if result is _missing:
+            self._misses += 1
+            return result
+        self._hits += 1
+        try:
+            index.move_to_end(s)
+        except KeyError:
+            # evicted in the meantime by another thread
+            pass
+        return result
+
+    def _lru_put(self, s: str, result: Any) -> None:
+        index = self._index
+        if s not in index and len(index) >= self.maxsize:
+            index.popitem(last=False)
+            self._evictions += 1
+        index[s] = result
+
+    def _clock_get(self, s: str) -> Any:
+        entry = self._index.get(s)
+        if entry is None:
+            self._misses += 1
+            return _missing
+        self._hits += 1
+        entry[1] = 1
+        return entry[0]
+
+    def _clock_put(self, s: str, result: Any) -> None:
+        index = self._index
+        if s in index:
+            return
+        keys = self._keys
+        if len(keys) < self.maxsize:
+            index[s] = [result, 0]
+            keys.append(s)
+            return
+        # gives the referenced entries a second chance until an unreferenced one comes
+        hand = self._hand
+        while (entry := index[keys[hand]])[1]:
+            entry[1] = 0
+            hand = (hand + 1) % self.maxsize
+        del index[keys[hand]]
+        self._evictions += 1
+        index[s] = [result, 0]
+        keys[hand] = s
+        self._hand = (hand + 1) % self.maxsize
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"MemoMatcher(maxsize={self.maxsize}, policy={self.policy!r}, max_length={self.max_length})"
@@ -0,0 +1,349 @@
+"""Runtime match metrics for compiled patterns. \n
+`SuperExpressive.to_regex(instrumented=True, name=...)` returns an `InstrumentedPattern`,
+a drop-in replacement of `re.Pattern` recording, per pattern name and method,
+call and hit counts along with a latency histogram. \n
+Counters live in per-thread objects that are only ever written by their own thread,
+so recording takes no locks (resetting them records a baseline that exports subtract
+instead of writing to the counters of the other threads). Latencies are only measured for a sample of the calls
+(every `1 / sample_rate`-th call of a thread) to bound the overhead.
+The process-wide `registry` aggregates them on export.
+"""
+import bisect
+import os
+import re
+import threading
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+
+# upper bounds (in seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, float("inf"),
+)
+
+METHODS = ("match", "fullmatch", "search", "findall", "finditer", "sub", "subn", "split")
+
+
+class _MethodCounter:
+    __slots__ = ("calls", "hits", "timeouts", "countdown", "sampled", "latency_sum", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.hits = 0
+        self.timeouts = 0
+        self.countdown = 1
+        self.sampled = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, elapsed: float) -> None:
+        self.sampled += 1
+        self.latency_sum += elapsed
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+
+class PatternMetrics:
+    """The metrics of all the instrumented patterns sharing a name."""
+
+    def __init__(self, name: str, sample_rate: float) -> None:
+        self.name = name
+        self.period = max(1, round(1 / sample_rate))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: list[dict[str, _MethodCounter]] = []
+        # the totals at the last reset, by method
+        self._baseline: dict[str, list[Any]] = {}
+
+    def counters(self) -> dict[str, _MethodCounter]:
+        try:
+            return self._local.counters
+        except AttributeError:
+            counters = { method: _MethodCounter() for method in METHODS }
+            self._local.counters = counters
+            with self._lock:
+                self._threads.append(counters)
+            return counters
+
+    def reset(self) -> None:
+        totals = self.__totals()
+        with self._lock:
+            self._baseline = totals
+
+    def export(self) -> dict[str, dict[str, Any]]:
+        totals = self.__totals()
+        with self._lock:
+            baseline = self._baseline
+
+        exported = {}
+        for method, (calls, hits, timeouts, sampled, latency_sum, buckets) in totals.items():
+            if method in baseline:
+                base_calls, base_hits, base_timeouts, base_sampled, base_latency_sum, base_buckets = baseline[method]
+                calls -= base_calls
+                hits -= base_hits
+                timeouts -= base_timeouts
+                sampled -= base_sampled
+                latency_sum -= base_latency_sum
+                buckets = [count - base for count, base in zip(buckets, base_buckets)]
+            if not calls:
+                continue
+
+            exported[method] = {
+                "calls": calls,
+                "hits": hits,
+                "hit_rate": hits / calls,
+                "timeouts": timeouts,
+                "sampled": sampled,
+                "latency_sum": latency_sum,
+                "buckets": dict(zip(LATENCY_BUCKETS, buckets)),
+            }
+        return exported
+
+    def __totals(self) -> dict[str, list[Any]]:
+        # [calls, hits, timeouts, sampled, latency_sum, buckets] summed over the threads, by method
+        with self._lock:
+            threads = list(self._threads)
+
+        totals = {}
+        for method in METHODS:
+            calls = hits = timeouts = sampled = 0
+            latency_sum = 0.0
+            buckets = [0] * len(LATENCY_BUCKETS)
+            for counters in threads:
+                counter = counters[method]
+                calls += counter.calls
+                hits += counter.hits
+                timeouts += counter.timeouts
+                sampled += counter.sampled
+                latency_sum += counter.latency_sum
+                for i, count in enumerate(counter.buckets):
+                    buckets[i] += count
+            totals[method] = [calls, hits, timeouts, sampled, latency_sum, buckets]
+        return totals
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._patterns: dict[str, PatternMetrics] = {}
+
+    def metrics(self, name: str, sample_rate: float = 1.0) -> PatternMetrics:
+        """Returns the metrics of the patterns called `name`, creating them if needed
+        (the sample rate of the first pattern registered under a name wins).
+        """
+        with self._lock:
+            if name not in self._patterns:
+                self._patterns[name] = PatternMetrics(name, sample_rate)
+            return self._patterns[name]
+
+    def reset(self) -> None:
+        with self._lock:
+            patterns = list(self._patterns.values())
+        for metrics in patterns:
+            metrics.reset()
+
+    def export(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """Returns `{pattern name: {method: {"calls", "hits", "hit_rate", "timeouts", "sampled",
+        "latency_sum", "buckets": {upper bound: count}}}}` for the methods called so far
+        (timeouts are only counted by the `TimeoutMatcher`s, see `super_expressive.timeout`).
+        """
+        with self._lock:
+            patterns = list(self._patterns.values())
+        return {
+            metrics.name: exported
+            for metrics in patterns
+            if (exported := metrics.export())
+        }
+
+    def to_prometheus(self, prefix: str = "super_expressive") -> str:
+        """Renders the metrics in the Prometheus text exposition format."""
+        exported = self.export()
+        calls, hits, timeouts, latency = [], [], [], []
+        for name, methods in exported.items():
+            for method, stats in methods.items():
+                labels = f'pattern="{_escape_label(name)}",method="{method}"'
+                calls.append(f"{prefix}_calls_total{{{labels}}} {stats['calls']}")
+                hits.append(f"{prefix}_hits_total{{{labels}}} {stats['hits']}")
+                timeouts.append(f"{prefix}_timeouts_total{{{labels}}} {stats['timeouts']}")
+
+                cumulative = 0
+                for bound, count in stats["buckets"].items():
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    latency.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                latency.append(f"{prefix}_latency_seconds_sum{{{labels}}} {stats['latency_sum']!r}")
+                latency.append(f"{prefix}_latency_seconds_count{{{labels}}} {stats['sampled']}")
+
+        lines = [
+            f"# HELP {prefix}_calls_total Calls of the pattern methods.",
+            f"# TYPE {prefix}_calls_total counter",
+            *calls,
+            f"# HELP {prefix}_hits_total Calls of the pattern methods that found a match.",
+            f"# TYPE {prefix}_hits_total counter",
+            *hits,
+            f"# HELP {prefix}_timeouts_total Calls of the pattern methods that timed out.",
+            f"# TYPE {prefix}_timeouts_total counter",
+            *timeouts,
+            f"# HELP {prefix}_latency_seconds Latency of the sampled calls of the pattern methods.",
+            f"# TYPE {prefix}_latency_seconds histogram",
+            *latency,
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "super_expressive") -> None:
+        """Atomically writes the metrics to `path` in the Prometheus text exposition format
+        (suitable for the node exporter textfile collector).
+        """
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(temporary, path)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+
+class InstrumentedPattern:
+    """Wraps a compiled `re.Pattern`, recording metrics for every call of its matching methods.
+    Exposes the same API as `re.Pattern`.
+    """
+    __slots__ = ("_regex", "_metrics")
+
+    def __init__(self,
+        regex: re.Pattern,
+        name: str = "",
+        sample_rate: float = 1.0,
+        registry: MetricsRegistry = registry
+    ) -> None:
+        self._regex = regex
+        self._metrics = registry.metrics(name or regex.pattern, sample_rate)
+
+    @property
+    def metrics(self) -> PatternMetrics:
+        return self._metrics
+
+    def __call(self, method: str, fn: Callable, args: tuple, kwargs: dict) -> tuple[_MethodCounter, Any]:
+        counter = self._metrics.counters()[method]
+        counter.calls += 1
+        counter.countdown -= 1
+        if counter.countdown:
+            return counter, fn(*args, **kwargs)
+
+        counter.countdown = self._metrics.period
+        started = perf_counter()
+        result = fn(*args, **kwargs)
+        counter.observe(perf_counter() - started)
+        return counter, result
+
+    def match(self, *args, **kwargs) -> re.Match | None:
+        counter, result = self.__call("match", self._regex.match, args, kwargs)
+        if result is not None:
+            counter.hits += 1
+        return result
+
+    def fullmatch(self, *args, **kwargs) -> re.Match | None:
+        counter, result = self.__call("fullmatch", self._regex.fullmatch, args, kwargs)
+        if result is not None:
+            counter.hits += 1
+        return result
+
+    def search(self, *args, **kwargs) -> re.Match | None:
+        counter, result = self.__call("search", self._regex.search, args, kwargs)
+        if result is not None:
+            counter.hits += 1
+        return result
+
+    def findall(self, *args, **kwargs) -> list:
+        counter, result = self.__call("findall", self._regex.findall, args, kwargs)
+        if result:
+            counter.hits += 1
+        return result
+
+    def finditer(self, *args, **kwargs) -> Iterator[re.Match]:
+        # the latency of a finditer call is the time spent producing its matches
+        counter = self._metrics.counters()["finditer"]
+        counter.calls += 1
+        counter.countdown -= 1
+        sampled = not counter.countdown
+        if sampled:
+            counter.countdown = self._metrics.period
+        return self.__iterate(counter, self._regex.finditer(*args, **kwargs), sampled)
+
+    @staticmethod
+    def __iterate(counter: _MethodCounter, matches: Iterator[re.Match], sampled: bool) -> Iterator[re.Match]:
+        found = False
+        elapsed = 0.0
+        try:
+            while True:
+                started = perf_counter()
+                item = next(matches, None)
+                elapsed += perf_counter() - started
+                if item is None:
+                    break
+                found = True
+                yield item
+        finally:
+            if found:
+                counter.hits += 1
+            if sampled:
+                counter.observe(elapsed)
+
+    def sub(self, repl, string, count=0) -> str:
+        counter, (result, n) = self.__call("sub", self._regex.subn, (repl, string, count), {})
+        if n:
+            counter.hits += 1
+        return result
+
+    def subn(self, repl, string, count=0) -> tuple[str, int]:
+        counter, result = self.__call("subn", self._regex.subn, (repl, string, count), {})
+        if result[1]:
+            counter.hits += 1
+        return result
+
+    def split(self, string, maxsplit=0) -> list:
+        counter, result = self.__call("split", self._regex.split, (string, maxsplit), {})
+        if len(result) > 1:
+            counter.hits += 1
+        return result
+
+    @property
+    def pattern(self):
+        return self._regex.pattern
+
+    @property
+    def flags(self) -> int:
+        return self._regex.flags
+
+    @property
+    def groups(self) -> int:
+        return self._regex.groups
+
+    @property
+    def groupindex(self):
+        return self._regex.groupindex
+
+    @property
+    def regex(self) -> re.Pattern:
+        """The wrapped, uninstrumented pattern."""
+        return self._regex
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, InstrumentedPattern):
+            return self._regex == other._regex
+        return self._regex == other
+
+    def __hash__(self) -> int:
+        return hash(self._regex)
+
+    def __repr__(self) -> str:
+        return f"InstrumentedPattern({self._regex!r}, name={self._metrics.name!r})"
+
+    def __copy__(self) -> "InstrumentedPattern":
+        return self
+
+    def __deepcopy__(self, memo) -> "InstrumentedPattern":
+        return self
@@ -0,0 +1,205 @@
+"""Converts regular expression strings into the AST of `SuperExpressive.to_ast()`,
+using the parser of the standard library. \n
+Constructs without a SuperExpressive counterpart (scoped inline flags, empty,
+conditional and atomic groups, possessive and lazy unbounded `{n,}?` repeats, quantified
+anchors and word boundaries, negated sets of character classes, the locale flag...) raise `ValueError`.
+"""
+from typing import Any
+
+try:
+    from re import _constants as _sre, _parser
+except ImportError:  # Python < 3.11
+    import sre_constants as _sre  # type: ignore
+    import sre_parse as _parser  # type: ignore
+
+
+_flag_letters = { _sre.SRE_FLAG_ASCII: "a", _sre.SRE_FLAG_IGNORECASE: "i", _sre.SRE_FLAG_MULTILINE: "m", _sre.SRE_FLAG_DOTALL: "s" }
+_unsupported_flags = _sre.SRE_FLAG_LOCALE | _sre.SRE_FLAG_DEBUG
+
+_anchors = {
+    _sre.AT_BEGINNING: "start_of_input",
+    _sre.AT_END: "end_of_input",
+    _sre.AT_BEGINNING_STRING: "start_of_string",
+    _sre.AT_END_STRING: "end_of_string",
+    _sre.AT_BOUNDARY: "word_boundary",
+    _sre.AT_NON_BOUNDARY: "non_word_boundary",
+}
+
+_categories = {
+    _sre.CATEGORY_DIGIT: "digit",
+    _sre.CATEGORY_NOT_DIGIT: "non_digit",
+    _sre.CATEGORY_SPACE: "whitespace_char",
+    _sre.CATEGORY_NOT_SPACE: "non_whitespace_char",
+    _sre.CATEGORY_WORD: "word",
+    _sre.CATEGORY_NOT_WORD: "non_word",
+}
+_negated_categories = {
+    _sre.CATEGORY_DIGIT: "non_digit",
+    _sre.CATEGORY_NOT_DIGIT: "digit",
+    _sre.CATEGORY_SPACE: "non_whitespace_char",
+    _sre.CATEGORY_NOT_SPACE: "whitespace_char",
+    _sre.CATEGORY_WORD: "non_word",
+    _sre.CATEGORY_NOT_WORD: "word",
+}
+
+_assertions = {
+    (_sre.ASSERT, 1): "assert_ahead",
+    (_sre.ASSERT, -1): "assert_behind",
+    (_sre.ASSERT_NOT, 1): "assert_not_ahead",
+    (_sre.ASSERT_NOT, -1): "assert_not_behind",
+}
+
+
+def parse(pattern: str) -> dict[str, Any]:
+    """Returns the AST of the SuperExpression equivalent to `pattern`."""
+    if not isinstance(pattern, str):
+        raise ValueError(f"pattern must be a string (got {pattern!r})")
+    try:
+        parsed = _parser.parse(pattern)
+    except _sre.error as e:
+        raise ValueError(f"invalid regular expression {pattern!r}: {e}") from None
+
+    state = parsed.state
+    if state.flags & _unsupported_flags:
+        raise ValueError("the LOCALE and DEBUG flags are not supported")
+
+    named_groups = { index: name for name, index in state.groupdict.items() }
+    return {
+        "version": 1,
+        "flags": "".join(letter for flag, letter in _flag_letters.items() if state.flags & flag),
+        "elements": _Converter(named_groups).sequence(parsed),
+    }
+
+
+class _Converter:
+    def __init__(self, named_groups: dict[int, str]) -> None:
+        self.named_groups = named_groups
+
+    def sequence(self, items) -> list[dict[str, Any]]:
+        nodes: list[dict[str, Any]] = []
+        literals: list[str] = []
+        for op, av in items:
+            if op is _sre.LITERAL:
+                literals.append(chr(av))
+                continue
+            if literals:
+                nodes.append(_literal(literals))
+                literals = []
+            nodes.append(self.item(op, av))
+        if literals:
+            nodes.append(_literal(literals))
+        return nodes
+
+    def single(self, items) -> dict[str, Any]:
+        # a lone element, grouping the sequences of several elements
+        nodes = self.sequence(items)
+        if len(nodes) == 1:
+            return nodes[0]
+        return { "type": "group", "children": nodes }
+
+    def item(self, op, av) -> dict[str, Any]:
+        if op is _sre.LITERAL:
+            return { "type": "char", "value": chr(av) }
+        if op is _sre.NOT_LITERAL:
+            return { "type": "anything_but_chars", "value": chr(av) }
+        if op is _sre.ANY:
+            return { "type": "any_char" }
+        if op is _sre.AT:
+            return { "type": _anchors[av] }
+        if op is _sre.IN:
+            return _charset(av)
+        if op is _sre.BRANCH:
+            branches = av[1]
+            if any(not branch for branch in branches[:-1]):
+                raise ValueError("empty alternatives are only supported last")
+            if branches[-1]:
+                return { "type": "any_of", "children": [self.single(branch) for branch in branches] }
+            # (a|b|) is (?:a|b)?
+            if len(branches) == 2:
+                return { "type": "optional", "child": self.single(branches[0]) }
+            return {
+                "type": "optional",
+                "child": { "type": "any_of", "children": [self.single(branch) for branch in branches[:-1]] }
+            }
+        if op is _sre.SUBPATTERN:
+            group, add_flags, del_flags, items = av
+            if add_flags or del_flags:
+                raise ValueError("scoped inline flags are not supported")
+            if not items:
+                raise ValueError("empty groups are not supported")
+            children = self.sequence(items)
+            if group is None:
+                return { "type": "group", "children": children }
+            if group in self.named_groups:
+                return { "type": "named_capture", "name": self.named_groups[group], "children": children }
+            return { "type": "capture", "children": children }
+        if op is _sre.GROUPREF:
+            if av in self.named_groups:
+                return { "type": "named_backreference", "name": self.named_groups[av] }
+            return { "type": "backreference", "index": av }
+        if op in (_sre.MAX_REPEAT, _sre.MIN_REPEAT):
+            return self.repeat(op is _sre.MIN_REPEAT, *av)
+        if (op, av[0] if op in (_sre.ASSERT, _sre.ASSERT_NOT) else None) in _assertions:
+            return { "type": _assertions[op, av[0]], "children": self.sequence(av[1]) }
+        raise ValueError(f"unsupported construct: {str(op).lower()}")
+
+    def repeat(self, lazy: bool, low: int, high: int, items) -> dict[str, Any]:
+        child = self.single(items)
+        if child["type"] in _anchors.values():
+            # rendered without a group, e.g. \b+, which doesn't compile
+            raise ValueError(f"quantified {child['type']} is not supported")
+        suffix = "_lazy" if lazy else ""
+        if high is _sre.MAXREPEAT:
+            if low in (0, 1):
+                return { "type": ("zero_or_more", "one_or_more")[low] + suffix, "child": child }
+            if lazy:
+                raise ValueError(f"lazy {{{low},}}? repeats are not supported")
+            return { "type": "at_least", "times": low, "child": child }
+        if low == high:
+            if low == 0:
+                raise ValueError("{0} repeats are not supported")
+            return { "type": "exactly", "times": low, "child": child }
+        if (low, high) == (0, 1) and not lazy:
+            return { "type": "optional", "child": child }
+        return { "type": "between" + suffix, "times": [low, high], "child": child }
+
+
+def _literal(chars: list[str]) -> dict[str, Any]:
+    if len(chars) == 1:
+        return { "type": "char", "value": chars[0] }
+    return { "type": "string", "value": "".join(chars) }
+
+
+def _charset(items) -> dict[str, Any]:
+    negated = bool(items) and items[0][0] is _sre.NEGATE
+    if negated:
+        items = items[1:]
+
+    chars, nodes = [], []
+    for op, av in items:
+        if op is _sre.LITERAL:
+            chars.append(chr(av))
+        elif op is _sre.RANGE and av[0] == av[1]:
+            chars.append(chr(av[0]))
+        elif op is _sre.RANGE:
+            nodes.append({ "type": "range", "value": [chr(av[0]), chr(av[1])] })
+        elif op is _sre.CATEGORY and av in _categories:
+            nodes.append({ "type": (_negated_categories if negated else _categories)[av] })
+        else:
+            raise ValueError(f"unsupported construct in a character set: {str(op).lower()}")
+
+    if negated:
+        if chars and not nodes:
+            return { "type": "anything_but_chars", "value": "".join(chars) }
+        if not chars and len(nodes) == 1:
+            node = nodes[0]
+            if node["type"] == "range":
+                return { "type": "anything_but_range", "value": node["value"] }
+            return node
+        raise ValueError("negated character sets may only contain characters, a single range or a single class")
+
+    if chars:
+        nodes.insert(0, _literal(chars) if len(chars) == 1 else { "type": "any_of_chars", "value": "".join(chars) })
+    if len(nodes) == 1:
+        return nodes[0]
+    return { "type": "any_of", "children": nodes }
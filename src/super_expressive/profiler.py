@@ -0,0 +1,212 @@
+"""Cost breakdown of matching an input, see `SuperExpressive.profile_match()`. \n
+The sub-patterns derived from the token tree are timed searching the input:
+
+- the prefixes of the top-level sequence, the difference between consecutive ones being
+  the cost the next element adds,
+- every subtree (`capture`, `named_capture`, `group`, `any_of` and each of its alternatives,
+  quantifiers, lookarounds and subexpressions), followed by what follows it in the expression:
+  a subtree backtracks when the rest of the expression fails, so it is timed with the rest
+  (e.g. `(?:a+)+b` is slow on `aaaa` while `(?:a+)+` alone isn't).
+
+Every sub-pattern is labelled by its builder path: the indexes and kinds of the elements
+from the top-level one down to the subtree, e.g. `1.capture/0.any_of/2.string`
+(the alternatives of an `any_of` and the element repeated by a quantifier are its children).
+The sub-patterns are rendered as the elements are, so the numbered backreferences of a sub-pattern
+refer to its own captures. A subtree is timed alone when it doesn't compile followed by the rest
+(e.g. a backreference to a capture left out), the sub-patterns that don't compile alone are skipped. \n
+Every sub-pattern is also timed on the input scaled down to a quarter of its length (keeping
+its start and end), giving the exponent of the growth of its time with the length of the input:
+1.0 is linear, 2.0 quadratic.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable
+
+from .base import _Token
+
+
+_labelled = ("exactly", "at_least", "between", "between_lazy")
+_lookarounds = ("assert_ahead", "assert_behind", "assert_not_ahead", "assert_not_behind")
+
+# the minimal duration of a timed run, repeating the search as many times as needed
+_RUN_DURATION = 0.001
+# the subtrees costing less than this share of the whole expression are never blamed
+_MIN_SHARE = 0.1
+
+
+@dataclass
+class Cost:
+    path: str
+    # the timed sub-pattern
+    pattern: str
+    # the best time of searching the input, in seconds
+    time: float
+    # the exponent of the growth of the time with the length of the input (None if too short to tell)
+    growth: float | None = None
+
+
+@dataclass
+class MatchProfile:
+    """The outcome of `SuperExpressive.profile_match()`: the cost of the whole expression,
+    of the prefixes of its top-level sequence and of its subtrees (see `super_expressive.profiler`).
+    """
+    pattern: str
+    length: int
+    total: Cost
+    prefixes: list[Cost] = field(default_factory=list)
+    subtrees: list[Cost] = field(default_factory=list)
+    # the growth above which a time is super-linear
+    threshold: float = 1.5
+
+    @property
+    def steps(self) -> dict[str, float]:
+        """The cost every top-level element adds to the prefix before it, by path."""
+        steps, previous = {}, 0.0
+        for prefix in self.prefixes:
+            steps[prefix.path] = prefix.time - previous
+            previous = prefix.time
+        return steps
+
+    @property
+    def superlinear(self) -> list[Cost]:
+        """The subtrees whose time grows super-linearly with the length of the input."""
+        return [
+            cost for cost in self.subtrees
+            if cost.growth is not None and cost.growth >= self.threshold
+            and cost.time >= _MIN_SHARE * self.total.time
+        ]
+
+    @property
+    def culprit(self) -> Cost | None:
+        """The deepest super-linear subtree (the fastest growing one first), or the first
+        super-linear prefix when no subtree is super-linear (the growth comes from a sequence
+        of elements then), None if the whole expression searches the input in linear time.
+        """
+        if self.total.growth is None or self.total.growth < self.threshold:
+            return None
+        if self.superlinear:
+            return max(self.superlinear, key=lambda cost: (cost.path.count("/"), cost.growth))
+        return next((
+            cost for cost in self.prefixes
+            if cost.growth is not None and cost.growth >= self.threshold
+        ), None)
+
+
+def _label(element: _Token) -> str:
+    if element.type == "named_capture":
+        return f"named_capture({element.name!r})"
+    if element.type in _labelled:
+        times = element.times if isinstance(element.times, list) else [element.times]
+        return f"{element.type}({', '.join(map(str, times))})"
+    if element.type == "subexpression_ref":
+        return "subexpression"
+    return element.type
+
+
+def _scaled(s: str, length: int) -> str:
+    head = length // 2
+    return s[:head] + s[len(s) - (length - head):]
+
+
+def _time(search: Callable[[str], Any], s: str, repeat: int) -> float:
+    number = 1
+    while True:
+        started = perf_counter()
+        for _ in range(number):
+            search(s)
+        elapsed = perf_counter() - started
+        if elapsed >= _RUN_DURATION:
+            break
+        number *= 10
+    best = elapsed
+    for _ in range(repeat - 1):
+        started = perf_counter()
+        for _ in range(number):
+            search(s)
+        best = min(best, perf_counter() - started)
+    return best / number
+
+
+class Profiler:
+    def __init__(self,
+        flags: str,
+        render: Callable[[_Token], str],
+        resolve: Callable[[Any], list[_Token]],
+        repeat: int
+    ) -> None:
+        self.flags = flags
+        self.render = render
+        self.resolve = resolve
+        self.repeat = repeat
+
+    def cost(self, path: str, pattern: str, s: str) -> Cost | None:
+        """Times `pattern` searching `s` and its scaled-down version, None if it doesn't compile."""
+        try:
+            regex = re.compile(f"(?{self.flags}){pattern}" if self.flags else pattern)
+        except re.error:
+            return None
+        time = _time(regex.search, s, self.repeat)
+        growth = None
+        if len(s) >= 16:
+            quarter = len(s) // 4
+            smaller = _time(regex.search, _scaled(s, quarter), self.repeat)
+            growth = math.log(time / smaller) / math.log(len(s) / quarter)
+        return Cost(path, pattern, time, growth)
+
+    def profile(self, elements: list[_Token], pattern: str, s: str, threshold: float) -> MatchProfile:
+        total = self.cost("", pattern, s)
+        assert total is not None
+        rendered = [self.render(element) for element in elements]
+
+        prefixes = []
+        for index, element in enumerate(elements):
+            prefix = self.cost(f"{index}.{_label(element)}", "".join(rendered[:index + 1]), s)
+            if prefix is not None:
+                prefixes.append(prefix)
+
+        subtrees: list[Cost] = []
+        self.sequence(elements, "", "", s, subtrees)
+        return MatchProfile(pattern, len(s), total, prefixes, subtrees, threshold)
+
+    def children(self, element: _Token) -> list[_Token] | None:
+        if element.type == "subexpression_ref":
+            return self.resolve(element.value)
+        if element.contains_child:
+            return [element.value]
+        if element.contains_children:
+            return element.value
+        return None
+
+    def sequence(self, elements: list[_Token], path: str, after: str, s: str, costs: list[Cost]) -> None:
+        # every element of a sequence is followed by the next ones
+        rendered = [self.render(element) for element in elements]
+        for index, element in enumerate(elements):
+            prefix = f"{path}/" if path else ""
+            self.subtree(element, f"{prefix}{index}.{_label(element)}", "".join(rendered[index + 1:]) + after, s, costs)
+
+    def subtree(self, element: _Token, path: str, after: str, s: str, costs: list[Cost]) -> None:
+        children = self.children(element)
+        if children is None:
+            return
+        self.isolate(element, path, after, s, costs)
+        if element.type in _lookarounds:
+            # the rest of the expression doesn't backtrack into a lookaround
+            self.sequence(children, path, "", s, costs)
+        elif element.type == "any_of" or element.contains_child:
+            # alternatives and repeated elements are followed by what follows their parent
+            for index, child in enumerate(children):
+                child_path = f"{path}/{index}.{_label(child)}"
+                if element.type == "any_of" and self.children(child) is None:
+                    self.isolate(child, child_path, after, s, costs)
+                self.subtree(child, child_path, after, s, costs)
+        else:
+            self.sequence(children, path, after, s, costs)
+
+    def isolate(self, element: _Token, path: str, after: str, s: str, costs: list[Cost]) -> None:
+        # the subtree alone when the rest refers to captures left out
+        rendered = self.render(element)
+        cost = self.cost(path, rendered + after, s) or self.cost(path, rendered, s)
+        if cost is not None:
+            costs.append(cost)
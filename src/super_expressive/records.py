@@ -0,0 +1,75 @@
+"""Slotted record classes for the matches of a SuperExpression,
+see `SuperExpressive.record_type()`, `SuperExpressive.parse()` and `SuperExpressive.parse_iter()`. \n
+A record holds the named captures of a match in the slots of a dataclass instead of the dict
+of `re.Match.groupdict()`, which takes a fraction of the memory when millions of them are kept.
+The group numbers of the fields are looked up once per record type: a record is built
+from a single `re.Match.group()` call, then the converters of its type, if any.
+"""
+import keyword
+import re
+from dataclasses import make_dataclass
+from typing import Any, Callable, Iterator, Mapping
+
+
+def make_record_type(name: str, fields: list[str], converters: Mapping[str, Callable[[str], Any]]) -> type:
+    """Returns a slotted dataclass with the `fields`, all of them defaulting to None.
+    The converters are kept in its `_converters` attribute (the names of captures can't start with `_`).
+    """
+    for field in fields:
+        if keyword.iskeyword(field):
+            raise ValueError(f"named capture '{field}' is a Python keyword and can't be a record field")
+    for field in converters:
+        if field not in fields:
+            raise ValueError(f"no named capture '{field}' to convert")
+    return make_dataclass(
+        name,
+        [(field, Any, None) for field in fields],
+        namespace={ "_converters": dict(converters) },
+        slots=True,
+    )
+
+
+class RecordParser:
+    """Builds the records of a record type from the matches of `find` and `finditer`."""
+    __slots__ = ("record_type", "find", "finditer", "indices", "record")
+
+    def __init__(self,
+        record_type: type,
+        groupindex: Mapping[str, int],
+        find: Callable[[str], re.Match | None],
+        finditer: Callable[[str], Iterator[re.Match]]
+    ) -> None:
+        fields = list(getattr(record_type, "__dataclass_fields__", ()))
+        names = sorted(groupindex, key=groupindex.__getitem__)
+        if fields != names:
+            raise ValueError(f"record_type must have the named captures as fields ({', '.join(names)})")
+        self.record_type = record_type
+        self.find = find
+        self.finditer = finditer
+        self.indices = indices = [groupindex[field] for field in fields]
+        converters = getattr(record_type, "_converters", None) or {}
+
+        # the function building a record from a match, chosen once
+        record: Callable[[re.Match], Any]
+        if converters:
+            # None for the fields kept as strings
+            conversions = [converters.get(field) for field in fields]
+            def record(match):
+                # the extra group 0 makes group() return a tuple for a single field, zip() drops it
+                return record_type(*[
+                    group if convert is None or group is None else convert(group)
+                    for convert, group in zip(conversions, match.group(*indices, 0))
+                ])
+        elif len(indices) > 1:
+            record = lambda match: record_type(*match.group(*indices))
+        else:
+            index = indices[0]
+            record = lambda match: record_type(match.group(index))
+        self.record = record
+
+    def parse(self, s: str) -> Any:
+        match = self.find(s)
+        return None if match is None else self.record(match)
+
+    def parse_iter(self, text: str) -> Iterator[Any]:
+        return map(self.record, self.finditer(text))
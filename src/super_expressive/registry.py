@@ -0,0 +1,148 @@
+"""A registry of named patterns, compiled ahead of time. \n
+Pre-fork servers register their patterns at startup and call `compile_all()` in the parent
+process: the patterns are rendered in parallel (in worker threads or processes), then compiled
+in the parent, so that the forked workers share the compiled patterns copy-on-write instead of
+each compiling them on first use. `get()` is a plain dict lookup, without any locking.
+"""
+import os
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Iterator
+
+from .main import SuperExpressive, RegexError
+
+
+def _render(exprs: list[SuperExpressive]) -> list[tuple[str, float] | RegexError]:
+    # runs in the workers: renders a chunk of expressions, timing each one
+    rendered: list[tuple[str, float] | RegexError] = []
+    for expr in exprs:
+        started = perf_counter()
+        try:
+            pattern = expr.to_regex_string()
+        except RegexError as e:
+            rendered.append(e)
+            continue
+        rendered.append((pattern, perf_counter() - started))
+    return rendered
+
+
+class PatternRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._exprs: dict[str, SuperExpressive] = {}
+        self._patterns: dict[str, re.Pattern] = {}
+        self._stats: dict[str, dict[str, float]] = {}
+
+    def register(self, name: str, expr: SuperExpressive) -> None:
+        """Registers `expr` under `name`. It is compiled by `compile_all()` or on the first `get()`.
+
+        The `name` must not be registered already and `expr` must be a `SuperExpressive` instance.
+        Raises `RegexError` otherwise.
+        """
+        if not isinstance(expr, SuperExpressive):
+            raise RegexError("expr must be a SuperExpressive instance")
+        with self._lock:
+            if name in self._exprs:
+                raise RegexError(f"a pattern is already registered as '{name}'")
+            self._exprs[name] = expr
+
+    def get(self, name: str) -> re.Pattern:
+        """Returns the compiled pattern registered under `name`, compiling it if needed.
+        Raises `KeyError` if no pattern is registered under `name`.
+        """
+        try:
+            return self._patterns[name]
+        except KeyError:
+            return self.__compile_one(name)
+
+    def __compile_one(self, name: str) -> re.Pattern:
+        with self._lock:
+            if name in self._patterns:
+                return self._patterns[name]
+            expr = self._exprs[name]
+
+        rendered = _render([expr])[0]
+        if isinstance(rendered, RegexError):
+            raise RegexError(f"cannot render the pattern '{name}': {rendered}")
+        pattern, render_time = rendered
+        started = perf_counter()
+        regex = re.compile(pattern)
+        compile_time = perf_counter() - started
+
+        with self._lock:
+            self._stats[name] = { "render": render_time, "compile": compile_time }
+            return self._patterns.setdefault(name, regex)
+
+    def compile_all(self,
+        workers: int | None = None,
+        *,
+        processes: bool = False,
+        chunk_size: int = 256
+    ) -> dict[str, dict[str, float]]:
+        """Compiles every registered pattern not compiled yet. \n
+        The patterns are rendered by `workers` threads, or processes when `processes` is set
+        (default is the number of CPUs), in chunks of `chunk_size` patterns,
+        then compiled in the calling process. \n
+        Returns the render and compile times (in seconds) of the patterns compiled by this call:
+        `{name: {"render": float, "compile": float}}`.
+
+        Raises `RegexError` if a pattern can't be rendered (e.g. an unbound template),
+        after compiling all the others.
+        """
+        with self._lock:
+            pending = [(name, expr) for name, expr in self._exprs.items() if name not in self._patterns]
+        if not pending:
+            return {}
+
+        chunks = [
+            [expr for _, expr in pending[i:i + chunk_size]]
+            for i in range(0, len(pending), chunk_size)
+        ]
+        workers = min(workers or os.cpu_count() or 1, len(chunks))
+        if workers <= 1:
+            rendered = [result for chunk in chunks for result in _render(chunk)]
+        else:
+            executor: Executor = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(workers)
+            with executor:
+                rendered = [result for results in executor.map(_render, chunks) for result in results]
+
+        stats: dict[str, dict[str, float]] = {}
+        patterns: dict[str, re.Pattern] = {}
+        failures: list[str] = []
+        for (name, _), result in zip(pending, rendered):
+            if isinstance(result, RegexError):
+                failures.append(f"'{name}': {result}")
+                continue
+            pattern, render_time = result
+            started = perf_counter()
+            patterns[name] = re.compile(pattern)
+            stats[name] = { "render": render_time, "compile": perf_counter() - started }
+
+        with self._lock:
+            for name, regex in patterns.items():
+                self._patterns.setdefault(name, regex)
+            self._stats.update(stats)
+
+        if failures:
+            raise RegexError(f"cannot render the patterns {', '.join(failures)}")
+        return stats
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Returns the render and compile times of all the patterns compiled so far."""
+        with self._lock:
+            return { name: dict(times) for name, times in self._stats.items() }
+
+    @property
+    def compiled(self) -> int:
+        return len(self._patterns)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._exprs
+
+    def __len__(self) -> int:
+        return len(self._exprs)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._exprs))
@@ -0,0 +1,139 @@
+"""Profile-guided reordering of `.any_of` alternatives,
+see `SuperExpressive.profile_branches()` and `SuperExpressive.reorder_by_profile()`. \n
+Profiling renders the expression with every alternative wrapped in an extra capture group
+(the numbered backreferences are renumbered accordingly), and counts which group took part
+in each match. The `.any_of` nodes are numbered in the order of the tree,
+with referenced subexpressions merged.
+
+Python regexes pick the first alternative that leads to a match, so the alternatives
+are only reordered when at most one of them can match at any position:
+when they are all literal and none of them is a prefix of another.
+"""
+import re
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Iterable
+
+from .autotune import Rewriter
+from .base import _Token
+
+
+_fusable = ("char", "range", "any_of_chars")
+
+@dataclass
+class BranchProfile:
+    """The number of matches each alternative of each `.any_of` node took part in,
+    as recorded by `SuperExpressive.profile_branches()`.
+    """
+    # the pattern of the profiled expression
+    pattern: str
+    # counts[node][branch], the nodes in the order of the tree
+    counts: list[list[int]] = field(default_factory=list)
+    samples: int = 0
+
+    def merge(self, other: "BranchProfile") -> "BranchProfile":
+        """Returns the profile of the samples of both profiles, which must be of the same expression."""
+        if other.pattern != self.pattern:
+            raise ValueError("cannot merge the profiles of different expressions")
+        return BranchProfile(
+            self.pattern,
+            [[a + b for a, b in zip(x, y)] for x, y in zip(self.counts, other.counts)],
+            self.samples + other.samples,
+        )
+
+
+class Instrumenter(Rewriter):
+    def __init__(self,
+        flags: str,
+        resolve: Callable[[Any], list[_Token]],
+        escape: Callable[[str], str],
+        unescape: Callable[[str], str]
+    ) -> None:
+        super().__init__({}, flags, resolve, escape, unescape)
+        # the number of alternatives of every node
+        self.branches: list[int] = []
+        # added group number -> (node, branch)
+        self.groups: dict[int, tuple[int, int]] = {}
+        # original capture group number -> rendered group number
+        self.renumbered: dict[int, int] = {}
+        self.captures = 0
+        self.added = 0
+
+    def element(self, element: _Token) -> _Token:
+        # groups are numbered by their opening parenthesis, so the tree is walked in that order
+        match element.type:
+            case "capture" | "named_capture":
+                self.captures += 1
+                self.renumbered[self.captures] = self.captures + self.added
+            case "backreference":
+                return replace(element, index=self.renumbered[element.index])
+            case "any_of":
+                node = len(self.branches)
+                self.branches.append(len(element.value))
+                # in the rendered order: the characters fused into a class come last
+                branches = sorted(enumerate(element.value), key=lambda item: item[1].type in _fusable)
+                children = []
+                for branch, child in branches:
+                    self.added += 1
+                    self.groups[self.captures + self.added] = (node, branch)
+                    children.append(_Token("capture", [self.element(child)], contains_children=True))
+                return _Token("any_of", children, contains_children=True)
+        return super().element(element)
+
+    def profile(self, regex: re.Pattern, pattern: str, samples: Iterable[str]) -> BranchProfile:
+        counts = [[0] * branches for branches in self.branches]
+        groups = [(index, *self.groups[index]) for index in sorted(self.groups)]
+        total = 0
+        for sample in samples:
+            total += 1
+            for match in regex.finditer(sample):
+                for index, node, branch in groups:
+                    if match.start(index) != -1:
+                        counts[node][branch] += 1
+        return BranchProfile(pattern, counts, total)
+
+
+class Reorderer(Rewriter):
+    def __init__(self,
+        profile: BranchProfile,
+        flags: str,
+        resolve: Callable[[Any], list[_Token]],
+        escape: Callable[[str], str],
+        unescape: Callable[[str], str]
+    ) -> None:
+        super().__init__({}, flags, resolve, escape, unescape)
+        self.counts = profile.counts
+        self.nodes = 0
+
+    def element(self, element: _Token) -> _Token:
+        if element.type != "any_of":
+            return super().element(element)
+
+        node = self.nodes
+        self.nodes += 1
+        children = [self.element(child) for child in element.value]
+        if self.exclusive(children):
+            counts = self.counts[node]
+            order = sorted(range(len(children)), key=lambda branch: -counts[branch])
+            if order != sorted(order):
+                self.applied.add("any_of")
+                children = [children[branch] for branch in order]
+        return _Token("any_of", children, contains_children=True)
+
+    def exclusive(self, children: list[_Token]) -> bool:
+        # whether at most one of the alternatives can match at any position
+        words: list[str] = []
+        for child in children:
+            if child.type in ("char", "string"):
+                words.append(self.unescape(child.value))
+            elif child.type == "any_of_chars":
+                words.extend(self.unescape(child.value))
+            else:
+                return False
+        if "i" in self.flags:
+            # case folding of non-ascii characters may be more subtle than lowercasing
+            if not all(word.isascii() for word in words):
+                return False
+            words = [word.lower() for word in words]
+        words.sort()
+        # sorted, a word is immediately followed by the words it is a prefix of
+        return all(not b.startswith(a) for a, b in zip(words, words[1:]))
@@ -0,0 +1,176 @@
+"""A compact, closure-free representation of token trees made of plain tuples, strings and integers. \n
+Every token is encoded as `(type, value, name, index, times)` with the trailing default
+fields dropped. `type` is the position of the token type in `TOKEN_TYPES`, and the flags
+of a token are implied by its type. The value of a token containing a child is the encoded child,
+the value of a token containing children is a tuple of encoded children, and the value
+of a referenced subexpression is `(fragment, namespace, capture offset, ignore start and end)`,
+`fragment` being an index into the table of fragments shared by the whole tree. \n
+The deferred tokens of the frames still being built and of backreferences (whose value 
+is a function creating the final token) are encoded without a value and recreated on decoding.
+"""
+from typing import Any
+
+from .base import _Fragment, _FragmentRef, _StackFrame, _Token, _Tokens, _as_type, _deferred_type
+
+
+FORMAT_VERSION = 1
+
+
+def _prototypes() -> dict[str, _Token]:
+    prototypes = {}
+    for attr, value in vars(_Tokens).items():
+        if attr.startswith("_"):
+            continue
+        if callable(value) and not isinstance(value, _Token):
+            try:
+                value = value(None)
+            except TypeError:
+                value = value(None, None)
+        if isinstance(value, _Token):
+            prototypes[value.type] = value
+    return prototypes
+
+
+_prototype_tokens = _prototypes()
+
+# token types in the order of their definition, new types must only ever be appended
+TOKEN_TYPES = tuple(_prototype_tokens)
+_type_codes = { type: code for code, type in enumerate(TOKEN_TYPES) }
+
+# the flags every token type is created with
+_flags = {
+    type: (token.quantifier_requires_group, token.contains_children, token.contains_child)
+    for type, token in _prototype_tokens.items()
+}
+
+# the types created as deferred tokens, which elements (backreferences) keep as is
+_deferred_types = { type for type, token in _prototype_tokens.items() if callable(token.value) }
+
+
+def _options(type: str, name: str = "", index: int = 0, times: Any = 0) -> dict[str, Any]:
+    try:
+        requires_group, contains_children, contains_child = _flags[type]
+    except KeyError:
+        raise ValueError(f"unknown token type: {type}") from None
+
+    options: dict[str, Any] = {}
+    if name: options["name"] = name
+    if index: options["index"] = index
+    if times: options["times"] = times
+    if requires_group: options["quantifier_requires_group"] = True
+    if contains_children: options["contains_children"] = True
+    if contains_child: options["contains_child"] = True
+    return options
+
+
+# the defaults of the (type, value, name, index, times) fields
+_defaults = (None, None, "", 0, 0)
+
+
+def _trim(encoded: list) -> tuple:
+    while len(encoded) > 1:
+        last, default = encoded[-1], _defaults[len(encoded) - 1]
+        if last != default or type(last) is not type(default):
+            break
+        encoded.pop()
+    return tuple(encoded)
+
+
+def _fields(encoded: tuple) -> tuple:
+    return (*encoded, *_defaults[len(encoded):])
+
+
+class Encoder:
+    def __init__(self) -> None:
+        self.fragments: list[tuple] = []
+        self._fragment_ids: dict[int, int] = {}
+
+    def token(self, token: _Token) -> tuple:
+        value = token.value
+        if token.contains_child:
+            value = self.token(value)
+        elif token.contains_children:
+            value = tuple(self.token(child) for child in value)
+        elif token.type == "subexpression_ref":
+            value = (
+                self.fragment(value.fragment),
+                value.namespace,
+                value.capture_offset,
+                value.ignore_start_and_end
+            )
+        elif callable(value):
+            value = None
+        elif isinstance(value, list):
+            value = tuple(value)
+
+        times = tuple(token.times) if isinstance(token.times, list) else token.times
+        return _trim([_type_codes[token.type], value, token.name, token.index, times])
+
+    def deferred(self, token: _Token) -> tuple:
+        times = tuple(token.times) if isinstance(token.times, list) else token.times
+        return _trim([_type_codes[token.type], None, token.name, token.index, times])
+
+    def frame(self, frame: _StackFrame) -> tuple:
+        return (
+            self.deferred(frame.token),
+            None if frame.quantifier is None else self.deferred(frame.quantifier),
+            tuple(self.token(element) for element in frame.elements),
+        )
+
+    def fragment(self, fragment: _Fragment) -> int:
+        index = self._fragment_ids.get(id(fragment))
+        if index is None:
+            encoded = (
+                tuple(self.token(element) for element in fragment.elements),
+                tuple(fragment.named_groups),
+                fragment.capture_groups,
+                fragment.has_defined_start,
+                fragment.has_defined_end,
+            )
+            index = self._fragment_ids[id(fragment)] = len(self.fragments)
+            self.fragments.append(encoded)
+        return index
+
+
+class Decoder:
+    def __init__(self, fragments: tuple) -> None:
+        self.fragments: list[_Fragment] = []
+        for elements, named_groups, capture_groups, has_defined_start, has_defined_end in fragments:
+            self.fragments.append(_Fragment(
+                elements=[self.token(element) for element in elements],
+                named_groups=list(named_groups),
+                capture_groups=capture_groups,
+                has_defined_start=has_defined_start,
+                has_defined_end=has_defined_end
+            ))
+
+    def token(self, encoded: tuple) -> _Token:
+        code, value, name, index, times = _fields(encoded)
+        type = TOKEN_TYPES[code]
+        if value is None and type in _deferred_types:
+            return self.deferred(encoded)
+        options = _options(type, name, index, list(times) if isinstance(times, tuple) else times)
+
+        if options.get("contains_child"):
+            value = self.token(value)
+        elif options.get("contains_children"):
+            value = [self.token(child) for child in value]
+        elif type == "subexpression_ref":
+            fragment, namespace, capture_offset, ignore_start_and_end = value
+            value = _FragmentRef(self.fragments[fragment], namespace, capture_offset, ignore_start_and_end)
+        return _Token(type, value, **options)
+
+    def deferred(self, encoded: tuple) -> _Token:
+        code, _, name, index, times = _fields(encoded)
+        type = TOKEN_TYPES[code]
+        if type == "root":
+            return _as_type("root")(None)
+        return _deferred_type(type, _options(type, name, index, list(times) if isinstance(times, tuple) else times))
+
+    def frame(self, encoded: tuple) -> _StackFrame:
+        token, quantifier, elements = encoded
+        return _StackFrame(
+            self.deferred(token),
+            None if quantifier is None else self.deferred(quantifier),
+            [self.token(element) for element in elements]
+        )
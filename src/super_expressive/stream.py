@@ -0,0 +1,115 @@
+import re
+from typing import IO, Iterator
+
+
+_DEFAULT_BLOCK_SIZE = 1 << 16
+
+
+def _iter_line_blocks(fileobj: IO[str], block_size: int) -> Iterator[str]:
+    """Reads `fileobj` in blocks of `block_size` characters
+    and yields chunks of complete lines with the last line ending stripped
+    (the last chunk of a stream without a trailing newline has nothing to strip).
+    """
+    tail: list[str] = []
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+
+        cut = block.rfind("\n")
+        if cut == -1:
+            tail.append(block)
+            continue
+
+        if tail:
+            tail.append(block[:cut])
+            yield "".join(tail)
+            tail = []
+        else:
+            yield block[:cut]
+
+        if cut + 1 < len(block):
+            tail.append(block[cut + 1:])
+
+    if tail:
+        yield "".join(tail)
+
+
+def _iter_lines(fileobj: IO[str], block_size: int) -> Iterator[str]:
+    for chunk in _iter_line_blocks(fileobj, block_size):
+        yield from chunk.split("\n")
+
+
+def _iter_multiline_records(
+    fileobj: IO[str],
+    boundary: re.Pattern,
+    block_size: int
+) -> Iterator[str]:
+    # every chunk gets the line ending stripped from the previous one back in front of it,
+    # so that a record starting on the very first line of a chunk is found by the same split
+    # and the text preceding the first boundary comes out as the continuation of the carried record
+    split = boundary.split
+    carry: list[str] = []
+    for chunk in _iter_line_blocks(fileobj, block_size):
+        records = split("\n" + chunk)
+        head = records[0]
+        if carry:
+            carry.append(head)
+            if len(records) == 1:
+                continue
+            yield "".join(carry)
+        elif head:
+            if len(records) == 1:
+                carry.append(head[1:])
+                continue
+            yield head[1:]
+
+        carry = [records.pop()]
+        yield from records[1:]
+
+    if carry:
+        yield "".join(carry)
+
+
+def iter_records(
+    fileobj: IO[str],
+    boundary: re.Pattern | None = None,
+    block_size: int = _DEFAULT_BLOCK_SIZE
+) -> Iterator[str]:
+    """Lazily splits a text stream into records, without their trailing line endings. \n
+    Without a `boundary` every line is a record, otherwise a record starts
+    at every line the `boundary` pattern (see `compile_boundary`) splits the text at
+    and spans all the lines up to the next one.
+    Lines preceding the first boundary form a record of their own.
+    """
+    if block_size <= 0:
+        raise ValueError(f"block_size must be a positive integer (got {block_size})")
+
+    if boundary is None:
+        return _iter_lines(fileobj, block_size)
+    return _iter_multiline_records(fileobj, boundary, block_size)
+
+
+def compile_boundary(pattern: str, flags: str) -> re.Pattern:
+    """Compiles a record start pattern into a pattern matching the line ending
+    right before every line the record start pattern matches, so that a whole block
+    of lines can be split into records by a single `re.split` call. \n
+    Starting the pattern with a literal newline (rather than a multiline `^`) lets
+    the regex engine skip straight to line endings instead of trying every position.
+    The pattern is always compiled in multiline mode, so that `.start_of_input` 
+    and `.end_of_input` markers of the record start refer to the line being tested.
+    """
+    flags = "".join(sorted(set(flags + "m")))
+    return re.compile(f"(?{flags})\\n(?=(?:{pattern}))")
+
+
+def iter_matches(
+    regex: re.Pattern,
+    fileobj: IO[str],
+    boundary: re.Pattern | None = None,
+    block_size: int = _DEFAULT_BLOCK_SIZE
+) -> Iterator[re.Match]:
+    search = regex.search
+    for record in iter_records(fileobj, boundary, block_size):
+        if (found := search(record)) is not None:
+            yield found
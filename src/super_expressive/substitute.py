@@ -0,0 +1,109 @@
+"""Single-pass substitution of many patterns, see `SubstitutionSet`. \n
+The expressions of the rules are merged into one alternation, every rule in a named capture
+(`rule0`, `rule1`...) with its own named captures namespaced (`rule0_name`...), its numbered
+backreferences rebased and its start/end of input markers kept in its alternative
+(several rules may be anchored), so that a single `sub()` scan applies all the rules:
+the rule of a match is found from `re.Match.lastindex`, as the capture of the rule is always
+the last group to close. When the rules can only start with the characters of a class,
+a lookahead on the class skips the other positions without trying every alternative.
+The replacements referencing groups, and the callables, get the match of the expression
+of their rule at the same position, with its own group numbers and names. \n
+At every position, the first rule of the list matching there wins. Unlike applying the rules
+one after another, a rule never sees the replacements of the previous ones, and the leftmost
+match wins over an earlier rule matching further: both agree when the matches of the rules
+don't overlap and no replacement creates a match of a later rule, which `verify()` checks on samples.
+"""
+import re
+from typing import Callable, Iterable
+
+from .main import SuperExpressive, RegexError
+
+
+Replacement = str | Callable[[re.Match], str]
+
+
+class SubstitutionSet:
+    def __init__(self, rules: Iterable[tuple[SuperExpressive, Replacement]]) -> None:
+        """Merges the `rules`, pairs of an expression and its replacement: a template string
+        (as for `re.sub()`, its group references being the ones of the expression)
+        or a callable taking the match of the expression and returning the replacement. \n
+        The rules must not be empty, their expressions must be fully specified `SuperExpressive`
+        instances with the same flags, and their replacements strings or callables.
+        Raises `RegexError` otherwise.
+        """
+        self.rules = list(rules)
+        if not self.rules:
+            raise RegexError("a SubstitutionSet needs at least one rule")
+
+        flags = set()
+        for expr, replacement in self.rules:
+            if not isinstance(expr, SuperExpressive):
+                raise RegexError("expr must be a SuperExpressive instance")
+            if not isinstance(replacement, str) and not callable(replacement):
+                raise RegexError("replacement must be a string or a callable")
+            flags.add(expr._pattern_and_flags()[1])
+        if len(flags) > 1:
+            # the flags of the merged pattern apply to every alternative
+            raise RegexError("the expressions of a SubstitutionSet must have the same flags")
+
+        merged = SuperExpressive().any_of
+        for index, (expr, _) in enumerate(self.rules):
+            merged = (
+                merged
+                    .named_capture(f"rule{index}")
+                    ._branch_subexpression(expr, namespace=f"rule{index}_")
+                    .end()
+            )
+        self.expr = merged.end()
+        # the alternatives are only tried at the positions where one of them may start
+        pattern, flags = self.expr._pattern_and_flags()
+        guard = self.expr._first_chars()
+        if guard is not None:
+            pattern = f"(?=[{guard}]){pattern}"
+        self.regex = re.compile(f"(?{flags}){pattern}" if flags else pattern)
+        self.regexes = [expr.to_regex() for expr, _ in self.rules]
+
+        # the group of every rule -> its literal replacement or the function building it
+        handlers: dict[int, str | Callable[[re.Match], str]] = {}
+        for index, (regex, (_, replacement)) in enumerate(zip(self.regexes, self.rules)):
+            group = self.regex.groupindex[f"rule{index}"]
+            if isinstance(replacement, str) and "\\" not in replacement:
+                handlers[group] = replacement
+            elif isinstance(replacement, str):
+                handlers[group] = lambda match, rematch=regex.match, template=replacement: (
+                    rematch(match.string, match.start()).expand(template)  # type: ignore
+                )
+            else:
+                handlers[group] = lambda match, rematch=regex.match, replace=replacement: (
+                    replace(rematch(match.string, match.start()))  # type: ignore
+                )
+
+        def replace(match: re.Match) -> str:
+            handler = handlers[match.lastindex]  # type: ignore
+            return handler if handler.__class__ is str else handler(match)  # type: ignore
+        self._replace = replace
+
+    def sub(self, s: str, count: int = 0) -> str:
+        """Returns `s` with the matches of the rules replaced in a single scan
+        (the `count` first ones only, if it is positive)."""
+        return self.regex.sub(self._replace, s, count)
+
+    def subn(self, s: str, count: int = 0) -> tuple[str, int]:
+        """Returns `s` as `sub()` does, along with the number of replacements."""
+        return self.regex.subn(self._replace, s, count)
+
+    def sequential(self, s: str) -> str:
+        """Returns `s` with the rules applied one after another with `re.sub()`, as a reference."""
+        for regex, (_, replacement) in zip(self.regexes, self.rules):
+            s = regex.sub(replacement, s)
+        return s
+
+    def verify(self, samples: Iterable[str]) -> list[str]:
+        """Returns the samples for which `sub()` and `sequential()` disagree."""
+        return [sample for sample in samples if self.sub(sample) != self.sequential(sample)]
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __repr__(self) -> str:
+        return f"SubstitutionSet({len(self.rules)} rules)"
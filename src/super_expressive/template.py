@@ -0,0 +1,91 @@
+"""Rendering of SuperExpressions with parameters (see `SuperExpressive.param()`). \n
+A template is rendered once into static fragments separated by the slots of its parameters.
+Binding values only escapes them and splices them into the slots,
+without evaluating the tree of elements again.
+"""
+import re
+import uuid
+from typing import Iterable, Mapping
+
+
+KINDS = ("string", "chars")
+
+# delimits the slots of the parameters in the rendered patterns,
+# unique so that it never collides with the rendering of other elements
+MARK = f"\x00{uuid.uuid4().hex}\x00"
+
+
+def slot(name: str, kind: str) -> str:
+    return f"{MARK}{name}:{kind}{MARK}"
+
+
+class Template:
+    """A pattern pre-rendered into static fragments and parameter slots."""
+    __slots__ = ("slots", "names", "_format", "_escape_table")
+
+    def __init__(self, rendered: str, flags: str, escape_table: Mapping[int, str]) -> None:
+        pieces = rendered.split(MARK)
+        self.slots: list[tuple[str, str]] = [
+            tuple(piece.split(":"))  # type: ignore
+            for piece in pieces[1::2]
+        ]
+        self.names = frozenset(name for name, _ in self.slots)
+        self._escape_table = escape_table
+
+        # the static fragments end up in a format string with positional fields for the slots
+        static = [piece.replace("{", "{{").replace("}", "}}") for piece in pieces[0::2]]
+        prefix = f"(?{flags})" if flags else ""
+        self._format = prefix + static[0] + "".join(
+            f"{{{i}}}{fragment}" for i, fragment in enumerate(static[1:])
+        )
+
+    def render(self, values: Mapping[str, str]) -> str:
+        if values.keys() != self.names:
+            self.__check_names(values)
+        return self._format.format(*[self.__escape(name, kind, values[name]) for name, kind in self.slots])
+
+    def render_many(self, rows: Iterable[Mapping[str, str]]) -> list[str]:
+        format, escape, slots, names = self._format.format, self.__escape, self.slots, self.names
+        rendered = []
+        for values in rows:
+            if values.keys() != names:
+                self.__check_names(values)
+            rendered.append(format(*[escape(name, kind, values[name]) for name, kind in slots]))
+        return rendered
+
+    def __check_names(self, values: Mapping[str, str]) -> None:
+        for name in values:
+            if name not in self.names:
+                raise ValueError(f"unknown parameter '{name}'")
+        for name, _ in self.slots:
+            if name not in values:
+                raise ValueError(f"missing value for parameter '{name}'")
+
+    def __escape(self, name: str, kind: str, value: str) -> str:
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"the value of parameter '{name}' must be a non-empty string (got {value!r})")
+        escaped = value.translate(self._escape_table)
+        return f"[{escaped}]" if kind == "chars" else escaped
+
+
+class BoundPattern:
+    """A template rendered with the values of its parameters (see `SuperExpressive.bind()`)."""
+    __slots__ = ("_pattern",)
+
+    def __init__(self, pattern: str) -> None:
+        self._pattern = pattern
+
+    def to_regex_string(self) -> str:
+        return self._pattern
+
+    def to_regex(self) -> re.Pattern:
+        return re.compile(self._pattern)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BoundPattern) and self._pattern == other._pattern
+
+    def __hash__(self) -> int:
+        return hash(self._pattern)
+
+    def __repr__(self) -> str:
+        return f"BoundPattern({self._pattern!r})"
@@ -0,0 +1,215 @@
+"""Time-budgeted matching, see `SuperExpressive.to_matcher(timeout=...)`. \n
+`re` can't be interrupted once a match has started, not even from another thread,
+so the matches are run in worker processes of a `WorkerPool`, which kills the workers
+not answering within the timeout and starts fresh ones in their place. \n
+A worker only sends back the span of the match: `TimeoutMatcher.find()` then runs the pattern
+in process at the position of the match to build the `re.Match`, taking about as long as
+the worker did to find it. The rejections of the `Matcher` that don't run the pattern
+(the lengths of the possible matches, plain strings) are checked in process before handing off,
+and inputs up to `inline_length` characters are matched in process as well, without any timeout. \n
+Every handed off call is recorded in the metrics `registry` (see `super_expressive.metrics`)
+under the name of the pattern and its `re` method, along with the number of timeouts.
+"""
+import atexit
+import multiprocessing
+import os
+import re
+import threading
+from time import perf_counter
+from typing import Any
+
+from .matcher import Matcher
+from .metrics import MetricsRegistry, PatternMetrics, registry
+
+
+class MatchTimeout(TimeoutError):
+    """Raised when a match takes longer than the timeout of its `TimeoutMatcher`."""
+
+    def __init__(self, pattern: str, timeout: float) -> None:
+        super().__init__(f"matching {pattern!r} took more than {timeout} seconds")
+        self.pattern = pattern
+        self.timeout = timeout
+
+
+def _serve(conn: Any) -> None:
+    # tells the pool the worker has started, so that the startup isn't charged to the first match
+    conn.send(None)
+    # compiled patterns are cached by `re`
+    while True:
+        try:
+            pattern, flags, mode, s = conn.recv()
+        except EOFError:
+            return
+        found = getattr(re.compile(pattern, flags), mode)(s)
+        conn.send(found.span() if found is not None else None)
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "ready")
+
+    def __init__(self, context: Any) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def wait_ready(self) -> None:
+        # the processes of the "spawn" and "forkserver" contexts take a while to import the package
+        if not self.ready:
+            self.conn.recv()
+            self.ready = True
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """Runs matches in up to `size` worker processes (one per CPU by default),
+    started on demand and reused from one match to the next.
+    The callers wait for a free worker when they are all busy.
+    The timeout of a match only starts once its worker is ready, the startup of a worker
+    (a new one or the replacement of a killed one) isn't part of it.
+    """
+
+    def __init__(self, size: int | None = None, context: str | None = None) -> None:
+        self.size = size or os.cpu_count() or 1
+        # the number of workers killed for taking too long
+        self.recycled = 0
+        self._context = multiprocessing.get_context(context)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: list[_Worker] = []
+
+    def run(self, pattern: str, flags: int, mode: str, s: str, timeout: float) -> tuple[int, int] | None:
+        """Returns the span of the match of `pattern` in `s` with the `re` method `mode`, or None. \n
+        Raises `MatchTimeout` if the worker doesn't answer within `timeout` seconds.
+        """
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = _Worker(self._context)
+
+            try:
+                worker.wait_ready()
+                worker.conn.send((pattern, flags, mode, s))
+                answered = worker.conn.poll(timeout)
+                span = worker.conn.recv() if answered else None
+            except BaseException:
+                worker.kill()
+                raise
+            if not answered:
+                worker.kill()
+                worker = _Worker(self._context)
+                with self._lock:
+                    self.recycled += 1
+                    self._idle.append(worker)
+                raise MatchTimeout(pattern, timeout)
+
+            with self._lock:
+                self._idle.append(worker)
+            return span
+
+    def close(self) -> None:
+        """Stops the idle workers (the pool starts new ones if used again)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+    def __repr__(self) -> str:
+        return f"WorkerPool(size={self.size}, idle={len(self._idle)}, recycled={self.recycled})"
+
+
+_default_pool: WorkerPool | None = None
+_default_lock = threading.Lock()
+
+
+def default_pool() -> WorkerPool:
+    """Returns the pool shared by the `TimeoutMatcher`s created without one, started on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+class TimeoutMatcher:
+    """Tests and finds the matches of a SuperExpression in strings as its `Matcher` does,
+    raising `MatchTimeout` when a match takes longer than `timeout` seconds.
+    """
+    __slots__ = ("matcher", "timeout", "inline_length", "pool", "_metrics")
+
+    def __init__(self,
+        matcher: Matcher,
+        timeout: float,
+        inline_length: int = 0,
+        name: str = "",
+        pool: WorkerPool | None = None,
+        registry: MetricsRegistry = registry
+    ) -> None:
+        self.matcher = matcher
+        self.timeout = timeout
+        self.inline_length = inline_length
+        self.pool = pool if pool is not None else default_pool()
+        self._metrics = registry.metrics(name or matcher.regex.pattern)
+
+    @property
+    def regex(self) -> re.Pattern:
+        return self.matcher.regex
+
+    @property
+    def metrics(self) -> PatternMetrics:
+        return self._metrics
+
+    def test(self, s: str) -> bool:
+        """Returns whether the SuperExpression matches somewhere in `s`."""
+        matcher = self.matcher
+        # plain strings are tested with string operations
+        if len(s) <= self.inline_length or matcher.literal is not None:
+            return matcher.test(s)
+        if self.__rejects(s):
+            return False
+        return self.__run(s) is not None
+
+    def find(self, s: str) -> re.Match | None:
+        """Returns the first match of the SuperExpression in `s`, or None. \n
+        The match has the same span and groups as the one of `regex.search()`.
+        """
+        matcher = self.matcher
+        if len(s) <= self.inline_length or matcher.literal is not None:
+            return matcher.find(s)
+        if self.__rejects(s):
+            return None
+        span = self.__run(s)
+        if span is None:
+            return None
+        return getattr(matcher.regex, matcher.mode)(s, span[0])
+
+    def __rejects(self, s: str) -> bool:
+        matcher = self.matcher
+        length = len(s)
+        return length < matcher.min_width or matcher.max_width is not None and length > matcher.max_width
+
+    def __run(self, s: str) -> tuple[int, int] | None:
+        matcher = self.matcher
+        counter = self._metrics.counters()[matcher.mode]
+        counter.calls += 1
+        started = perf_counter()
+        try:
+            span = self.pool.run(matcher.regex.pattern, matcher.regex.flags, matcher.mode, s, self.timeout)
+        except MatchTimeout:
+            counter.timeouts += 1
+            raise
+        finally:
+            counter.observe(perf_counter() - started)
+        if span is not None:
+            counter.hits += 1
+        return span
+
+    def __repr__(self) -> str:
+        return f"TimeoutMatcher({self.matcher.regex.pattern!r}, mode={self.matcher.mode!r}, timeout={self.timeout})"
@@ -0,0 +1,127 @@
+"""Vectorized matching of NumPy string arrays, see `SuperExpressive.match_array()`. \n
+Expressions matching strings of a fixed length, made of character classes only
+(e.g. `.exactly(4).any_of_chars(...)`, `.range()`, `.digit`, strings), are matched position by position:
+every position gets a lookup table of the 256 first code points, built once by probing
+its character class compiled as a single-character regex (so that the flags keep their `re` semantics).
+The elements of `S`/`U` arrays are then matched with one table lookup per position,
+and the rare elements with code points above 255 with the regex. \n
+NumPy is an optional dependency, only imported by `mask()`.
+"""
+import re
+from typing import Any, Callable
+
+
+_single_char = (
+    "any_char", "whitespace_char", "non_whitespace_char", "digit", "non_digit", "word", "non_word",
+    "new_line", "carriage_return", "tab", "null_byte",
+    "char", "range", "any_of_chars", "anything_but_chars", "anything_but_range",
+)
+_sequences = ("capture", "named_capture", "group", "subexpression")
+_anchors = ("start_of_string", "start_of_input", "end_of_string", "end_of_input")
+
+# the code points covered by the lookup tables
+TABLE_SIZE = 256
+
+
+def positions(
+    elements: list,
+    render: Callable[[Any], str],
+    escape: Callable[[str], str],
+    unescape: Callable[[str], str],
+    resolve: Callable[[Any], list]
+) -> list[str] | None:
+    """Returns the single-character patterns of every position of the expression,
+    or None if it doesn't only match strings of a fixed length made of character classes.
+    """
+    # the anchors at the start and the end are implied by a full match
+    start = 1 if elements and elements[0].type in _anchors[:2] else 0
+    end = len(elements) - 1 if len(elements) > start and elements[-1].type in _anchors[2:] else len(elements)
+
+    def sequence(elements: list) -> list[str] | None:
+        patterns: list[str] = []
+        for element in elements:
+            inner = single(element)
+            if inner is None:
+                return None
+            patterns += inner
+        return patterns
+
+    def single(element) -> list[str] | None:
+        match element.type:
+            case type if type in _single_char:
+                return [render(element)]
+            case "string":
+                return [escape(char) for char in unescape(element.value)]
+            case "noop":
+                return []
+            case type if type in _sequences:
+                return sequence(element.value)
+            case "subexpression_ref":
+                return sequence(resolve(element.value))
+            case "any_of":
+                children = [single(child) for child in element.value]
+                if any(child is None or len(child) != 1 for child in children):
+                    return None
+                return [f"(?:{'|'.join(child[0] for child in children)})"]  # type: ignore
+            case "exactly":
+                inner = single(element.value)
+                return None if inner is None else inner * element.times
+        return None
+
+    return sequence(elements[start:end])
+
+
+def mask(array: Any, regex: re.Pattern, patterns: list[str] | None, flags: str) -> Any:
+    """Returns the boolean mask of the elements of `array` fully matched by `regex`,
+    looking up the characters of every position in tables when `patterns` is given
+    and `array` is a `S` or `U` array. The bytes of `S` arrays are read as Latin-1.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("match_array() requires numpy") from None
+
+    array = np.asarray(array)
+    kind = array.dtype.kind
+    if patterns is None or kind not in "SU":
+        return _loop(np, array, regex)
+
+    width = len(patterns)
+    itemsize = array.dtype.itemsize // (4 if kind == "U" else 1)
+    if itemsize < width:
+        return np.zeros(array.shape, dtype=bool)
+
+    flat = np.ascontiguousarray(array).reshape(-1)
+    codes = flat.view(np.uint32 if kind == "U" else np.uint8).reshape(-1, itemsize)
+    # numpy strips the trailing NULs only: the length is the position of the last non-NUL code
+    result = np.ones(len(flat), dtype=bool)
+    if width:
+        result &= codes[:, width - 1] != 0
+    if itemsize > width:
+        result &= (codes[:, width:] == 0).all(axis=1)
+
+    tables = {}
+    for pattern in set(patterns):
+        compiled = re.compile(f"(?{flags}){pattern}" if flags else pattern)
+        tables[pattern] = np.array([compiled.fullmatch(chr(code)) is not None for code in range(TABLE_SIZE)])
+
+    # the code points above the tables are looked up as the last one, then matched with the regex
+    columns = codes[:, :width] if kind == "S" else np.minimum(codes[:, :width], TABLE_SIZE - 1).astype(np.uint8)
+    for index, pattern in enumerate(patterns):
+        result &= tables[pattern][columns[:, index]]
+
+    if kind == "U" and width:
+        beyond = (codes[:, :width] >= TABLE_SIZE).any(axis=1)
+        if beyond.any():
+            result[beyond] = [regex.fullmatch(str(value)) is not None for value in flat[beyond]]
+    return result.reshape(array.shape)
+
+
+def _loop(np: Any, array: Any, regex: re.Pattern) -> Any:
+    fullmatch = regex.fullmatch
+    values = array.reshape(-1)
+    if array.dtype.kind == "S":
+        matches = (fullmatch(value.decode("latin-1")) is not None for value in values)
+    else:
+        matches = (fullmatch(value) is not None for value in values)
+    return np.fromiter(matches, dtype=bool, count=values.size).reshape(array.shape)
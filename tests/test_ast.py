@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+date = (
+    SuperExpressive()
+        .start_of_input
+        .named_capture("year").exactly(4).digit.end()
+        .char('-')
+        .capture.between(1, 2).digit.end()
+        .backreference(1)
+        .named_backreference("year")
+        .end_of_input
+)
+
+expressions = [
+    SuperExpressive(),
+    date,
+    SuperExpressive()
+        .case_insensitive.line_by_line
+        .any_of
+            .string("a.b")
+            .any_of_chars("-]")
+            .range(0, 9)
+        .end()
+        .zero_or_more_lazy.anything_but_string("x+y")
+        .at_least(2).anything_but_chars("^")
+        .between_lazy(1, 3).anything_but_range('a', 'z')
+        .assert_not_behind.word.end()
+        .optional.group.whitespace_char.tab.end(),
+    SuperExpressive()
+        .capture.digit.end()
+        .subexpression(date, namespace="a_", by_reference=True)
+        .one_or_more.subexpression(date, namespace="b_", ignore_start_and_end=False),
+]
+
+
+@pytest.mark.parametrize("index", range(len(expressions)))
+def test_round_trip(index):
+    expr = expressions[index]
+    ast = json.loads(json.dumps(expr.to_ast()))
+    loaded = SuperExpressive.from_ast(ast)
+
+    assert loaded.to_regex_string() == expr.to_regex_string()
+    assert loaded.to_ast() == ast
+
+
+def test_format():
+    assert SuperExpressive().single_line.exactly(2).char('.').to_ast() == {
+        "version": 1,
+        "flags": "s",
+        "elements": [
+            { "type": "exactly", "times": 2, "child": { "type": "char", "value": "." } },
+        ],
+    }
+    assert date.to_ast()["elements"][1] == {
+        "type": "named_capture",
+        "name": "year",
+        "children": [{ "type": "exactly", "times": 4, "child": { "type": "digit" } }],
+    }
+
+
+def test_loaded_expression_keeps_building():
+    loaded = SuperExpressive.from_ast(date.to_ast())
+
+    assert loaded.backreference(2).to_regex_string() == date.backreference(2).to_regex_string()
+    with pytest.raises(RegexError):
+        loaded.end_of_input
+    with pytest.raises(RegexError):
+        loaded.named_capture("year")
+
+
+def test_unfinished_expression():
+    with pytest.raises(RegexError):
+        SuperExpressive().capture.digit.to_ast()
+
+
+@pytest.mark.parametrize("elements, message", [
+    ([{ "type": "backreference", "index": 1 }], "invalid index 1. There are 0 capture groups on this SuperExpression"),
+    ([{ "type": "char", "value": "ab" }], "char() can only be called with a single character (got ab)"),
+    ([{ "type": "named_backreference", "name": "x" }], "no capture group called 'x' exists (create one with .named_capture())"),
+    ([{ "type": "exactly", "times": 0, "child": { "type": "digit" } }], "n must be a positive integer (got 0)"),
+    (
+        [{ "type": "optional", "child": { "type": "end_of_input" } }],
+        "cannot quantify regular expression with 'optional' (end_of_input cannot be quantified)"
+    ),
+    (
+        [{ "type": "named_capture", "name": "x", "children": [] }] * 2,
+        "cannot use x again for a capture group"
+    ),
+    ([{ "type": "start_of_input" }] * 2, "This regex already has a defined start of input"),
+    ([{ "type": "group" }], "the children of group must be a list (got None)"),
+    ([{ "type": "root" }], "unknown element type: root"),
+    (["digit"], "an element must be a dict with a type (got 'digit')"),
+])
+def test_validation(elements, message):
+    with pytest.raises(RegexError) as e:
+        SuperExpressive.from_ast({ "version": 1, "elements": elements })
+    assert str(e.value) == message
+
+
+def test_invalid_document():
+    with pytest.raises(RegexError):
+        SuperExpressive.from_ast([])
+    with pytest.raises(RegexError):
+        SuperExpressive.from_ast({ "version": 2, "elements": [] })
+    with pytest.raises(RegexError):
+        SuperExpressive.from_ast({ "version": 1, "flags": "x", "elements": [] })
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_rnd = random.Random(0)
+samples = ["".join(_rnd.choice("abcdeglmptux \n") for _ in range(_rnd.randint(0, 40))) for _ in range(300)]
+
+
+def _any_of(*branches: str) -> SuperExpressive:
+    expr = SuperExpressive().any_of
+    for branch in branches:
+        expr = expr.string(branch)
+    return expr.end()
+
+
+expressions = [
+    _any_of("alpha", "alphabet", "beta", "gamma", "gamut", "a", "b", "x").capture.word.end(),
+    SuperExpressive().anything_but_string("abc").one_or_more_lazy.word.end_of_string,
+    SuperExpressive().single_line.anything_but_string("a\nb"),
+    SuperExpressive().anything_but_string("a\nb"),
+    SuperExpressive().one_or_more.subexpression(_any_of("abc", "ab", "abcd"), by_reference=True).string("bd"),
+    SuperExpressive().case_insensitive.subexpression(_any_of("ab", "A", "ac")),
+    SuperExpressive().zero_or_more_lazy.capture.word.end().end_of_string,
+]
+
+
+@pytest.mark.parametrize("index", range(len(expressions)))
+def test_candidates_are_equivalent(index):
+    expr = expressions[index]
+    result = expr.autotune(samples, repeat=1)
+
+    assert result.baseline.pattern == expr.to_regex_string()
+    assert all(candidate.agrees for candidate in result.candidates)
+    assert result.best.time == min(candidate.time for candidate in result.candidates)
+    assert result.expr.to_regex_string() == result.best.pattern
+
+
+def test_renderings():
+    result = expressions[0].autotune(samples, repeat=1)
+    patterns = { tuple(candidate.strategy.values()): candidate.pattern for candidate in result.candidates }
+
+    assert set(result.strategy) == {"any_of"}
+    assert patterns[("class",)] == r"(?:alpha|alphabet|beta|gamma|gamut|[abx])(\w)"
+    assert patterns[("flat",)] == r"(?:alpha|alphabet|beta|gamma|gamut|a|b|x)(\w)"
+    assert patterns[("trie",)] == r"(?:a(?:lpha(?:|bet)|)|b(?:eta|)|gam(?:ma|ut)|[x])(\w)"
+
+    result = expressions[1].autotune(samples, repeat=1)
+    patterns = { tuple(candidate.strategy.values()): candidate.pattern for candidate in result.candidates }
+    assert patterns[("expanded", "greedy")] == r"(?:[^a\n].{2}|a[^b\n].|ab[^c\n])\w+\Z"
+
+
+def test_multiline_strings():
+    # without .single_line, the strings sharing the prefix up to the newline can't match
+    result = expressions[3].autotune(["a\nc", "xyz", "abc", "a\n\n"], repeat=1)
+    patterns = { tuple(candidate.strategy.values()): candidate.pattern for candidate in result.candidates }
+    assert patterns[("expanded",)] == "(?:[^a\\n].{2}|a[^\n\\n].)"
+    assert result.expr.to_regex().search("a\nc") is None
+    result = expressions[2].autotune(["a\nc"], repeat=1)
+    patterns = { tuple(candidate.strategy.values()): candidate.pattern for candidate in result.candidates }
+    assert patterns[("expanded",)] == "(?s)(?:[^a].{2}|a[^\n].|a\n[^b])"
+
+
+def test_unsafe_rewrites_are_skipped():
+    # factoring abcd before its prefix ab, case-insensitive tries and lazy captures would change the matches
+    for index in (4, 5, 6):
+        result = expressions[index].autotune(samples, repeat=1)
+        assert all(candidate.strategy.get("any_of") != "trie" for candidate in result.candidates)
+        assert all(candidate.strategy.get("lazy") != "greedy" for candidate in result.candidates)
+
+
+def test_nothing_to_tune():
+    expr = SuperExpressive().one_or_more.digit
+    result = expr.autotune(["123"], repeat=1)
+
+    assert result.expr is expr
+    assert result.strategy == {}
+    assert len(result.candidates) == 1
+
+
+def test_tuned_expression_is_a_builder():
+    tuned = expressions[0].autotune(samples, repeat=1).expr
+    assert tuned.backreference(1).to_regex().groups == 1
+
+
+def test_invalid_samples():
+    with pytest.raises(RegexError) as e:
+        expressions[0].autotune([])
+    assert str(e.value) == "sample_inputs must not be empty"
+
+    with pytest.raises(RegexError) as e:
+        expressions[0].autotune([b"abc"])
+    assert str(e.value) == "sample_inputs must be strings"
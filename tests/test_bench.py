@@ -0,0 +1,115 @@
+import json
+
+from ..src.super_expressive.bench import builder, history, matching
+from ..src.super_expressive.bench import __main__ as bench_main
+
+
+def test_builder_report():
+    report = builder.run(sizes=[3], depths=[2], repeat=1, warmup=0)
+
+    assert report["suite"] == "builder"
+    assert {result["name"] for result in report["results"]} == {
+        "chain", "any_of", "subexpression", "subexpression_by_reference",
+        "to_regex_string", "to_regex", "nested",
+        "pickle_dumps", "pickle_loads", "to_bytes", "from_bytes", "from_ast", "bind_many"
+    }
+    for result in report["results"]:
+        assert len(result["times"]) == 1
+        assert result["median"] >= 0
+        assert result["peak_memory"] > 0
+    json.dumps(report)
+
+
+def test_builder_shapes():
+    assert builder.build_chain(4).to_regex_string() == r"\d\-(?:ab)?\d"
+    assert builder.build_any_of(2).to_regex_string() == r"(?:branch0|branch1)"
+    assert builder.build_nested(2).to_regex_string() == r"(?:x(x))"
+    assert builder.build_subexpressions(2).to_regex().groupindex.keys() == {
+        "n0_year", "n0_month", "n1_year", "n1_month"
+    }
+    assert (
+        builder.build_subexpressions(2, by_reference=True).to_regex_string()
+        == builder.build_subexpressions(2).to_regex_string()
+    )
+
+
+def test_matching_report():
+    pairs = matching.default_pairs(lines=20)
+    extra = matching.Corpus("extra", ["cat 12", "x=1", "<abc>"])
+    report = matching.run(pairs, [extra], repeat=1, warmup=0)
+
+    assert report["suite"] == "matching"
+    assert len(report["results"]) == 2 * len(pairs)
+    for result in report["results"]:
+        assert result["agrees"], result["name"]
+        assert set(result["methods"]) == {"match", "search", "finditer"}
+        for method in result["methods"].values():
+            assert method["slowdown"] > 0
+    json.dumps(report)
+
+
+def test_history_round_trip(tmp_path):
+    path = str(tmp_path / "history.json")
+    stored = history.History(path)
+    stored.record("abc123", { "builder/chain[size=10]/time": [1.0, 2.0] }, python="3.11.0")
+    stored.record("def456", { "builder/chain[size=10]/time": [3.0] }, python="3.11.0")
+    stored.record("abc123", { "builder/chain[size=10]/time": [4.0] }, python="3.11.0")
+    stored.save()
+
+    loaded = history.History(path)
+    assert [entry["revision"] for entry in loaded.entries] == ["def456", "abc123"]
+    assert loaded.find("abc", python="3.11.0")["metrics"] == { "builder/chain[size=10]/time": [4.0] }
+    assert loaded.find("abc", python="3.12.0") is None
+    assert loaded.latest_other("abc123", python="3.11.0")["revision"] == "def456"
+
+
+def test_history_abbreviated_revisions(tmp_path):
+    stored = history.History(str(tmp_path / "history.json"))
+    stored.record("abc123", { "builder/chain[size=10]/time": [1.0] }, python="3.11.0")
+    stored.record("def456", { "builder/chain[size=10]/time": [2.0] }, python="3.11.0")
+    stored.record("abc", { "builder/chain[size=10]/time": [3.0] }, python="3.11.0")
+
+    assert stored.resolve("def", python="3.11.0") == "def456"
+    assert stored.resolve("abc", python="3.11.0") == "abc"
+    assert stored.resolve("fed", python="3.11.0") == "fed"
+    assert stored.find("def", python="3.11.0")["revision"] == "def456"
+    assert stored.latest_other("ab", python="3.11.0")["revision"] == "def456"
+    assert stored.latest_other("abc1", python="3.11.0")["revision"] == "abc"
+
+
+def test_compare_thresholds_and_noise():
+    baseline = {
+        "a": [1.0, 1.0, 1.0, 1.0],
+        "noisy": [1.0, 2.0, 1.0, 2.0],
+        "b/relaxed": [1.0, 1.0, 1.0],
+        "only_baseline": [1.0],
+    }
+    current = {
+        "a": [1.2, 1.2, 1.2, 1.2],
+        "noisy": [1.2, 2.0, 1.4, 2.2],
+        "b/relaxed": [1.2, 1.2, 1.2],
+    }
+    comparisons = {
+        comparison.metric: comparison
+        for comparison in history.compare(baseline, current, 0.1, { "b/": 0.5 })
+    }
+
+    assert set(comparisons) == {"a", "noisy", "b/relaxed"}
+    assert comparisons["a"].regressed
+    assert not comparisons["noisy"].regressed
+    assert not comparisons["b/relaxed"].regressed
+    assert comparisons["b/relaxed"].threshold == 0.5
+
+
+def test_compare_command_exit_status(tmp_path, capsys):
+    path = str(tmp_path / "history.json")
+    stored = history.History(path)
+    stored.record("base", { "m": [1.0, 1.0, 1.0] })
+    stored.record("slow", { "m": [2.0, 2.0, 2.0] })
+    stored.record("same", { "m": [1.0, 1.0, 1.0] })
+    stored.save()
+
+    assert bench_main.main(["--history", path, "compare", "--no-run", "--revision", "slow", "--baseline", "base"]) == 1
+    assert "REGRESSED" in capsys.readouterr().out
+    assert bench_main.main(["--history", path, "compare", "--no-run", "--revision", "same", "--baseline", "base"]) == 0
+    assert bench_main.main(["--history", path, "compare", "--no-run", "--revision", "missing"]) == 2
@@ -0,0 +1,82 @@
+from array import array
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+expr = (
+    SuperExpressive()
+        .start_of_input
+        .named_capture("method").one_or_more.word.end()
+        .char(" ")
+        .named_capture("status").exactly(3).digit.end()
+        .optional.group
+            .char(" ")
+            .named_capture("latency").one_or_more.any_of_chars("0123456789.").end()
+        .end()
+)
+lines = ["GET 200 0.5", "garbage", "POST 404", "PUT 500 1.25"]
+
+
+def test_columns():
+    columns = expr.extract_columns(lines, dtypes={ "status": int, "latency": float })
+
+    assert columns["method"] == ["GET", "POST", "PUT"]
+    assert columns["status"] == array("q", [200, 404, 500])
+    assert columns["latency"] == array("d", [0.5, 0.0, 1.25])
+    assert columns.nulls == {
+        "method": bytearray([0, 0, 0]),
+        "status": bytearray([0, 0, 0]),
+        "latency": bytearray([0, 1, 0]),
+    }
+    assert (columns.rows, columns.skipped) == (3, 1)
+
+
+def test_same_values_as_groupdict():
+    regex = expr.to_regex()
+    rows = [match.groupdict() for match in map(regex.search, lines * 10) if match]
+    columns = expr.extract_columns(iter(lines * 10))
+    assert columns.data == { name: [row[name] for row in rows] for name in regex.groupindex }
+
+
+def test_typecodes():
+    columns = expr.extract_columns(lines, dtypes={ "status": "H", "latency": "f", "method": str })
+    assert columns["status"] == array("H", [200, 404, 500])
+    assert columns["latency"].typecode == "f"
+    assert columns["method"] == ["GET", "POST", "PUT"]
+
+
+def test_single_capture_and_no_match():
+    columns = SuperExpressive().named_capture("id").one_or_more.digit.end().extract_columns(["a1", "b22", "c"], dtypes={ "id": int })
+    assert columns["id"] == array("q", [1, 22])
+    assert (columns.rows, columns.skipped) == (2, 1)
+
+    columns = expr.extract_columns([], dtypes={ "status": int })
+    assert columns["status"] == array("q") and columns["method"] == [] and columns.rows == 0
+
+
+def test_numpy_dtypes():
+    np = pytest.importorskip("numpy")
+    columns = expr.extract_columns(lines, dtypes={ "status": np.int16, "latency": "float32" })
+    assert columns["status"].dtype == np.int16 and columns["status"].tolist() == [200, 404, 500]
+    assert columns["latency"].dtype == np.float32 and columns["latency"].tolist() == [0.5, 0.0, 1.25]
+    with pytest.raises(RegexError, match=r"^can't convert the captures of 'method' to int16: "):
+        expr.extract_columns(lines, dtypes={ "method": np.int16 })
+
+
+def test_errors():
+    with pytest.raises(RegexError, match=r"^the SuperExpression has no named captures to extract$"):
+        SuperExpressive().capture.digit.end().extract_columns(lines)
+    with pytest.raises(RegexError, match=r"^no named capture 'size' to give a dtype to$"):
+        expr.extract_columns(lines, dtypes={ "size": int })
+    with pytest.raises(RegexError, match=r"^invalid typecode 'x' for 'status'$"):
+        expr.extract_columns(lines, dtypes={ "status": "x" })
+    with pytest.raises(RegexError, match=r"^typecode 'u' for 'status' is not numeric$"):
+        expr.extract_columns(lines, dtypes={ "status": "u" })
+    with pytest.raises(RegexError, match=r"^can't convert the captures of 'method' to int: "):
+        expr.extract_columns(lines, dtypes={ "method": int })
+    with pytest.raises(RegexError, match=r"^can't convert the captures of 'status' to 'b': "):
+        expr.extract_columns(lines, dtypes={ "status": "b" })
+    with pytest.raises(RegexError):
+        SuperExpressive().named_capture("a").digit.extract_columns(lines)
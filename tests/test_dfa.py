@@ -0,0 +1,120 @@
+import random
+import re
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_rnd = random.Random(0)
+corpus = ["".join(_rnd.choice("abc1 \nA") for _ in range(_rnd.randint(0, 10))) for _ in range(500)]
+corpus += ["", "ab\n", "aab", "\n", "a\nc", "a\nb"]
+
+
+expressions = [
+    SuperExpressive().string("ab"),
+    SuperExpressive().zero_or_more.char("a"),
+    SuperExpressive().any_of.string("a").string("ab").string("abc").end(),
+    SuperExpressive().start_of_input.between(1, 3).any_of_chars("ab").end_of_input,
+    SuperExpressive().case_insensitive.string("ab").optional.digit,
+    SuperExpressive().anything_but_string("ab"),
+    SuperExpressive().single_line.anything_but_string("a\n"),
+    SuperExpressive().capture.one_or_more_lazy.word.end().whitespace_char,
+    SuperExpressive().at_least(2).char("a").end_of_string,
+    SuperExpressive().start_of_string.zero_or_more.any_char,
+    SuperExpressive().exactly(2).group.optional.char("a").char("b").end(),
+    SuperExpressive().end_of_input,
+    SuperExpressive().subexpression(SuperExpressive().any_of.char("a").range("0", "9").end(), by_reference=True),
+    SuperExpressive().anything_but_string("a\nb"),
+]
+
+
+@pytest.mark.parametrize("index", range(len(expressions)))
+def test_same_matches_as_re(index):
+    expr = expressions[index]
+    regex, matcher = expr.to_regex(), expr.to_matcher(engine="dfa")
+    for text in corpus:
+        expected, found = regex.search(text), matcher.search(text)
+        assert matcher.test(text) is (expected is not None)
+        assert (matcher.fullmatch(text) is None) is (regex.fullmatch(text) is None)
+        if expected:
+            # the leftmost match, but the longest one
+            assert found.start() == expected.start()
+            assert found.end() >= expected.end()
+
+
+@pytest.mark.parametrize("index", [0, 1, 2, 5, 7, 10, 12, 13])
+def test_leftmost_longest(index):
+    # without anchors, every substring matching the whole expression is a candidate
+    expr = expressions[index]
+    regex, matcher = expr.to_regex(), expr.to_matcher(engine="dfa")
+    for text in corpus[:100]:
+        spans = [
+            (i, j) for i in range(len(text) + 1) for j in range(i, len(text) + 1)
+            if regex.fullmatch(text, i, j)
+        ]
+        found = matcher.search(text)
+        if not spans:
+            assert found is None
+            continue
+        start = min(i for i, _ in spans)
+        assert found.span() == (start, max(j for i, j in spans if i == start))
+
+
+def test_finditer():
+    matcher = SuperExpressive().zero_or_more.char("x").to_matcher(engine="dfa")
+    assert [m.span() for m in matcher.finditer("axxb")] == [(0, 0), (1, 3), (3, 3), (4, 4)]
+
+    matcher = SuperExpressive().any_of.string("a").string("ab").end().to_matcher(engine="dfa")
+    assert [m.group() for m in matcher.finditer("ab a abab")] == ["ab", "a", "ab", "ab"]
+
+    matcher = SuperExpressive().start_of_input.char("a").to_matcher(engine="dfa")
+    assert [m.span() for m in matcher.finditer("aaa")] == [(0, 1)]
+
+
+def test_end_of_input_before_trailing_newline():
+    matcher = SuperExpressive().string("ab").end_of_input.to_matcher(engine="dfa")
+    assert matcher.search("xab\n").span() == (1, 3)
+    assert matcher.search("ab\nx") is None
+
+
+def test_match_object():
+    match = SuperExpressive().one_or_more.digit.to_matcher(engine="dfa").find("ab123c")
+    assert (match.span(), match.group(), match[0], match.string) == ((2, 5), "123", "123", "ab123c")
+    with pytest.raises(IndexError):
+        match.group(1)
+
+
+def test_linear_time():
+    # catastrophic backtracking for re
+    matcher = SuperExpressive().one_or_more.group.one_or_more.char("a").end().char("b").to_matcher(engine="dfa")
+    assert matcher.search("a" * 5000) is None
+    assert [m.span() for m in matcher.finditer("a" * 5000 + "b")] == [(0, 5001)]
+
+
+def test_cache_flush():
+    expr = SuperExpressive().char("a").exactly(8).any_of_chars("ab")
+    matcher = expr.to_matcher(engine="dfa")
+    matcher.max_states = 20
+    text = "".join(_rnd.choice("ab") for _ in range(2000))
+    assert matcher.search(text).span() == expr.to_regex().search(text).span()
+    assert matcher.search(text).span() == expr.to_regex().search(text).span()
+
+
+@pytest.mark.parametrize("expr, message", [
+    (SuperExpressive().capture.digit.end().backreference(1), "the dfa engine does not support backreferences"),
+    (SuperExpressive().assert_ahead.digit.end(), "the dfa engine does not support lookarounds"),
+    (SuperExpressive().word_boundary.digit, "the dfa engine does not support word boundaries"),
+    (SuperExpressive().group.start_of_input.end(), "the dfa engine does not support anchors elsewhere than at the start and the end"),
+    (SuperExpressive().line_by_line.start_of_input, "the dfa engine does not support anchors elsewhere than at the start and the end"),
+])
+def test_unsupported(expr, message):
+    with pytest.raises(RegexError) as e:
+        expr.to_matcher(engine="dfa")
+    assert str(e.value) == message
+
+
+def test_invalid_engine():
+    with pytest.raises(RegexError) as e:
+        SuperExpressive().to_matcher(engine="nfa")
+    assert str(e.value) == "engine must be 're' or 'dfa' (got 'nfa')"
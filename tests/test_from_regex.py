@@ -0,0 +1,81 @@
+import random
+import re
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_alphabet = "abcxyz019_-=. \n\tABC"
+_rnd = random.Random(0)
+corpus = [
+    "".join(_rnd.choice(_alphabet) for _ in range(_rnd.randint(0, 24)))
+    for _ in range(500)
+] + ["key=123", "cat", "dog cow", "aab", "abab", "2024-01-02", "x=ff", "A_B-c"]
+
+
+def _equivalent(a: re.Pattern, b: re.Pattern) -> bool:
+    for text in corpus:
+        for x, y in ((a.search(text), b.search(text)), (a.fullmatch(text), b.fullmatch(text))):
+            if (x and (x.span(), x.groups())) != (y and (y.span(), y.groups())):
+                return False
+    return True
+
+
+@pytest.mark.parametrize("pattern", [
+    r"",
+    r"abc",
+    r"^\s*(\w+)=(\d{1,3}|[a-fA-F_-]+)$",
+    r"(?P<x>ab)+?\d[^a-c](?=x)\1(?P=x)a{2,}",
+    r"(?i)cat|dog|c[ao]w",
+    r"[^\d]\W\b.\B\A\Z",
+    r"a??b*?c{0,3}?x{2}?",
+    r"(?<!x)(?:ab|cd)e",
+    r"[\d\-x][^abc]\n\t",
+    r"(?s).\.\*[.]",
+    r"(?m)^(a|)b$",
+    r"x(?:ab|c|)y",
+    r"(?x) a b  # comment",
+    r"(?a)\w+[^=]",
+    r"(a)(?:b(c))?\2\1",
+    r"[a-a0-9]+",
+])
+def test_equivalent(pattern):
+    expr = SuperExpressive.from_regex(pattern)
+    assert _equivalent(expr.to_regex(), re.compile(pattern))
+
+
+def test_output():
+    assert SuperExpressive.from_regex(r"^\d+(?P<unit>px|em)?$").to_regex_string() == r"^\d+(?P<unit>(?:px|em))?$"
+    assert SuperExpressive.from_regex(r"(?i)a[^0-9]").to_regex_string() == r"(?i)a[^0-9]"
+
+
+def test_result_is_a_builder():
+    expr = SuperExpressive.from_regex(r"(\d+)-")
+    assert expr.backreference(1).to_regex_string() == r"(\d+)\-\1"
+    with pytest.raises(RegexError):
+        expr.backreference(2)
+
+
+@pytest.mark.parametrize("pattern, message", [
+    (r"(?i:a)", "scoped inline flags are not supported"),
+    (r"(?>a)", "unsupported construct: atomic_group"),
+    (r"a++", "unsupported construct: possessive_repeat"),
+    (r"(a)?(?(1)b|c)", "unsupported construct: groupref_exists"),
+    (r"a{2,}?", "lazy {2,}? repeats are not supported"),
+    (r"a{0}", "{0} repeats are not supported"),
+    (r"a()", "empty groups are not supported"),
+    (r"a(?:\b)+", "quantified word_boundary is not supported"),
+    (r"a(?:\B){2}", "quantified non_word_boundary is not supported"),
+    (r"a(?:\Z)?", "quantified end_of_string is not supported"),
+    (r"(?:^)*a", "quantified start_of_input is not supported"),
+    (r"(|a)", "empty alternatives are only supported last"),
+    (r"[^\da]", "negated character sets may only contain characters, a single range or a single class"),
+    (r"^a(?:^b)", "This regex already has a defined start of input"),
+    (r"a(", "invalid regular expression 'a(': missing ), unterminated subpattern at position 1"),
+    (b"a", "pattern must be a string (got b'a')"),
+])
+def test_unsupported(pattern, message):
+    with pytest.raises(RegexError) as e:
+        SuperExpressive.from_regex(pattern)
+    assert str(e.value) == message
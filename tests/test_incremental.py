@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+expressions = {
+    "string": SuperExpressive().string("ab"),
+    "bounded": SuperExpressive().between(1, 3).digit,
+    "empty_matches": SuperExpressive().optional.char("a").optional.char("b"),
+    "word_boundaries": SuperExpressive().word_boundary.exactly(2).word.word_boundary,
+    "lookahead": SuperExpressive().assert_ahead.string("b1").end().char("a"),
+    "lookbehind": SuperExpressive().assert_behind.exactly(2).digit.end().char("a"),
+    "line_start": SuperExpressive().line_by_line.start_of_input.char("a"),
+    "end_of_input": SuperExpressive().char("a").end_of_input,
+    "any_of": SuperExpressive().any_of.string("aa").string("a").char("b").end(),
+    "anything_but_string": SuperExpressive().anything_but_string("ab"),
+    "unbounded": SuperExpressive().one_or_more.digit,
+    "backreference": SuperExpressive().capture.char("a").end().backreference(1),
+}
+
+
+@pytest.mark.parametrize("name", list(expressions))
+def test_same_matches_as_a_full_scan(name):
+    expr = expressions[name]
+    regex = expr.to_regex()
+    rnd = random.Random(0)
+    for _ in range(300):
+        text = "".join(rnd.choice("ab1 \n") for _ in range(rnd.randint(0, 200)))
+        matches = list(regex.finditer(text))
+        offset = rnd.randint(0, len(text))
+        removed = rnd.randint(0, min(3, len(text) - offset))
+        inserted = "".join(rnd.choice("ab1 \n") for _ in range(rnd.randint(0, 3)))
+        new_text = text[:offset] + inserted + text[offset + removed:]
+
+        expected = [match.span() for match in regex.finditer(new_text)]
+        assert expr.rematch(matches, (offset, removed, inserted), new_text) == expected
+        assert expr.rematch([match.span() for match in matches], (offset, removed, inserted), new_text) == expected
+
+
+def test_edits():
+    expr = SuperExpressive().exactly(4).digit
+    text = "1234 5678 9012 3456"
+    spans = [match.span() for match in expr.to_regex().finditer(text)]
+
+    # joining two matches shifts the following ones
+    assert expr.rematch(spans, (4, 1, ""), "12345678 9012 3456") == [(0, 4), (4, 8), (9, 13), (14, 18)]
+    # splitting a match
+    assert expr.rematch(spans, (7, 0, " "), "1234 56 78 9012 3456") == [(0, 4), (11, 15), (16, 20)]
+    assert expr.rematch(spans, (0, 0, ""), text) == spans
+    assert expr.rematch([], (0, 0, "0000"), "0000") == [(0, 4)]
+
+
+def test_errors():
+    expr = SuperExpressive().digit
+    with pytest.raises(RegexError, match=r"^the edit \(3, 0, 'ab'\) doesn't fit into a text of 4 characters$"):
+        expr.rematch([], (3, 0, "ab"), "1234")
+    with pytest.raises(RegexError):
+        SuperExpressive().capture.digit.rematch([], (0, 0, ""), "")
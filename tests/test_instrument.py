@@ -0,0 +1,72 @@
+import copy
+
+from ..src.super_expressive import SuperExpressive, instrument
+from ..src.super_expressive import main
+
+
+fragment = SuperExpressive().named_capture("x").digit.end()
+
+
+def test_collect():
+    with instrument.collect() as stats:
+        se = (
+            SuperExpressive()
+                .digit
+                .nonDigit
+                .non_digit
+                .subexpression(fragment, namespace="a_")
+                .one_or_more.char('!')
+        )
+        se.to_regex(name="bang")
+        se.to_regex_string()
+
+    assert stats["methods"]["digit"]["calls"] == 1
+    assert stats["methods"]["non_digit"]["calls"] == 2
+    assert stats["methods"]["subexpression"]["calls"] == 1
+    assert stats["methods"]["one_or_more"]["calls"] == 1
+    assert stats["builder"]["deepcopy"]["calls"] >= 6
+    assert stats["builder"]["merge_subexpression"]["calls"] == 2
+    assert stats["render"]["bang"]["calls"] == 1
+    assert stats["render"][""]["calls"] == 1
+    assert stats["compile"]["bang"]["calls"] == 1
+    assert "" not in stats["compile"]
+    assert all(entry["time"] >= 0 for section in stats.values() for entry in section.values())
+
+
+def test_nothing_is_patched():
+    originals = dict(vars(SuperExpressive))
+
+    with instrument.collect():
+        assert instrument.is_enabled()
+        assert main.deepcopy is copy.deepcopy
+        assert dict(vars(SuperExpressive)) == originals
+
+    assert not instrument.is_enabled()
+    assert main._recorder is None
+    assert dict(vars(SuperExpressive)) == originals
+
+
+def test_results_are_unchanged():
+    se = SuperExpressive().case_insensitive.capture.string("hello").end().backreference(1)
+    expected = se.to_regex()
+
+    with instrument.collect():
+        assert se.to_regex() == expected
+        assert se.toRegexString() == expected.pattern
+
+
+def test_enable_snapshot_reset():
+    instrument.reset()
+    instrument.enable()
+    try:
+        SuperExpressive().word.to_regex_string(name="w")
+    finally:
+        instrument.disable()
+    SuperExpressive().word
+
+    snapshot = instrument.snapshot()
+    assert snapshot["methods"]["word"]["calls"] == 1
+    assert snapshot["render"]["w"]["calls"] == 1
+
+    instrument.reset()
+    assert instrument.snapshot() == {}
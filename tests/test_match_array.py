@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive
+
+np = pytest.importorskip("numpy")
+
+
+_rnd = random.Random(0)
+codes = ["".join(_rnd.choice("0123456789abcdefABCDEF-xé٣") for _ in range(_rnd.randint(0, 6))) for _ in range(2000)]
+codes += ["", "dead", "12-4", "1\x00a", "٣٣٣٣", "dead\x00beef", "12-4\x00\x009"]
+
+hex_code = SuperExpressive().exactly(4).any_of_chars("0123456789abcdef")
+
+expressions = [
+    hex_code,
+    SuperExpressive().start_of_input.exactly(2).digit.char("-").range("0", "9").end_of_input,
+    SuperExpressive().case_insensitive.string("de").any_of.range("a", "f").digit.end().any_char,
+    SuperExpressive().exactly(3).capture.anything_but_chars("x").end(),
+    SuperExpressive().exactly(2).word.subexpression(SuperExpressive().non_digit, by_reference=True),
+    SuperExpressive(),
+    # not fixed-width: matched with the loop
+    SuperExpressive().between(1, 4).digit,
+    SuperExpressive().any_of.string("ab").digit.end(),
+    SuperExpressive().capture.digit.end().backreference(1),
+]
+
+
+@pytest.mark.parametrize("index", range(len(expressions)))
+@pytest.mark.parametrize("dtype", ["U", "S"])
+def test_same_as_fullmatch(index, dtype):
+    expr = expressions[index]
+    regex = expr.to_regex()
+    values = codes if dtype == "U" else [code for code in codes if code.isascii()]
+    array = np.array(values if dtype == "U" else [value.encode() for value in values])
+
+    expected = [regex.fullmatch(value) is not None for value in values]
+    assert expr.match_array(array).tolist() == expected
+
+
+def test_shapes_and_dtypes():
+    array = np.array([["dead", "beef"], ["xyz", "0000"]])
+    assert hex_code.match_array(array).tolist() == [[True, True], [False, True]]
+    assert hex_code.match_array(array[:, 1]).tolist() == [True, True]
+    assert hex_code.match_array(np.array(["abc"], dtype="U3")).tolist() == [False]
+    assert hex_code.match_array(np.array(["dead", "beef"], dtype=object)).tolist() == [True, True]
+
+
+def test_interior_nul():
+    expr = SuperExpressive().exactly(4).digit
+    values = ["1234\x00999", "1234\x00", "1234"]
+    assert expr.match_array(np.array(values)).tolist() == [False, True, True]
+    assert expr.match_array(np.array([value.encode() for value in values])).tolist() == [False, True, True]
+    assert [expr.to_regex().fullmatch(value) is not None for value in np.array(values)] == [False, True, True]
@@ -0,0 +1,127 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_rnd = random.Random(0)
+corpus = ["".join(_rnd.choice("abcGET 012\n") for _ in range(_rnd.randint(0, 12))) for _ in range(500)]
+corpus += ["", "abc", "abc\n", "GET 12", "GET 12\n", "ab", "\nab"]
+
+
+expressions = {
+    "fullmatch": SuperExpressive().start_of_input.string("GET ").one_or_more.digit.end_of_string,
+    "fullmatch_literal": SuperExpressive().start_of_string.string("ab").end_of_string,
+    "match_end_of_input": SuperExpressive().start_of_input.string("abc").end_of_input,
+    "match": SuperExpressive().start_of_string.between(1, 3).any_of_chars("abc").capture.digit.end(),
+    "search_literal": SuperExpressive().string("ab").char("c"),
+    "search_multiline": SuperExpressive().line_by_line.start_of_input.string("ab").end_of_input,
+    "search_case_insensitive": SuperExpressive().case_insensitive.string("get"),
+    "search_backreference": SuperExpressive().capture.word.end().backreference(1),
+    "empty": SuperExpressive(),
+    "bounded": SuperExpressive().start_of_input.optional.string("GET").exactly(2).any_of.digit.string("ab").end().end_of_string,
+}
+
+
+@pytest.mark.parametrize("name", list(expressions))
+def test_same_matches_as_search(name):
+    expr = expressions[name]
+    regex, matcher = expr.to_regex(), expr.matcher()
+    for text in corpus:
+        expected = regex.search(text)
+        found = matcher.find(text)
+        assert matcher.test(text) is (expected is not None)
+        assert (found and (found.span(), found.groups())) == (expected and (expected.span(), expected.groups()))
+
+
+def test_entry_points():
+    assert expressions["fullmatch"].matcher().mode == "fullmatch"
+    assert expressions["fullmatch"].matcher().regex.pattern == r"GET \d+"
+    assert expressions["match_end_of_input"].matcher().regex.pattern == "abc$"
+    assert expressions["match"].matcher().mode == "match"
+    assert expressions["search_multiline"].matcher().mode == "search"
+    assert expressions["search_multiline"].matcher().regex.pattern == "(?m)^ab$"
+
+
+def test_static_checks():
+    matcher = expressions["bounded"].matcher()
+    assert (matcher.min_width, matcher.max_width) == (2, 7)
+
+    matcher = expressions["fullmatch_literal"].matcher()
+    assert matcher.literal == "ab"
+    assert expressions["search_literal"].matcher().literal == "abc"
+    assert expressions["search_case_insensitive"].matcher().literal is None
+
+    matcher = expressions["search_backreference"].matcher()
+    assert (matcher.min_width, matcher.max_width) == (1, None)
+
+    # the regex is never run on inputs of impossible lengths
+    matcher = expressions["fullmatch"].matcher()
+    matcher._entry = None
+    assert not matcher.test("GET")
+    assert matcher.find("") is None
+
+
+def test_unfinished():
+    with pytest.raises(RegexError):
+        SuperExpressive().capture.digit.matcher()
+
+
+def _anchored(start: str, body: str, end: str) -> SuperExpressive:
+    expr = SuperExpressive()
+    if start:
+        expr = getattr(expr, start)
+    match body:
+        case "string": expr = expr.string("ab")
+        case "chars": expr = expr.one_or_more.any_of_chars("a c")
+        case "char": expr = expr.one_or_more.char("a")
+        case "other": expr = expr.zero_or_more.word
+    if end:
+        expr = getattr(expr, end)
+    return expr
+
+
+shapes = [
+    (start, body, end)
+    for start in ("", "start_of_input", "start_of_string")
+    for body in ("string", "empty", "chars", "char", "other")
+    for end in ("", "end_of_input", "end_of_string")
+]
+
+
+@pytest.mark.parametrize("start, body, end", shapes)
+def test_fast_path_same_matches_as_search(start, body, end):
+    expr = _anchored(start, body, end)
+    regex, matcher = expr.to_regex(), expr.to_matcher()
+    for text in corpus:
+        expected = regex.search(text)
+        found = matcher.find(text)
+        assert matcher.test(text) is (expected is not None)
+        assert (found and found.span()) == (expected and expected.span())
+
+
+def test_fast_path_shapes():
+    assert type(_anchored("start_of_input", "string", "end_of_input").to_matcher()).__name__ == "LiteralMatcher"
+    assert type(_anchored("", "chars", "end_of_string").to_matcher()).__name__ == "CharClassMatcher"
+    assert _anchored("start_of_string", "chars", "").to_matcher().chars == frozenset("a c")
+
+    # not supported: falls back to the regex
+    for expr in (
+        _anchored("", "chars", "end_of_input"),
+        _anchored("", "other", ""),
+        SuperExpressive().case_insensitive.string("ab"),
+        SuperExpressive().line_by_line.start_of_input.string("ab"),
+        SuperExpressive().one_or_more_lazy.any_of_chars("ab"),
+    ):
+        assert type(expr.to_matcher()).__name__ == "Matcher"
+
+
+def test_fast_path_escaping():
+    matcher = SuperExpressive().start_of_input.string("a.b[").end_of_string.to_matcher()
+    assert matcher.literal == "a.b["
+    assert matcher.test("a.b[") and not matcher.test("axb[")
+    assert matcher.find("a.b[").group() == "a.b["
+
+    matcher = SuperExpressive().one_or_more.any_of_chars("-.]").to_matcher()
+    assert matcher.find("ab-.]x").span() == (2, 5)
@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_rnd = random.Random(0)
+lines = [_rnd.choice(("GET /a 200", "GET /b 404", "POST /a 500", "PUT /c", "")) for _ in range(300)]
+expr = SuperExpressive().named_capture("method").string("GET").end().char(" ").capture.one_or_more.non_whitespace_char.end()
+
+
+@pytest.mark.parametrize("policy", ["lru", "clock"])
+@pytest.mark.parametrize("maxsize", [1, 2, 100])
+def test_same_results_as_search(policy, maxsize):
+    regex = expr.to_regex()
+    memo = {
+        "bool": expr.memoize(policy=policy, maxsize=maxsize),
+        "span": expr.memoize(result="span", policy=policy, maxsize=maxsize),
+        "groups": expr.memoize(result="groups", policy=policy, maxsize=maxsize),
+    }
+    for line in lines:
+        found = regex.search(line)
+        assert memo["bool"].lookup(line) is (found is not None)
+        assert memo["span"].lookup(line) == (found and found.span())
+        assert memo["groups"].lookup(line) == (found and (found.group(), *found.groups()))
+    for matcher in memo.values():
+        assert len(matcher) <= maxsize
+
+
+def test_stats():
+    memo = expr.memoize(max_length=8)
+    for line in ["GET /a 200", "PUT /c", "PUT /c", "PUT /c", "GET /b", "GET /b"]:
+        memo.lookup(line)
+    stats = memo.stats()
+    assert (stats.hits, stats.misses, stats.uncached, stats.evictions, stats.size) == (3, 2, 1, 0, 2)
+    assert stats.hit_rate == 0.6
+
+    memo.clear()
+    assert memo.stats().hits == len(memo) == 0
+
+
+def test_lru_eviction():
+    memo = expr.memoize(maxsize=2)
+    for line in ["a", "b", "a", "c", "a", "b"]:
+        memo.lookup(line)
+    # "b" was the least recently used when "c" came, then "c" when "b" came back
+    stats = memo.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 4, 2)
+
+
+def test_clock_eviction():
+    memo = expr.memoize(maxsize=2, policy="clock")
+    for line in ["a", "b", "a", "c", "d", "a"]:
+        memo.lookup(line)
+    # the hand gives "a" a second chance and evicts "b" for "c", then "a", not used since, for "d"
+    stats = memo.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 5, 3)
+
+
+def test_lookup_many():
+    memo = expr.memoize(result="span")
+    regex = expr.to_regex()
+    assert memo.lookup_many(lines) == [(found and found.span()) for found in map(regex.search, lines)]
+    stats = memo.stats()
+    assert stats.misses == len(set(lines)) and stats.hits == 0
+
+    memo.lookup_many(iter(lines))
+    assert memo.stats().hits == len(set(lines))
+
+
+def test_errors():
+    with pytest.raises(RegexError, match=r"^result must be 'bool', 'span' or 'groups' \(got 'match'\)$"):
+        expr.memoize(result="match")
+    with pytest.raises(RegexError, match=r"^policy must be 'lru' or 'clock' \(got 'lfu'\)$"):
+        expr.memoize(policy="lfu")
+    with pytest.raises(RegexError, match=r"^maxsize must be a positive integer \(got 0\)$"):
+        expr.memoize(maxsize=0)
+    with pytest.raises(RegexError, match=r"^max_length must be a non-negative integer \(got -1\)$"):
+        expr.memoize(max_length=-1)
+    with pytest.raises(RegexError):
+        SuperExpressive().capture.digit.memoize()
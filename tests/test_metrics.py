@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError, instrument
+from ..src.super_expressive.metrics import InstrumentedPattern, MetricsRegistry, registry
+
+
+number = SuperExpressive().capture.one_or_more.digit.end()
+
+
+def test_same_api_as_pattern():
+    plain = number.to_regex()
+    regex = number.to_regex(instrumented=True, name="api")
+
+    assert isinstance(regex, InstrumentedPattern)
+    assert regex == plain
+    assert regex.pattern == plain.pattern
+    assert regex.groups == 1
+    assert regex.search("ab 12").group(1) == "12"
+    assert regex.match("12ab").span() == (0, 2)
+    assert regex.fullmatch("12ab") is None
+    assert regex.findall("1 22 333") == ["1", "22", "333"]
+    assert [m.group() for m in regex.finditer("1 22")] == ["1", "22"]
+    assert regex.sub("#", "a1b22") == "a#b#"
+    assert regex.subn("#", "a1b22") == ("a#b#", 2)
+    assert regex.split("a1b") == ["a", "1", "b"]
+
+
+def test_counts_hits_and_latency():
+    regex = number.to_regex(instrumented=True, name="counts")
+    regex.metrics.reset()
+
+    for text in ("1", "a", "22", "b"):
+        regex.search(text)
+    list(regex.finditer("1 2"))
+    list(regex.finditer("none"))
+
+    exported = registry.export()["counts"]
+    assert exported["search"]["calls"] == 4
+    assert exported["search"]["hits"] == 2
+    assert exported["search"]["hit_rate"] == 0.5
+    assert exported["search"]["sampled"] == 4
+    assert sum(exported["search"]["buckets"].values()) == 4
+    assert exported["finditer"]["calls"] == 2
+    assert exported["finditer"]["hits"] == 1
+    assert "match" not in exported
+
+
+def test_sampling():
+    regex = number.to_regex(instrumented=True, name="sampled", sample_rate=0.25)
+    regex.metrics.reset()
+    for _ in range(20):
+        regex.match("1")
+
+    exported = registry.export()["sampled"]["match"]
+    assert exported["calls"] == 20
+    assert exported["hits"] == 20
+    assert exported["sampled"] == 5
+
+
+def test_sample_rate_must_be_in_range():
+    with pytest.raises(RegexError) as e:
+        number.to_regex(instrumented=True, sample_rate=0)
+    assert str(e.value) == "sample_rate must be in the (0, 1] interval (got 0)"
+
+
+def test_per_thread_counters_are_aggregated():
+    regex = number.to_regex(instrumented=True, name="threads")
+    regex.metrics.reset()
+
+    def work():
+        for _ in range(1000):
+            regex.search("42")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.export()["threads"]["search"]["calls"] == 4000
+
+
+def test_reset_leaves_the_other_threads_counters_alone():
+    own = MetricsRegistry()
+    regex = InstrumentedPattern(number.to_regex(), "reset", registry=own)
+    counted, resumed = threading.Event(), threading.Event()
+    counters = []
+
+    def work():
+        for _ in range(100):
+            regex.search("42")
+        counters.append(regex.metrics.counters()["search"])
+        counted.set()
+        resumed.wait()
+        for _ in range(50):
+            regex.search("x")
+
+    thread = threading.Thread(target=work)
+    thread.start()
+    counted.wait()
+    own.reset()
+    assert own.export() == {}
+    resumed.set()
+    thread.join()
+
+    exported = own.export()["reset"]["search"]
+    assert (exported["calls"], exported["hits"], exported["sampled"]) == (50, 0, 50)
+    assert sum(exported["buckets"].values()) == 50
+    assert (counters[0].calls, counters[0].hits) == (150, 100)
+
+
+def test_prometheus(tmp_path):
+    own = MetricsRegistry()
+    regex = InstrumentedPattern(number.to_regex(), 'quo"te', registry=own)
+    regex.search("1")
+    regex.search("x")
+
+    path = tmp_path / "metrics.prom"
+    own.write_prometheus(str(path))
+    text = path.read_text()
+
+    assert '# TYPE super_expressive_calls_total counter' in text
+    assert 'super_expressive_calls_total{pattern="quo\\"te",method="search"} 2' in text
+    assert 'super_expressive_hits_total{pattern="quo\\"te",method="search"} 1' in text
+    assert 'super_expressive_latency_seconds_bucket{pattern="quo\\"te",method="search",le="+Inf"} 2' in text
+    assert 'super_expressive_latency_seconds_count{pattern="quo\\"te",method="search"} 2' in text
+
+
+def test_with_instrumentation_enabled():
+    with instrument.collect() as stats:
+        regex = number.to_regex(instrumented=True, name="both")
+
+    assert isinstance(regex, InstrumentedPattern)
+    assert stats["compile"]["both"]["calls"] == 1
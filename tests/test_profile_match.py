@@ -0,0 +1,72 @@
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+def test_paths():
+    digits = SuperExpressive().exactly(2).digit
+    expr = (
+        SuperExpressive()
+            .string("at ")
+            .named_capture("time")
+                .any_of
+                    .string("noon")
+                    .subexpression(digits)
+                .end()
+            .end()
+            .capture.char("h").end()
+            .named_backreference("time")
+    )
+    profile = expr.profile_match("at 12h at noonh " * 10)
+    assert profile.pattern == expr.to_regex().pattern
+    assert list(profile.steps) == ["0.string", "1.named_capture('time')", "2.capture", "3.named_backreference"]
+    assert [cost.path for cost in profile.subtrees] == [
+        "1.named_capture('time')",
+        "1.named_capture('time')/0.any_of",
+        "1.named_capture('time')/0.any_of/0.string",
+        "1.named_capture('time')/0.any_of/1.subexpression",
+        "1.named_capture('time')/0.any_of/1.subexpression/0.exactly(2)",
+        "2.capture",
+    ]
+    assert profile.subtrees[0].pattern == r"(?P<time>(?:noon|\d{2}))(h)(?P=time)"
+    # followed by a backreference to a capture left out, the subtrees are timed alone
+    assert profile.subtrees[2].pattern == "noon"
+    assert profile.subtrees[-1].pattern == "(h)"
+    assert profile.culprit is None
+
+
+def test_culprit_of_nested_quantifiers():
+    expr = SuperExpressive().named_capture("a").one_or_more.group.one_or_more.char("a").end().end().char("b")
+    profile = expr.profile_match("a" * 16)
+    assert profile.total.growth > profile.threshold
+    assert profile.culprit.path == "0.named_capture('a')/0.one_or_more"
+    assert profile.culprit.pattern == "(?:a+)+b"
+
+
+def test_culprit_of_a_sequence():
+    expr = SuperExpressive().zero_or_more.digit.zero_or_more.digit.char("x")
+    profile = expr.profile_match("1" * 200)
+    assert profile.culprit.path == "0.zero_or_more"
+    # the first elements are fast on their own, the last one makes them backtrack
+    steps = profile.steps
+    assert steps["2.char"] > steps["0.zero_or_more"] + steps["1.zero_or_more"]
+
+
+def test_linear():
+    expr = SuperExpressive().any_of.string("foo").string("bar").end().exactly(3).digit
+    profile = expr.profile_match("foo bar 123 " * 200)
+    assert profile.culprit is None
+    assert all(cost.growth < profile.threshold for cost in profile.prefixes)
+    assert expr.profile_match("foo").total.growth is None
+
+
+def test_errors():
+    expr = SuperExpressive().digit
+    with pytest.raises(RegexError, match=r"^input must be a string$"):
+        expr.profile_match(b"1")
+    with pytest.raises(RegexError, match=r"^repeat must be a positive integer \(got 0\)$"):
+        expr.profile_match("1", repeat=0)
+    with pytest.raises(RegexError, match=r"^threshold must be greater than 1 \(got 1\)$"):
+        expr.profile_match("1", threshold=1)
+    with pytest.raises(RegexError):
+        SuperExpressive().capture.digit.profile_match("1")
@@ -0,0 +1,100 @@
+import sys
+from dataclasses import astuple, fields
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+expr = (
+    SuperExpressive()
+        .named_capture("method").one_or_more.word.end()
+        .char(" ")
+        .named_capture("status").exactly(3).digit.end()
+        .optional.group
+            .char(" ")
+            .named_capture("latency").one_or_more.any_of_chars("0123456789.").end()
+        .end()
+)
+
+
+def test_record_type():
+    Record = expr.record_type()
+    assert Record.__name__ == "Record"
+    assert [field.name for field in fields(Record)] == ["method", "status", "latency"]
+    assert Record.__slots__ == ("method", "status", "latency")
+
+    record = Record("GET", "200")
+    assert record == Record("GET", "200", None)
+    assert not hasattr(record, "__dict__")
+    assert sys.getsizeof(record) < sys.getsizeof({ "method": "GET", "status": "200", "latency": None })
+
+
+def test_parse():
+    assert astuple(expr.parse("> GET 200 0.5")) == ("GET", "200", "0.5")
+    assert expr.parse("GET 200").latency is None
+    assert expr.parse("nothing") is None
+
+    Access = expr.record_type("Access", converters={ "status": int, "latency": float })
+    assert expr.parse("GET 200 0.5", record_type=Access) == Access("GET", 200, 0.5)
+    # converters are not called on the captures which didn't take part in the match
+    assert expr.parse("GET 404", record_type=Access) == Access("GET", 404, None)
+
+
+def test_same_records_as_groupdict():
+    text = "GET 200 0.5\nPOST 404\nbad line\nPUT 500 1.25 GET 302"
+    Record = expr.record_type()
+    expected = [Record(**match.groupdict()) for match in expr.to_regex().finditer(text)]
+    assert list(expr.parse_iter(text, record_type=Record)) == expected
+    assert len(expected) == 4
+
+
+def test_namespaced_and_single_captures():
+    year = SuperExpressive().named_capture("year").exactly(4).digit.end()
+    Year = year.record_type(converters={ "year": int })
+    assert year.parse("in 2024", record_type=Year) == Year(2024)
+    assert [astuple(record) for record in year.parse_iter("1999 2000")] == [("1999",), ("2000",)]
+
+    dated = SuperExpressive().named_capture("day").exactly(2).digit.end().char("/").subexpression(year, namespace="date_")
+    assert dated.parse("01/2024").date_year == "2024"
+
+
+def test_nested_captures():
+    nested = SuperExpressive().named_capture("outer").named_capture("inner").digit.end().char("x").end()
+    merged = SuperExpressive().subexpression(nested)
+    assert list(merged.record_type().__dataclass_fields__) == ["outer", "inner"]
+    assert astuple(merged.parse("5x")) == ("5x", "5")
+    assert merged.parse("5") is None
+
+    inner = SuperExpressive().named_capture("outer").named_capture("inner").digit.end().end()
+    assert astuple(SuperExpressive().subexpression(inner).parse("5")) == ("5", "5")
+
+
+def test_parsers_are_cached():
+    Access = expr.record_type(converters={ "status": int })
+    assert expr.parse("GET 200", record_type=Access) == expr.parse("GET 200", record_type=Access)
+    assert type(expr.parse("GET 200")) is type(expr.parse("POST 500"))
+
+
+def test_errors():
+    with pytest.raises(RegexError, match=r"^the SuperExpression has no named captures to make records of$"):
+        SuperExpressive().capture.digit.end().record_type()
+    with pytest.raises(RegexError, match=r"^name must be a valid identifier \(got 'access log'\)$"):
+        expr.record_type("access log")
+    with pytest.raises(RegexError, match=r"^no named capture 'size' to convert$"):
+        expr.record_type(converters={ "size": int })
+    with pytest.raises(RegexError, match=r"^record_type must have the named captures as fields \(method, status, latency\)$"):
+        expr.parse("GET 200", record_type=SuperExpressive().named_capture("method").word.end().record_type())
+    with pytest.raises(RegexError, match=r"^record_type must have the named captures as fields"):
+        expr.parse("GET 200", record_type=dict)
+    with pytest.raises(RegexError):
+        SuperExpressive().named_capture("a").digit.parse("1")
+
+
+def test_keyword_captures():
+    expr = SuperExpressive().named_capture("from").word.end()
+    with pytest.raises(RegexError, match=r"^named capture 'from' is a Python keyword and can't be a record field$"):
+        expr.parse("a")
+    with pytest.raises(RegexError, match=r"^named capture 'from' is a Python keyword and can't be a record field$"):
+        expr.record_type()
+    assert SuperExpressive().named_capture("match").word.end().parse("a").match == "a"
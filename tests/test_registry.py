@@ -0,0 +1,61 @@
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError, PatternRegistry
+
+
+def _registry(size: int) -> PatternRegistry:
+    registry = PatternRegistry()
+    for i in range(size):
+        registry.register(f"p{i}", SuperExpressive().string(f"key{i}=").one_or_more.digit)
+    return registry
+
+
+@pytest.mark.parametrize("workers, processes", [(1, False), (4, False), (2, True)])
+def test_compile_all(workers, processes):
+    registry = _registry(20)
+    stats = registry.compile_all(workers, processes=processes, chunk_size=3)
+
+    assert set(stats) == { f"p{i}" for i in range(20) }
+    assert all(times["render"] >= 0 and times["compile"] >= 0 for times in stats.values())
+    assert registry.compiled == 20
+    assert registry.get("p7").pattern == r"key7=\d+"
+    assert registry.compile_all(workers) == {}
+
+
+def test_get_compiles_lazily():
+    registry = _registry(3)
+
+    assert registry.get("p1").fullmatch("key1=42")
+    assert registry.get("p1") is registry.get("p1")
+    assert registry.compiled == 1
+    assert set(registry.stats()) == {"p1"}
+    assert set(registry.compile_all(1)) == {"p0", "p2"}
+    assert len(registry) == 3 and "p2" in registry and list(registry) == ["p0", "p1", "p2"]
+
+    with pytest.raises(KeyError):
+        registry.get("missing")
+
+
+def test_invalid_registrations():
+    registry = _registry(1)
+
+    with pytest.raises(RegexError) as e:
+        registry.register("p0", SuperExpressive())
+    assert str(e.value) == "a pattern is already registered as 'p0'"
+
+    with pytest.raises(RegexError) as e:
+        registry.register("raw", r"\d+")
+    assert str(e.value) == "expr must be a SuperExpressive instance"
+
+
+def test_render_failures():
+    registry = _registry(2)
+    registry.register("unbound", SuperExpressive().param("x"))
+
+    with pytest.raises(RegexError) as e:
+        registry.compile_all(1)
+    assert str(e.value).startswith("cannot render the patterns 'unbound': Cannot render a template")
+    assert registry.compiled == 2
+
+    with pytest.raises(RegexError):
+        registry.get("unbound")
@@ -0,0 +1,98 @@
+import random
+import re
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+_rnd = random.Random(0)
+samples = [
+    " ".join(_rnd.choice(["PUT", "PUT", "PUT", "POST", "GET", "x", "ab", "abc"]) for _ in range(_rnd.randint(1, 8)))
+    for _ in range(200)
+]
+
+
+def _any_of(*branches: str) -> SuperExpressive:
+    expr = SuperExpressive().any_of
+    for branch in branches:
+        expr = expr.string(branch) if len(branch) > 1 else expr.char(branch)
+    return expr.end()
+
+
+def test_profile():
+    expr = SuperExpressive().capture.any_of.string("GET").string("POST").string("PUT").end().end().whitespace_char.backreference(1)
+    profile = expr.profile_branches(["PUT PUT", "GET GET x", "PUT POST", "POST POST PUT PUT"])
+
+    assert profile.pattern == expr.to_regex_string()
+    assert profile.counts == [[1, 1, 2]]
+    assert profile.samples == 4
+
+
+def test_profile_in_rendered_order():
+    # the characters fused into a class are tried after the strings
+    expr = _any_of("a", "ab")
+    assert expr.profile_branches(["ab", "a"]).counts == [[1, 1]]
+
+
+def test_nested_and_referenced():
+    inner = _any_of("x", "y")
+    expr = SuperExpressive().one_or_more.any_of.string("ab").subexpression(inner, by_reference=True).end().char("c")
+    profile = expr.profile_branches(["abc", "yc", "abxc"])
+
+    # every alternative taking part in a match counts once, whatever the repetitions
+    assert profile.counts == [[2, 2], [1, 1]]
+
+
+def test_reorder():
+    expr = SuperExpressive().capture.any_of.string("GET").string("POST").string("PUT").end().end()
+    reordered = expr.reorder_by_profile(expr.profile_branches(samples))
+
+    assert reordered.to_regex_string() == r"((?:PUT|GET|POST))"
+    assert reordered.backreference(1).to_regex().groups == 1
+
+
+def test_reorder_preserves_matches():
+    exprs = [
+        _any_of("GET", "POST", "PUT", "x"),
+        _any_of("ab", "abc", "PUT"),
+        SuperExpressive().case_insensitive.any_of.string("get").string("put").end(),
+        SuperExpressive().one_or_more.subexpression(_any_of("POST", "GET", "PUT"), by_reference=True),
+    ]
+    for expr in exprs:
+        reordered = expr.reorder_by_profile(expr.profile_branches(samples))
+        a, b = expr.to_regex(), reordered.to_regex()
+        assert [m.span() for text in samples for m in a.finditer(text)] == [m.span() for text in samples for m in b.finditer(text)]
+
+
+def test_not_reordered():
+    # ab is a prefix of abc: the order decides which one matches
+    expr = _any_of("ab", "abc")
+    assert expr.profile_branches(samples).counts == [[sum(text.count("ab") for text in samples), 0]]
+    assert expr.reorder_by_profile(expr.profile_branches(samples)) is expr
+
+    expr = SuperExpressive().any_of.string("P").one_or_more.word.end()
+    assert expr.reorder_by_profile(expr.profile_branches(samples)) is expr
+
+    expr = SuperExpressive().case_insensitive.any_of.string("put").string("PUTS").end()
+    assert expr.reorder_by_profile(expr.profile_branches(samples)) is expr
+
+
+def test_merge():
+    expr = _any_of("GET", "PUT")
+    profile = expr.profile_branches(["GET"]).merge(expr.profile_branches(["PUT", "PUT"]))
+    assert (profile.counts, profile.samples) == ([[1, 2]], 3)
+
+    with pytest.raises(ValueError):
+        profile.merge(_any_of("GET", "POST").profile_branches([]))
+
+
+def test_errors():
+    expr = _any_of("GET", "PUT")
+    with pytest.raises(RegexError) as e:
+        expr.reorder_by_profile(_any_of("GET", "POST").profile_branches(samples))
+    assert str(e.value) == "the profile must be recorded by .profile_branches() of the same SuperExpression"
+
+    with pytest.raises(RegexError) as e:
+        expr.profile_branches([b"GET"])
+    assert str(e.value) == "sample_inputs must be strings"
@@ -0,0 +1,110 @@
+import copy
+import marshal
+import pickle
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+date = (
+    SuperExpressive()
+        .start_of_input
+        .named_capture("year").exactly(4).digit.end()
+        .char('-')
+        .capture.between(1, 2).digit.end()
+        .backreference(1)
+        .named_backreference("year")
+        .anything_but_range(0, 9)
+        .end_of_input
+)
+
+expressions = [
+    SuperExpressive(),
+    date,
+    SuperExpressive()
+        .case_insensitive.unicode
+        .any_of
+            .string("hello")
+            .any_of_chars("abc")
+            .range('a', 'f')
+        .end()
+        .zero_or_more_lazy.anything_but_string("xyz")
+        .assert_not_behind.word.end(),
+    SuperExpressive()
+        .capture.digit.end()
+        .subexpression(date, namespace="a_", by_reference=True)
+        .one_or_more.subexpression(date, namespace="b_", ignore_start_and_end=False, by_reference=True),
+]
+
+
+@pytest.mark.parametrize("index", range(len(expressions)))
+def test_round_trip(index):
+    expr = expressions[index]
+
+    for restored in (
+        pickle.loads(pickle.dumps(expr)),
+        SuperExpressive.from_tuple(expr.to_tuple()),
+        SuperExpressive.from_bytes(expr.to_bytes()),
+        copy.deepcopy(expr),
+    ):
+        assert restored.to_tuple() == expr.to_tuple()
+        assert restored.to_regex_string() == expr.to_regex_string()
+
+
+def test_state_is_plain_data():
+    state = expressions[3].to_tuple()
+    assert marshal.loads(marshal.dumps(state)) == state
+
+
+def test_unfinished_expression():
+    expr = SuperExpressive().capture.digit.optional
+    restored = pickle.loads(pickle.dumps(expr))
+
+    assert restored.word.end().to_regex_string() == r"(\d\w?)"
+    assert restored.word.end().backreference(1).to_regex_string() == r"(\d\w?)\1"
+    with pytest.raises(RegexError):
+        restored.optional
+
+
+def test_restored_expression_keeps_validation():
+    restored = pickle.loads(pickle.dumps(date))
+
+    with pytest.raises(RegexError):
+        restored.start_of_input
+    with pytest.raises(RegexError):
+        restored.backreference(3)
+    with pytest.raises(RegexError):
+        SuperExpressive().named_capture("year").end().subexpression(restored)
+
+
+def test_shared_fragments_are_encoded_once():
+    expr = expressions[3]
+    state = expr.to_tuple()
+    restored = SuperExpressive.from_tuple(state)
+
+    assert len(state[6]) == 1
+    elements = restored._SuperExpressive__stack[-1].elements
+    assert elements[1].value.fragment is elements[2].value.value.fragment
+
+
+def test_copy():
+    assert copy.copy(date) is date
+    copied = copy.deepcopy(date)
+    assert copied is not date
+    assert copied._SuperExpressive__stack[0].elements is not date._SuperExpressive__stack[0].elements
+
+
+def test_invalid_state():
+    state = date.to_tuple()
+
+    with pytest.raises(RegexError) as e:
+        SuperExpressive.from_tuple((0, *state[1:]))
+    assert str(e.value) == "unsupported serialization format version 0 (expected 1)"
+
+    with pytest.raises(RegexError):
+        SuperExpressive.from_tuple(state[:-1])
+    with pytest.raises(RegexError):
+        SuperExpressive.from_tuple((*state[:-1], (((999,), None, ()),)))
+    with pytest.raises(RegexError):
+        SuperExpressive.from_bytes(b"garbage")
@@ -0,0 +1,90 @@
+import io
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+log = (
+    "preamble line\n"
+    "2024-01-01 INFO started\n"
+    "2024-01-01 ERROR failed\n"
+    "    at first()\n"
+    "    at second()\n"
+    "2024-01-02 INFO done\n"
+    "2024-01-02 ERROR failed again\n"
+    "    at third()"
+)
+
+record_start = (
+    SuperExpressive()
+        .start_of_input
+        .exactly(4).digit.char('-')
+        .exactly(2).digit.char('-')
+        .exactly(2).digit
+)
+
+error = (
+    SuperExpressive()
+        .string("ERROR ")
+        .named_capture("message")
+            .one_or_more.anything_but_chars("\n")
+        .end()
+)
+
+
+def test_lines():
+    se = SuperExpressive().string("INFO ").capture.one_or_more.word.end()
+    found = [m.group(1) for m in se.iter_file(io.StringIO(log))]
+
+    assert found == ["started", "done"]
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7, 16, 64, 1 << 16])
+def test_multiline_records(block_size):
+    found = [
+        m.string
+        for m in error.iter_file(io.StringIO(log), record_start=record_start, block_size=block_size)
+    ]
+
+    assert found == [
+        "2024-01-01 ERROR failed\n    at first()\n    at second()",
+        "2024-01-02 ERROR failed again\n    at third()",
+    ]
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 1 << 16])
+def test_multiline_records_preamble_and_trailing_newline(block_size):
+    se = SuperExpressive().one_or_more.any_char
+    records = [
+        m.string
+        for m in se.iter_file(io.StringIO(log + "\n"), record_start=record_start, block_size=block_size)
+    ]
+
+    assert records[0] == "preamble line"
+    assert records[-1] == "2024-01-02 ERROR failed again\n    at third()"
+    assert len(records) == 5
+
+
+def test_record_start_must_be_a_super_expressive_instance():
+    with pytest.raises(RegexError) as e:
+        error.iter_file(io.StringIO(log), record_start="nope")  # type: ignore
+    assert str(e.value) == "record_start must be a SuperExpressive instance"
+
+
+@pytest.mark.parametrize("block_size", [0, -1, 1.5, "64", True])
+def test_block_size_is_validated_eagerly(block_size):
+    with pytest.raises(RegexError) as e:
+        error.iter_file(io.StringIO(log), block_size=block_size)  # type: ignore
+    assert str(e.value) == f"block_size must be a positive integer (got {block_size!r})"
+
+
+def test_is_lazy():
+    class Endless(io.TextIOBase):
+        def read(self, size=-1):
+            return "2024-01-01 ERROR boom\n    at loop()\n" * 10
+
+    matches = error.iter_file(Endless(), record_start=record_start)
+
+    assert next(matches).group("message") == "boom"
+    assert next(matches).group("message") == "boom"
@@ -253,6 +253,29 @@ def test_indexed_backreferencing():
     assert regex == se.to_regex().pattern
 
 
+# XXX: this test uses a different regex syntax (Python, not JS)
+def test_indexed_backreferencing_after_named_captures():
+    regex = r"(?P<module>.{2})(?P=module)(.{2})\2(\d)\3"
+    se = (
+        SuperExpressive()
+            .subexpression(named_capture_subexpression)
+            .subexpression(indexed_backreference_subexpression)
+            .capture.digit.end()
+            .backreference(3)
+    )
+
+    assert regex == se.to_regex_string()
+    assert regex == se.to_regex().pattern
+
+    se = (
+        SuperExpressive()
+            .subexpression(named_capture_subexpression, by_reference=True)
+            .capture.digit.end()
+            .backreference(2)
+    )
+    assert r"(?P<module>.{2})(?P=module)(\d)\2" == se.to_regex_string()
+
+
 nested_subexpression = SuperExpressive().exactly(2).any_char
 first_layer_subexpression = (
     SuperExpressive()
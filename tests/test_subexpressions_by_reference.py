@@ -0,0 +1,120 @@
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+date = (
+    SuperExpressive()
+        .start_of_input
+        .named_capture("year").exactly(4).digit.end()
+        .char('-')
+        .capture.exactly(2).digit.end()
+        .backreference(1)
+        .named_backreference("year")
+        .end_of_input
+)
+
+flagged = SuperExpressive().case_insensitive.line_by_line.string("hello")
+
+nested = (
+    SuperExpressive()
+        .named_capture("outer")
+            .subexpression(date, namespace="in_", by_reference=True)
+        .end()
+        .capture.word.end()
+        .backreference(2)
+)
+
+
+def _build(by_reference: bool) -> list[SuperExpressive]:
+    return [
+        SuperExpressive()
+            .capture.digit.end()
+            .subexpression(date, by_reference=by_reference)
+            .backreference(1),
+        SuperExpressive()
+            .subexpression(date, namespace="a_", by_reference=by_reference)
+            .optional.subexpression(date, namespace="b_", by_reference=by_reference),
+        SuperExpressive()
+            .subexpression(date, ignore_start_and_end=False, by_reference=by_reference),
+        SuperExpressive()
+            .single_line
+            .subexpression(flagged, ignore_flags=False, by_reference=by_reference),
+        SuperExpressive()
+            .capture.digit.end()
+            .one_or_more.subexpression(nested, namespace="n_", by_reference=by_reference)
+            .subexpression(nested, namespace="m_", ignore_start_and_end=False, by_reference=by_reference),
+    ]
+
+
+@pytest.mark.parametrize("index", range(5))
+def test_same_output_as_copying(index):
+    copied = _build(False)[index]
+    referenced = _build(True)[index]
+
+    assert referenced.to_regex_string() == copied.to_regex_string()
+    assert referenced.to_regex() == copied.to_regex()
+
+
+def test_backreference_after_reference_uses_capture_count():
+    se = (
+        SuperExpressive()
+            .subexpression(date, by_reference=True)
+            .capture.digit.end()
+            .backreference(2)
+    )
+
+    assert se.to_regex_string() == r"(?P<year>\d{4})\-(\d{2})\1(?P=year)(\d)\2"
+
+
+def test_group_name_collision():
+    with pytest.raises(RegexError) as e:
+        (
+            SuperExpressive()
+                .named_capture("a_year").digit.end()
+                .subexpression(date, namespace="a_", by_reference=True)
+        )
+    assert str(e.value) == "cannot use a_year again for a capture group"
+
+
+def test_start_and_end_collisions():
+    with pytest.raises(RegexError) as e:
+        SuperExpressive().start_of_input.subexpression(date, ignore_start_and_end=False, by_reference=True)
+    assert str(e.value) == (
+        "The parent regex already has a defined start of input. "
+        "You can ignore a subexpressions start_of_input/end_of_input markers "
+        "with the ignore_start_and_end option"
+    )
+
+    with pytest.raises(RegexError) as e:
+        SuperExpressive().end_of_input.subexpression(date, ignore_start_and_end=False, by_reference=True)
+    assert str(e.value) == (
+        "The parent regex already has a defined end of input. "
+        "You can ignore a subexpressions start_of_input/end_of_input markers "
+        "with the ignore_start_and_end option"
+    )
+
+    with pytest.raises(RegexError):
+        SuperExpressive().subexpression(date, ignore_start_and_end=False, by_reference=True).end_of_input
+
+
+def test_fragment_is_shared_not_copied():
+    first = SuperExpressive().subexpression(date, namespace="a_", by_reference=True)
+    second = SuperExpressive().digit.subexpression(date, namespace="b_", by_reference=True).digit
+
+    first_ref = first._SuperExpressive__stack[-1].elements[0].value
+    second_ref = second._SuperExpressive__stack[-1].elements[1].value
+
+    assert first_ref.fragment is second_ref.fragment
+    assert first_ref.fragment.elements is date._SuperExpressive__stack[-1].elements
+
+
+def test_rendering_is_cached_per_options():
+    se = SuperExpressive().subexpression(date, namespace="cached_", by_reference=True)
+    fragment = se._SuperExpressive__stack[-1].elements[0].value.fragment
+
+    se.to_regex_string()
+    assert ("cached_", 0, True) in fragment.rendered
+    fragment.rendered[("cached_", 0, True)] = "sentinel"
+    assert se.to_regex_string() == "sentinel"
+    del fragment.rendered[("cached_", 0, True)]
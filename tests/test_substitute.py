@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError, SubstitutionSet
+
+
+rules = [
+    (SuperExpressive().exactly(3).digit.char("-").exactly(4).digit, "###-####"),
+    (SuperExpressive().named_capture("user").one_or_more.word.end().char("@").one_or_more.word.string(".com"), r"\g<user>@..."),
+    (SuperExpressive().capture.range("A", "Z").end().one_or_more.range("A", "Z").word_boundary, lambda match: match[1] + "."),
+    (SuperExpressive().string("Bearer ").one_or_more.non_whitespace_char, "Bearer <token>"),
+    (SuperExpressive().capture.word.end().backreference(1), r"<\1>"),
+]
+
+_rnd = random.Random(0)
+_words = ["hello", "555-1234", "bob@ex.com", "HTTP", "Bearer abc", "wood", "a-b", "Zz"]
+messages = [" ".join(_rnd.choice(_words) for _ in range(_rnd.randint(0, 12))) for _ in range(300)]
+
+
+def test_same_result_as_sequential():
+    substitutions = SubstitutionSet(rules)
+    assert substitutions.verify(messages) == []
+    assert substitutions.sub("dial 555-1234 or bob@ex.com, HTTP Bearer x.y wood") == (
+        "dial ###-#### or bob@..., H. Bearer <token> w<o>d"
+    )
+
+
+def test_priority_follows_the_list():
+    first = SuperExpressive().string("ab")
+    second = SuperExpressive().one_or_more.word
+    assert SubstitutionSet([(first, "1"), (second, "2")]).sub("ab abc") == "1 12"
+    assert SubstitutionSet([(second, "2"), (first, "1")]).sub("ab abc") == "2 2"
+
+
+def test_differences_with_sequential():
+    # the second rule matches the replacement of the first one
+    substitutions = SubstitutionSet([
+        (SuperExpressive().string("cat"), "dog"),
+        (SuperExpressive().string("dog"), "wolf"),
+    ])
+    assert substitutions.sub("cat dog") == "dog wolf"
+    assert substitutions.sequential("cat dog") == "wolf wolf"
+    assert substitutions.verify(["dog", "cat dog"]) == ["cat dog"]
+
+
+def test_subn_and_count():
+    substitutions = SubstitutionSet(rules)
+    assert substitutions.subn("555-1234 HTTP 555-0000") == ("###-#### H. ###-####", 3)
+    assert substitutions.sub("555-1234 HTTP 555-0000", count=2) == "###-#### H. 555-0000"
+
+
+def test_anchors_and_flags():
+    substitutions = SubstitutionSet([
+        (SuperExpressive().case_insensitive.start_of_input.string("get"), "GET"),
+        (SuperExpressive().case_insensitive.string("http").end_of_input, "HTTP"),
+    ])
+    assert substitutions.sub("Get get http Http") == "GET get http HTTP"
+
+
+def test_anchored_rules():
+    substitutions = SubstitutionSet([
+        (SuperExpressive().start_of_input.string("a"), "x"),
+        (SuperExpressive().start_of_input.string("b"), "y"),
+        (SuperExpressive().string("c").end_of_input, "z"),
+        (SuperExpressive().string("d").end_of_input, "w"),
+    ])
+    assert substitutions.sub("a b c d") == "x b c w"
+    assert substitutions.sub("b a d c") == "y a d z"
+    assert substitutions.verify(["a", "b", "ab", "cd", "dc", "a c", "b d", ""]) == []
+
+    lines = SubstitutionSet([
+        (SuperExpressive().line_by_line.start_of_input.string("-"), "*"),
+        (SuperExpressive().line_by_line.string(";").end_of_input, ""),
+    ])
+    assert lines.sub("- a;\n-b;\nc - d;") == "* a\n*b\nc - d"
+
+
+def test_guard():
+    substitutions = SubstitutionSet([(SuperExpressive().string("ab"), "x"), (SuperExpressive().range("0", "9"), "#")])
+    assert substitutions.regex.pattern.startswith("(?=[a0-9])")
+    substitutions = SubstitutionSet([(SuperExpressive().string("ab"), "x"), (SuperExpressive().optional.digit, "#")])
+    assert substitutions.regex.pattern.startswith("(?:")
+
+
+def test_errors():
+    with pytest.raises(RegexError, match=r"^a SubstitutionSet needs at least one rule$"):
+        SubstitutionSet([])
+    with pytest.raises(RegexError, match=r"^expr must be a SuperExpressive instance$"):
+        SubstitutionSet([("ab", "x")])
+    with pytest.raises(RegexError, match=r"^replacement must be a string or a callable$"):
+        SubstitutionSet([(SuperExpressive().string("ab"), None)])
+    with pytest.raises(RegexError, match=r"^the expressions of a SubstitutionSet must have the same flags$"):
+        SubstitutionSet([(SuperExpressive().string("ab"), "x"), (SuperExpressive().case_insensitive.string("cd"), "y")])
@@ -0,0 +1,106 @@
+import pickle
+
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError
+
+
+template = (
+    SuperExpressive()
+        .start_of_input
+        .string("tenant=")
+        .param("tenant")
+        .char('@')
+        .one_or_more.param("host", kind="chars")
+        .optional.param("tenant")
+        .end_of_input
+)
+
+
+def test_bind():
+    bound = template.bind(tenant="a.c{1}", host="-]")
+
+    assert bound.to_regex_string() == r"^tenant=a\.c\{1\}@(?:[\-\]])+(?:a\.c\{1\})?$"
+    assert bound.to_regex().fullmatch("tenant=a.c{1}@-]-")
+    assert not bound.to_regex().fullmatch("tenant=abc{1}@-")
+
+
+def test_bind_same_as_building():
+    built = (
+        SuperExpressive()
+            .start_of_input
+            .string("tenant=")
+            .string("acme")
+            .char('@')
+            .one_or_more.any_of_chars("xy")
+            .optional.string("acme")
+            .end_of_input
+    )
+    bound = template.bind(tenant="acme", host="xy").to_regex()
+    for text in ("tenant=acme@x", "tenant=acme@xyxacme", "tenant=acme@", "tenant=acm@x", "tenant=acme@xz"):
+        assert bool(bound.fullmatch(text)) == bool(built.to_regex().fullmatch(text))
+
+
+def test_bind_many():
+    rows = [{ "tenant": f"t{i}", "host": "ab" } for i in range(100)]
+    bound = template.bind_many(rows)
+
+    assert bound == [template.bind(**row) for row in rows]
+    assert bound[42].to_regex_string() == r"^tenant=t42@(?:[ab])+(?:t42)?$"
+
+
+def test_flags_and_subexpressions():
+    host = SuperExpressive().param("host").char('.').param("tld")
+    expr = (
+        SuperExpressive()
+            .case_insensitive
+            .subexpression(host, by_reference=True)
+            .char('/')
+            .subexpression(host)
+    )
+    assert expr.bind(host="x+y", tld="io").to_regex_string() == r"(?i)x\+y\.io/x\+y\.io"
+
+
+def test_braces_in_static_fragments():
+    expr = SuperExpressive().exactly(2).digit.param("x").between(1, 3).word
+    assert expr.bind(x="{}").to_regex_string() == r"\d{2}\{\}\w{1,3}"
+
+
+def test_templates_round_trip():
+    for restored in (pickle.loads(pickle.dumps(template)), SuperExpressive.from_ast(template.to_ast())):
+        assert restored.bind(tenant="a", host="b") == template.bind(tenant="a", host="b")
+
+
+def test_unbound_template():
+    with pytest.raises(RegexError) as e:
+        template.to_regex()
+    assert str(e.value) == (
+        "Cannot render a template with unbound parameters (host, tenant).\n"
+        "(Try binding them with .bind())"
+    )
+
+
+@pytest.mark.parametrize("values, message", [
+    ({ "tenant": "a" }, "missing value for parameter 'host'"),
+    ({ "tenant": "a", "host": "b", "port": "1" }, "unknown parameter 'port'"),
+    ({ "tenant": "", "host": "b" }, "the value of parameter 'tenant' must be a non-empty string (got '')"),
+    ({ "tenant": 1, "host": "b" }, "the value of parameter 'tenant' must be a non-empty string (got 1)"),
+])
+def test_invalid_values(values, message):
+    with pytest.raises(RegexError) as e:
+        template.bind(**values)
+    assert str(e.value) == message
+
+    with pytest.raises(RegexError) as e:
+        template.bind_many([{ "tenant": "a", "host": "b" }, values])
+    assert str(e.value) == message
+
+
+def test_invalid_params():
+    with pytest.raises(RegexError) as e:
+        SuperExpressive().param("1st")
+    assert str(e.value) == "name '1st' is not valid (only letters, numbers, and underscores)"
+
+    with pytest.raises(RegexError) as e:
+        SuperExpressive().param("x", kind="range")
+    assert str(e.value) == "kind must be one of string, chars (got range)"
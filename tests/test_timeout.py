@@ -0,0 +1,90 @@
+import pytest
+
+from ..src.super_expressive import SuperExpressive, RegexError, MatchTimeout
+from ..src.super_expressive.matcher import LiteralMatcher
+from ..src.super_expressive.metrics import MetricsRegistry, registry
+from ..src.super_expressive.timeout import TimeoutMatcher, WorkerPool
+
+
+nested = SuperExpressive().capture.one_or_more.group.one_or_more.char("a").end().end().char("b")
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(1)
+    yield pool
+    pool.close()
+
+
+@pytest.mark.parametrize("expr", [
+    nested,
+    SuperExpressive().named_capture("year").exactly(4).digit.end().char("-").exactly(2).digit,
+    SuperExpressive().start_of_input.between(1, 3).word.char("=").capture.one_or_more.digit.end(),
+    SuperExpressive().start_of_input.optional.char("-").one_or_more.digit.end_of_string,
+    SuperExpressive().assert_behind.char("=").end().word_boundary.one_or_more.digit,
+])
+def test_same_matches_as_the_matcher(expr, pool):
+    matcher = expr.matcher()
+    budgeted = expr.to_matcher(timeout=5, pool=pool)
+    assert isinstance(budgeted, TimeoutMatcher)
+    for s in ("", "aab", "xaaab", "2024-01", "x 2024-01", "ab=12", "-42", "42\n", "a=1 b=22", "aac"):
+        found, expected = budgeted.find(s), matcher.find(s)
+        assert budgeted.test(s) == matcher.test(s)
+        assert (found and (found.span(), found.groups())) == (expected and (expected.span(), expected.groups()))
+
+
+def test_timeout_recycles_the_worker(pool):
+    matcher = nested.to_matcher(timeout=0.1, name="timeout_recycles", pool=pool)
+    matcher.metrics.reset()
+    with pytest.raises(MatchTimeout, match=r"^matching '\(\(\?:a\+\)\+\)b' took more than 0.1 seconds$"):
+        matcher.test("a" * 40)
+    assert pool.recycled == 1
+    assert matcher.find("xaab").span() == (1, 4)
+
+    exported = registry.export()["timeout_recycles"]["search"]
+    assert (exported["calls"], exported["hits"], exported["timeouts"]) == (2, 1, 1)
+
+
+def test_inline(pool):
+    matcher = nested.to_matcher(timeout=0.1, inline_length=3, pool=pool)
+    assert matcher.find("aab").span() == (0, 3)
+    assert pool.size == 1 and not pool._idle
+
+
+def test_prometheus(pool):
+    own = MetricsRegistry()
+    matcher = TimeoutMatcher(nested.matcher(), 0.1, name="evil", pool=pool, registry=own)
+    with pytest.raises(MatchTimeout):
+        matcher.find("a" * 40)
+    assert 'super_expressive_timeouts_total{pattern="evil",method="search"} 1' in own.to_prometheus()
+
+
+@pytest.mark.parametrize("context", ["spawn", "forkserver"])
+def test_startup_is_not_timed(context):
+    pool = WorkerPool(1, context)
+    try:
+        matcher = SuperExpressive().one_or_more.digit.char("x").to_matcher(timeout=0.05, pool=pool)
+        assert matcher.test("123x")
+        with pytest.raises(MatchTimeout):
+            TimeoutMatcher(nested.matcher(), 0.05, pool=pool).find("a" * 40)
+        # the replacement of the killed worker is waited for before timing the next match
+        assert matcher.test("123x")
+        assert pool.recycled == 1
+    finally:
+        pool.close()
+
+
+def test_string_operations_take_no_timeout():
+    assert isinstance(SuperExpressive().string("ab").to_matcher(timeout=0.1), LiteralMatcher)
+    assert isinstance(SuperExpressive().one_or_more.digit.to_matcher(timeout=0.1), TimeoutMatcher)
+
+
+def test_errors():
+    with pytest.raises(RegexError, match=r"^timeout must be a positive number \(got 0\)$"):
+        nested.to_matcher(timeout=0)
+    with pytest.raises(RegexError, match=r"^timeout must be a positive number \(got True\)$"):
+        nested.to_matcher(timeout=True)
+    with pytest.raises(RegexError, match=r"^the dfa engine runs in linear time and takes no timeout$"):
+        nested.to_matcher(engine="dfa", timeout=1)
+    with pytest.raises(RegexError, match=r"^inline_length must be a non-negative integer \(got -1\)$"):
+        nested.to_matcher(timeout=1, inline_length=-1)